@@ -4,13 +4,14 @@
 import argparse
 import subprocess
 import sys
+from pathlib import Path
 from typing import Optional, Sequence, Union
 
 from gridsync import APP_NAME
 from gridsync import __doc__ as description
 from gridsync import __version__, msg
-from gridsync.core import Core
 from gridsync.errors import FilesystemLockError
+from gridsync.startup import mark_startup, start_profiling
 
 
 class TahoeVersion(argparse.Action):
@@ -36,12 +37,27 @@ def main() -> Union[int, str]:
         action=TahoeVersion,
         help="Call 'tahoe --version-and-path' and exit. For debugging.",
     )
+    parser.add_argument(
+        "--profile-startup",
+        metavar="PATH",
+        type=Path,
+        help="Profile startup, writing timings and cProfile statistics to "
+        "PATH once all gateways have started. For debugging.",
+    )
     parser.add_argument(
         "-V", "--version", action="version", version="%(prog)s " + __version__
     )
+    args = parser.parse_args()
+    if args.profile_startup:
+        start_profiling(args.profile_startup)
+
+    # Importing gridsync.core initializes the QApplication and reactor, so
+    # defer it until the arguments are known to require it.
+    from gridsync.core import Core  # pylint: disable=import-outside-toplevel
 
+    mark_startup("gridsync.core imported")
     try:
-        Core(parser.parse_args()).start()
+        Core(args).start()
     except FilesystemLockError:
         msg.critical(
             "{} already running".format(APP_NAME),
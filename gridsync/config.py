@@ -1,47 +1,138 @@
 # -*- coding: utf-8 -*-
 
+import os
+import threading
 from collections import defaultdict
 from configparser import NoOptionError, NoSectionError, RawConfigParser
-from typing import Optional
+from contextlib import contextmanager
+from io import StringIO
+from typing import Iterator, Optional
 
 from atomicwrites import atomic_write
 
+# Parsed configuration files, by path, along with the stat results of the
+# file that they were parsed from. A cached parser is shared between readers
+# and so must never be modified in place.
+_cache: dict[str, tuple[Optional[tuple[int, int, int]], RawConfigParser]] = {}
+_cache_lock = threading.Lock()
+# The (modified) configurations to be written at the end of the transactions
+# currently open, by path. Transactions are private to the thread that opened
+# them: other threads neither see nor join them until they are written.
+_local = threading.local()
+
+
+def _pending() -> dict[str, RawConfigParser]:
+    try:
+        return _local.pending
+    except AttributeError:
+        _local.pending = {}
+        return _local.pending
+
+
+def _stat_key(filename: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _parse(filename: str) -> RawConfigParser:
+    config = RawConfigParser(allow_no_value=True)
+    config.read(filename)
+    return config
+
+
+def _copy(config: RawConfigParser) -> RawConfigParser:
+    buf = StringIO()
+    config.write(buf)
+    copy = RawConfigParser(allow_no_value=True)
+    copy.read_string(buf.getvalue())
+    return copy
+
+
+def read_config(filename: str) -> RawConfigParser:
+    """
+    Return the parsed contents of the configuration file at ``filename``,
+    re-reading it only if it has changed (or been replaced) since it was
+    last read. The returned parser is shared and must not be modified.
+    """
+    key = _stat_key(filename)
+    with _cache_lock:
+        cached = _cache.get(filename)
+    if cached and cached[0] == key:
+        return cached[1]
+    config = _parse(filename)
+    with _cache_lock:
+        _cache[filename] = (key, config)
+    return config
+
+
+def clear_config_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
 
 class Config:
     def __init__(self, filename: str) -> None:
         self.filename = filename
 
-    def set(self, section: str, option: str, value: str) -> None:
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
-        if not config.has_section(section):
-            config.add_section(section)
-        config.set(section, option, value)
+    def _write(self, config: RawConfigParser) -> None:
         with atomic_write(self.filename, mode="w", overwrite=True) as f:
             config.write(f)
+        # Cache a copy, since the caller may hold on to (and later modify)
+        # the parser that it was given.
+        with _cache_lock:
+            _cache[self.filename] = (_stat_key(self.filename), _copy(config))
+
+    @contextmanager
+    def transaction(self) -> Iterator[RawConfigParser]:
+        """
+        Batch any calls to ``set`` or ``save`` made within the context (by
+        this or any other Config for the same file) into a single atomic
+        write, performed when the context exits without an exception.
+
+        Only calls made from the thread that opened the transaction join it.
+        """
+        pending = _pending()
+        if self.filename in pending:  # Already in a transaction
+            yield pending[self.filename]
+            return
+        config = pending[self.filename] = _copy(read_config(self.filename))
+        try:
+            yield config
+        finally:
+            del pending[self.filename]
+        self._write(config)
+
+    def _read(self) -> RawConfigParser:
+        pending = _pending().get(self.filename)
+        if pending is not None:
+            return pending
+        return read_config(self.filename)
+
+    def set(self, section: str, option: str, value: str) -> None:
+        with self.transaction() as config:
+            if not config.has_section(section):
+                config.add_section(section)
+            config.set(section, option, value)
 
     def get(self, section: str, option: str) -> Optional[str]:
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
         try:
-            return config.get(section, option)
+            return self._read().get(section, option)
         except (NoOptionError, NoSectionError):
             return None
 
     def save(self, settings_dict: dict) -> None:
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
-        for section, d in settings_dict.items():
-            if not config.has_section(section):
-                config.add_section(section)
-            for option, value in d.items():
-                config.set(section, option, value)
-        with atomic_write(self.filename, mode="w", overwrite=True) as f:
-            config.write(f)
+        with self.transaction() as config:
+            for section, d in settings_dict.items():
+                if not config.has_section(section):
+                    config.add_section(section)
+                for option, value in d.items():
+                    config.set(section, option, value)
 
     def load(self) -> dict:
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
+        config = self._read()
         settings_dict: defaultdict = defaultdict(dict)
         for section in config.sections():
             for option, value in config.items(section):
@@ -73,6 +73,16 @@ from gridsync.lock import FilesystemLock
 from gridsync.log import LOGGING_ENABLED, initialize_logger
 from gridsync.magic_folder import MagicFolder
 from gridsync.preferences import get_preference, set_preference
+from gridsync.startup import (
+    MAX_PARALLEL_GATEWAY_STARTS,
+    StartupTimer,
+    VersionCache,
+    get_executable_version,
+    mark_startup,
+    run_concurrently,
+    stop_profiling,
+)
+from gridsync.system import which
 from gridsync.tahoe import Tahoe, get_nodedirs
 from gridsync.tor import get_tor
 from gridsync.types_ import TwistedDeferred
@@ -118,58 +128,107 @@ class Core:
                 str(e),
             )
 
+    async def _get_tahoe_version(self, cache: VersionCache) -> str:
+        tahoe = Tahoe(executable=which("tahoe"), enable_logging=False)
+        return await get_executable_version(
+            tahoe.executable, tahoe.version, cache
+        )
+
+    async def _get_magic_folder_version(self, cache: VersionCache) -> str:
+        magic_folder = MagicFolder(
+            Tahoe(enable_logging=False),
+            executable=which("magic-folder"),
+            enable_logging=False,
+        )
+        return await get_executable_version(
+            str(magic_folder.executable), magic_folder.version, cache
+        )
+
     async def _get_executable_versions(self) -> None:
-        tahoe = Tahoe(enable_logging=False)
-        try:
-            self.tahoe_version = await tahoe.version()
-        except Exception as e:  # pylint: disable=broad-except
+        cache = VersionCache()
+        (tahoe_ok, tahoe_result), (mf_ok, mf_result) = await DeferredList(
+            [
+                Deferred.fromCoroutine(self._get_tahoe_version(cache)),
+                Deferred.fromCoroutine(self._get_magic_folder_version(cache)),
+            ],
+            consumeErrors=True,
+        )
+        if tahoe_ok:
+            self.tahoe_version = tahoe_result
+        else:
             msg.critical(
                 "Error getting Tahoe-LAFS version",
-                "{}: {}".format(type(e).__name__, str(e)),
+                "{}: {}".format(
+                    type(tahoe_result.value).__name__, str(tahoe_result.value)
+                ),
             )
-        magic_folder = MagicFolder(tahoe, enable_logging=False)
-        try:
-            self.magic_folder_version = await magic_folder.version()
-        except Exception as e:  # pylint: disable=broad-except
+        if mf_ok:
+            self.magic_folder_version = mf_result
+        else:
             msg.critical(
                 "Error getting Magic-Folder version",
-                "{}: {}".format(type(e).__name__, str(e)),
+                "{}: {}".format(
+                    type(mf_result.value).__name__, str(mf_result.value)
+                ),
             )
 
     @inlineCallbacks
     def start_gateways(self) -> TwistedDeferred[None]:
+        timer = StartupTimer()
+        # Probe the executables' versions while the gateways are starting
+        versions_d = Deferred.fromCoroutine(
+            timer.measure("versions", self._get_executable_versions())
+        )
+        starts_d = None
         nodedirs = get_nodedirs(config_dir)
         if nodedirs:
             minimize_preference = get_preference("startup", "minimize")
             if not minimize_preference or minimize_preference == "false":
                 self.gui.show_main_window()
-            tor_available = yield get_tor(reactor)
+                mark_startup("main window shown")
+            with timer.phase("tor"):
+                tor_available = yield get_tor(reactor)
             logging.debug("Starting Tahoe-LAFS gateway(s)...")
-            for nodedir in nodedirs:
-                gateway = Tahoe(nodedir)
-                tcp = gateway.config_get("connections", "tcp")
-                if tcp == "tor" and not tor_available:
-                    logging.error("No running tor daemon found")
-                    msg.error(
-                        self.gui.main_window,
-                        "Error Connecting To Tor Daemon",
-                        'The "{}" connection is configured to use Tor, '
-                        "however, no running tor daemon was found.\n\n"
-                        "This connection will be disabled until you launch "
-                        "Tor again.".format(gateway.name),
+            with timer.phase("configure"):
+                for nodedir in nodedirs:
+                    gateway = Tahoe(nodedir)
+                    tcp = gateway.config_get("connections", "tcp")
+                    if tcp == "tor" and not tor_available:
+                        logging.error("No running tor daemon found")
+                        msg.error(
+                            self.gui.main_window,
+                            "Error Connecting To Tor Daemon",
+                            'The "{}" connection is configured to use Tor, '
+                            "however, no running tor daemon was found.\n\n"
+                            "This connection will be disabled until you "
+                            "launch Tor again.".format(gateway.name),
+                        )
+                    self.gateways.append(gateway)
+            starts_d = run_concurrently(
+                [
+                    lambda g=gateway: timer.measure(
+                        f"start {g.name}", self._start_gateway(g)
                     )
-                self.gateways.append(gateway)
-                self._start_gateway(gateway)
+                    for gateway in self.gateways
+                ],
+                MAX_PARALLEL_GATEWAY_STARTS,
+            )
             self.gui.populate(self.gateways)
             cheatcode = settings.get("connection", {}).get("default")
             if cheatcode and not cheatcode_used(cheatcode):
                 self.gui.show_welcome_dialog()
         else:
             self.gui.show_welcome_dialog()
+            mark_startup("welcome dialog shown")
             if DEFAULT_AUTOSTART:
                 autostart_enable()
                 self.gui.preferences_window.general_pane.load_preferences()
-        yield Deferred.fromCoroutine(self._get_executable_versions())
+        if starts_d is not None:
+            yield starts_d
+        yield versions_d
+        logging.debug(timer.summary())
+        mark_startup("gateways started")
+        stop_profiling()
 
     @staticmethod
     def show_message() -> None:
@@ -232,7 +291,11 @@ class Core:
         self.show_message()
 
         self.gui.show_systray()
+        mark_startup("tray icon shown")
 
+        reactor.callWhenRunning(  # type: ignore
+            mark_startup, "reactor started"
+        )
         reactor.callLater(0, self.start_gateways)  # type: ignore
         reactor.addSystemEventTrigger(  # type: ignore
             "before", "shutdown", self.stop_gateways
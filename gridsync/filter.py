@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import io
 import json
 import os
-from typing import TYPE_CHECKING, Optional
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO
 
 from gridsync import autostart_file_path, config_dir, pkgdir
 from gridsync.crypto import trunchash
@@ -122,12 +125,103 @@ def get_filters(core: Core) -> list:
     return filters
 
 
-def apply_filters(in_str: str, filters: list) -> str:
-    filtered = in_str
+def _trie_pattern(strings: Iterable[str]) -> str:
+    """
+    Return a regular expression matching any of ``strings``, structured as
+    a trie so that each character need only be compared against those that
+    may follow the characters already matched (rather than against every
+    string in turn). At any position, the longest of ``strings`` matches.
+    """
+    trie: dict = {}
+    for string in strings:
+        node = trie
+        for char in string:
+            node = node.setdefault(char, {})
+        node[""] = {}  # The end of a string
+
+    def build(node: dict) -> str:
+        # Runs of characters without branches are emitted as one literal.
+        chars = []
+        while len(node) == 1 and "" not in node:
+            ((char, node),) = node.items()
+            chars.append(char)
+        prefix = re.escape("".join(chars))
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in node.items()
+            if char
+        ]
+        if not branches:
+            return prefix
+        # Branches are tried before the end of a string (the greedy "?") so
+        # that a longer string takes precedence over its prefix.
+        group = "(?:{})".format("|".join(branches))
+        return prefix + group + ("?" if "" in node else "")
+
+    return build(trie)
+
+
+@lru_cache(maxsize=8)
+def _compile_filters(
+    filters: tuple[tuple[str, str], ...],
+) -> Optional[tuple[re.Pattern, dict[str, tuple[int, str]]]]:
+    # The mask for, and priority (i.e., position in ``filters``) of, each
+    # string to be filtered.
+    replacements: dict[str, tuple[int, str]] = {}
     for s, mask in filters:
-        if s and mask:
-            filtered = filtered.replace(s, "<Filtered:{}>".format(mask))
-    return filtered
+        if s and mask and s not in replacements:
+            replacements[s] = (len(replacements), "<Filtered:{}>".format(mask))
+    if not replacements:
+        return None
+    return re.compile(_trie_pattern(replacements)), replacements
+
+
+def apply_filters(in_str: str, filters: list) -> str:
+    """
+    Replace every occurrence of each string in ``filters`` (a list of
+    (string, mask) pairs) with "<Filtered:mask>" in a single pass.
+
+    Of the strings that occur at any given position, the longest is the one
+    matched there, regardless of the order of ``filters``. Where matches
+    starting at different positions overlap, the whole of the overlapping
+    region is replaced with a single mask: that of whichever of those
+    matches comes first in ``filters``.
+
+    The combined pattern is compiled once per distinct set of filters.
+    """
+    compiled = _compile_filters(tuple(map(tuple, filters)))
+    if compiled is None:
+        return in_str
+    pattern, replacements = compiled
+    pieces = []
+    copied = 0  # The end of the input copied (or masked) so far
+    region_start = region_end = 0
+    region_string = ""
+    # Rather than resuming after the end of each match (as re.sub would),
+    # search again from the position following its start so that strings
+    # that begin inside of a match and extend beyond it are found too.
+    m = pattern.search(in_str)
+    while m:
+        string = m.group()
+        start = m.start()
+        m = pattern.search(in_str, start + 1)
+        if start < region_end:  # Overlaps the current region
+            region_end = max(region_end, start + len(string))
+            if replacements[string][0] < replacements[region_string][0]:
+                region_string = string
+            continue
+        if region_string:
+            pieces.append(in_str[copied:region_start])
+            pieces.append(replacements[region_string][1])
+            copied = region_end
+        region_start, region_end = start, start + len(string)
+        region_string = string
+    if region_string:
+        pieces.append(in_str[copied:region_start])
+        pieces.append(replacements[region_string][1])
+        copied = region_end
+    pieces.append(in_str[copied:])
+    return "".join(pieces)
 
 
 def get_mask(string: str, tag: str, identifier: Optional[str] = None) -> str:
@@ -321,14 +415,38 @@ def filter_eliot_log_message(
     return json.dumps(msg, sort_keys=True)
 
 
+def iter_filtered_eliot_messages(
+    lines: Iterable[str], identifier: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Lazily filter (and normalize) each eliot message in ``lines``, skipping
+    blank lines, so that only one message need be held in memory at a time.
+    """
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line:
+            yield filter_eliot_log_message(line, identifier)
+
+
+def write_filtered_eliot_log(
+    lines: Iterable[str], out: TextIO, identifier: Optional[str] = None
+) -> None:
+    """
+    Filter the eliot messages in ``lines``, writing them -- one per line --
+    to ``out`` as they are produced.
+    """
+    for i, message in enumerate(
+        iter_filtered_eliot_messages(lines, identifier)
+    ):
+        if i:
+            out.write("\n")
+        out.write(message)
+
+
 def filter_eliot_logs(
     messages: list[str], identifier: Optional[str] = None
 ) -> list[str]:
-    filtered = []
-    for message in messages:
-        if message:
-            filtered.append(filter_eliot_log_message(message, identifier))
-    return filtered
+    return list(iter_filtered_eliot_messages(messages, identifier))
 
 
 def join_eliot_logs(messages: list[str]) -> str:
@@ -340,5 +458,8 @@ def join_eliot_logs(messages: list[str]) -> str:
 
 
 def apply_eliot_filters(content: str, identifier: Optional[str] = None) -> str:
-    messages = content.split("\n")
-    return join_eliot_logs(filter_eliot_logs(messages, identifier))
+    # filter_eliot_log_message already emits sorted, normalized JSON, so
+    # there is no need for a second pass through join_eliot_logs.
+    out = io.StringIO()
+    write_filtered_eliot_log(io.StringIO(content), out, identifier)
+    return out.getvalue()
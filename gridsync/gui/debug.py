@@ -7,11 +7,12 @@ import platform
 import sys
 import time
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Optional
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Optional
 
 from atomicwrites import atomic_write
 from qtpy.QtCore import QObject, QSize, Qt, QThread, Signal
-from qtpy.QtGui import QFontDatabase, QIcon
+from qtpy.QtGui import QCloseEvent, QFontDatabase, QIcon, QTextCursor
 from qtpy.QtWidgets import (
     QCheckBox,
     QDialog,
@@ -38,7 +39,7 @@ from gridsync.filter import (
     get_mask,
 )
 from gridsync.gui.widgets import HSpacer
-from gridsync.log import read_log
+from gridsync.log import LOGGING_DEBUG_TAIL_BYTES, read_log
 from gridsync.msg import error
 
 if TYPE_CHECKING:
@@ -93,82 +94,121 @@ def _format_log(log_name: str, content: str) -> str:
 
 
 class LogLoader(QObject):
-    done = Signal()
+    """
+    Load (and filter) the application and gateway logs one at a time,
+    emitting each as it is ready so that they can be displayed
+    incrementally.
+
+    This is intended to be moved to (and run in) a worker thread.
+
+    :param tail_bytes: The number of bytes to read from the end of each log,
+        or 0 to read logs in their entirety.
+    """
 
-    def __init__(self, core: Core) -> None:
+    done = Signal()
+    # The unfiltered and filtered content of each log, as it is loaded
+    chunk_loaded = Signal(str, str)
+    # The number of logs loaded so far and the total number of logs
+    progress = Signal(int, int)
+
+    def __init__(
+        self, core: Core, tail_bytes: int = LOGGING_DEBUG_TAIL_BYTES
+    ) -> None:
         super().__init__()
         self.core = core
-        self.content = ""
-        self.filtered_content = ""
-
-    def load(self) -> None:
-        start_time = time.time()
-        self.content = _make_header(self.core) + _format_log(
-            f"{APP_NAME} log", read_log()
-        )
-        filters = get_filters(self.core)
-        self.filtered_content = apply_filters(self.content, filters)
+        self.tail_bytes = tail_bytes
+        self._content: list[str] = []
+        self._filtered_content: list[str] = []
+        self._cancelled = False
+
+    @property
+    def content(self) -> str:
+        return "".join(self._content)
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = [value]
+
+    @property
+    def filtered_content(self) -> str:
+        return "".join(self._filtered_content)
+
+    @filtered_content.setter
+    def filtered_content(self, value: str) -> None:
+        self._filtered_content = [value]
+
+    def cancel(self) -> None:
+        """
+        Stop loading after the log currently being loaded.
+        """
+        self._cancelled = True
+
+    def _add_chunk(self, content: str, filtered_content: str) -> None:
+        self._content.append(content)
+        self._filtered_content.append(filtered_content)
+        self.chunk_loaded.emit(content, filtered_content)
+
+    def _log_sources(
+        self, filters: list
+    ) -> list[tuple[str, str, Callable[[], str], Callable[[str], str]]]:
+        """
+        Return, for each log, its name, its filtered name, a function that
+        reads it, and a function that filters it.
+        """
+        sources: list[
+            tuple[str, str, Callable[[], str], Callable[[str], str]]
+        ] = [
+            (
+                f"{APP_NAME} log",
+                f"{APP_NAME} log",
+                lambda: read_log(tail_bytes=self.tail_bytes),
+                lambda s: apply_filters(s, filters),
+            )
+        ]
         for i, gateway in enumerate(self.core.gui.main_window.gateways):
             gateway_id = str(i + 1)
             gateway_mask = get_mask(gateway.name, "GatewayName", gateway_id)
+            for app, get_log in (
+                ("Tahoe-LAFS", gateway.get_log),
+                ("Magic-Folder", gateway.magic_folder.get_log),
+            ):
+                for log_name in ("stdout", "stderr", "eliot"):
+                    if log_name == "eliot":
+                        filter_log = partial(
+                            apply_eliot_filters, identifier=gateway_id
+                        )
+                    else:
+                        filter_log = partial(apply_filters, filters=filters)
+                    sources.append(
+                        (
+                            f"{gateway.name} {app} {log_name} log",
+                            f"{gateway_mask} {app} {log_name} log",
+                            partial(get_log, log_name, self.tail_bytes),
+                            filter_log,
+                        )
+                    )
+        return sources
 
-            tahoe_stdout = gateway.get_log("stdout")
-            if tahoe_stdout:
-                self.content += _format_log(
-                    f"{gateway.name} Tahoe-LAFS stdout log", tahoe_stdout
-                )
-                self.filtered_content += _format_log(
-                    f"{gateway_mask} Tahoe-LAFS stdout log",
-                    apply_filters(tahoe_stdout, filters),
-                )
-            tahoe_stderr = gateway.get_log("stderr")
-            if tahoe_stderr:
-                self.content += _format_log(
-                    f"{gateway.name} Tahoe-LAFS stderr log", tahoe_stderr
-                )
-                self.filtered_content += _format_log(
-                    f"{gateway_mask} Tahoe-LAFS stderr log",
-                    apply_filters(tahoe_stderr, filters),
-                )
-            tahoe_eliot = gateway.get_log("eliot")
-            if tahoe_eliot:
-                self.content += _format_log(
-                    f"{gateway.name} Tahoe-LAFS eliot log", tahoe_eliot
-                )
-                self.filtered_content += _format_log(
-                    f"{gateway_mask} Tahoe-LAFS eliot log",
-                    apply_eliot_filters(tahoe_eliot, gateway_id),
-                )
-            magic_folder_stdout = gateway.magic_folder.get_log("stdout")
-            if magic_folder_stdout:
-                self.content += _format_log(
-                    f"{gateway.name} Magic-Folder stdout log",
-                    magic_folder_stdout,
-                )
-                self.filtered_content += _format_log(
-                    f"{gateway_mask} Magic-Folder stdout log",
-                    apply_filters(magic_folder_stdout, filters),
-                )
-            magic_folder_stderr = gateway.magic_folder.get_log("stderr")
-            if magic_folder_stderr:
-                self.content += _format_log(
-                    f"{gateway.name} Magic-Folder stderr log",
-                    magic_folder_stderr,
-                )
-                self.filtered_content += _format_log(
-                    f"{gateway_mask} Magic-Folder stderr log",
-                    apply_filters(magic_folder_stderr, filters),
-                )
-            magic_folder_eliot = gateway.magic_folder.get_log("eliot")
-            if magic_folder_eliot:
-                self.content += _format_log(
-                    f"{gateway.name} Magic-Folder eliot log",
-                    magic_folder_eliot,
-                )
-                self.filtered_content += _format_log(
-                    f"{gateway_mask} Magic-Folder eliot log",
-                    apply_eliot_filters(magic_folder_eliot, gateway_id),
+    def load(self) -> None:
+        start_time = time.time()
+        self._content = []
+        self._filtered_content = []
+        self._cancelled = False
+        filters = get_filters(self.core)
+        header = _make_header(self.core)
+        self._add_chunk(header, apply_filters(header, filters))
+        sources = self._log_sources(filters)
+        for i, (name, masked_name, read, filter_log) in enumerate(sources):
+            if self._cancelled:
+                logging.debug("Cancelled loading logs")
+                break
+            content = read()
+            if content:
+                self._add_chunk(
+                    _format_log(name, content),
+                    _format_log(masked_name, filter_log(content)),
                 )
+            self.progress.emit(i + 1, len(sources))
         self.done.emit()
         logging.debug("Loaded logs in %f seconds", time.time() - start_time)
 
@@ -182,6 +222,9 @@ class DebugExporter(QDialog):
         self.log_loader_thread = QThread()
         self.log_loader.moveToThread(self.log_loader_thread)
         self.log_loader.done.connect(self.on_loaded)
+        self.log_loader.chunk_loaded.connect(self.on_chunk_loaded)
+        self.log_loader.progress.connect(self.on_progress)
+        self._clear_on_next_chunk = False
         self.log_loader_thread.started.connect(self.log_loader.load)
 
         self.setMinimumSize(800, 600)
@@ -274,8 +317,28 @@ class DebugExporter(QDialog):
             msgbox.setText(self.filter_info_text)
         msgbox.show()
 
+    def on_chunk_loaded(self, content: str, filtered_content: str) -> None:
+        if self._clear_on_next_chunk:
+            self._clear_on_next_chunk = False
+            self.plaintextedit.clear()
+        if self.checkbox.checkState() == Qt.Checked:
+            text = filtered_content
+        else:
+            text = content
+        scrollbar_position = self.scrollbar.value()
+        cursor = self.plaintextedit.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.scrollbar.setValue(scrollbar_position)
+
+    def on_progress(self, loaded: int, total: int) -> None:
+        self.setWindowTitle(
+            f"{APP_NAME} - Debug Information (Loading {loaded}/{total}...)"
+        )
+
     def on_loaded(self) -> None:
-        self.on_checkbox_state_changed(self.checkbox.checkState())
+        # The content has already been displayed, chunk by chunk
+        self.setWindowTitle(f"{APP_NAME} - Debug Information")
         self.log_loader_thread.quit()
         self.log_loader_thread.wait()
 
@@ -283,8 +346,21 @@ class DebugExporter(QDialog):
         if self.log_loader_thread.isRunning():
             logging.warning("LogLoader thread is already running; returning")
             return
+        self._clear_on_next_chunk = True
         self.log_loader_thread.start()
 
+    def cancel(self) -> None:
+        if self.log_loader_thread.isRunning():
+            self.log_loader.cancel()
+
+    def reject(self) -> None:
+        self.cancel()
+        super().reject()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        self.cancel()
+        super().closeEvent(event)
+
     def copy_to_clipboard(self) -> None:
         for mode in get_clipboard_modes():
             set_clipboard_text(self.plaintextedit.toPlainText(), mode)
@@ -12,7 +12,7 @@ from qtpy.QtCore import (
     QTimer,
     Signal,
 )
-from qtpy.QtGui import QFont, QIcon, QKeyEvent
+from qtpy.QtGui import QFocusEvent, QFont, QIcon, QKeyEvent
 from qtpy.QtWidgets import (
     QAction,
     QCheckBox,
@@ -29,12 +29,6 @@ from qtpy.QtWidgets import (
 from twisted.internet import reactor
 from twisted.internet.defer import CancelledError, inlineCallbacks
 from twisted.python.failure import Failure
-from wormhole.errors import (
-    LonelyError,
-    ServerConnectionError,
-    WelcomeError,
-    WrongPasswordError,
-)
 
 from gridsync import APP_NAME, resource
 from gridsync.desktop import (
@@ -46,7 +40,7 @@ from gridsync.errors import UpgradeRequiredError
 from gridsync.gui.color import BlendedColor
 from gridsync.gui.font import Font
 from gridsync.gui.widgets import HSpacer, InfoButton, VSpacer
-from gridsync.invite import is_valid_code, wordlist
+from gridsync.invite import get_wordlist, is_valid_code
 from gridsync.tor import get_tor
 from gridsync.types_ import TwistedDeferred
 from gridsync.util import b58encode
@@ -187,10 +181,11 @@ class InviteCodeLineEdit(QLineEdit):
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
-        model = QStringListModel()
-        model.setStringList(wordlist)
+        # The completions are loaded when the user first focuses the widget
+        # (see focusInEvent) since loading the wordlist is relatively slow.
+        self._completer_model = QStringListModel()
         completer = InviteCodeCompleter()
-        completer.setModel(model)
+        completer.setModel(self._completer_model)
         self.setFont(Font(16))
         self.setCompleter(completer)
         self.setAlignment(Qt.AlignCenter)
@@ -233,6 +228,11 @@ class InviteCodeLineEdit(QLineEdit):
             self.action_button.setToolTip("Clear")
             self.code_invalidated.emit(text)
 
+    def focusInEvent(self, event: QFocusEvent) -> None:
+        if not self._completer_model.rowCount():
+            self._completer_model.setStringList(get_wordlist())
+        super().focusInEvent(event)
+
     def keyPressEvent(self, event: QKeyEvent) -> Optional[QKeyEvent]:  # type: ignore
         # mypy: 'incompatible with return type "None" in supertype "QLineEdit"'
         # mypy: 'incompatible with return type "None" in supertype "QWidget"'
@@ -486,6 +486,14 @@ class InviteCodeWidget(QWidget):
 
 
 def show_failure(failure: Failure, parent: Optional[QWidget] = None) -> None:
+    # pylint: disable=import-outside-toplevel
+    from wormhole.errors import (
+        LonelyError,
+        ServerConnectionError,
+        WelcomeError,
+        WrongPasswordError,
+    )
+
     msg = QMessageBox(parent)
     msg.setIcon(QMessageBox.Warning)
     msg.setStandardButtons(QMessageBox.Retry)
@@ -39,7 +39,6 @@ from gridsync.gui.invite import (
     InviteHeaderWidget,
 )
 from gridsync.gui.pixmap import Pixmap
-from gridsync.gui.qrcode import QRCode
 from gridsync.gui.widgets import HSpacer, InfoButton, VSpacer
 from gridsync.msg import question
 
@@ -233,6 +232,9 @@ class _MagicFolderInviteCodePage(QWidget):
         )
 
     def set_code(self, code: str) -> None:
+        # pylint: disable=import-outside-toplevel
+        from gridsync.gui.qrcode import QRCode
+
         self.qrcode_label.setPixmap(QPixmap(QRCode(code).scaled(128, 128)))
         self.code_box.show_code(code)
 
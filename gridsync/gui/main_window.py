@@ -15,7 +15,14 @@ from qtpy.QtCore import (
     Qt,
     QTimer,
 )
-from qtpy.QtGui import QCloseEvent, QIcon, QKeyEvent, QKeySequence, QShowEvent
+from qtpy.QtGui import (
+    QCloseEvent,
+    QHideEvent,
+    QIcon,
+    QKeyEvent,
+    QKeySequence,
+    QShowEvent,
+)
 from qtpy.QtWidgets import (
     QFileDialog,
     QGridLayout,
@@ -39,7 +46,6 @@ from gridsync import (
 )
 from gridsync.gui.history import HistoryView
 from gridsync.gui.password import PasswordDialog
-from gridsync.gui.share import InviteReceiverDialog, InviteSenderDialog
 from gridsync.gui.status import StatusPanel
 from gridsync.gui.toolbar import ComboBox, ToolBar
 from gridsync.gui.usage import UsageView
@@ -52,6 +58,7 @@ from gridsync.util import strip_html_tags
 
 if TYPE_CHECKING:
     from gridsync.gui import AbstractGui
+    from gridsync.gui.share import InviteReceiverDialog, InviteSenderDialog
 
 
 @inlineCallbacks
@@ -262,6 +269,7 @@ class MainWindow(QMainWindow):
                 self.gateways.append(gateway)
                 if gateway not in self.gui.core.gateways:
                     self.gui.core.gateways.append(gateway)  # XXX
+                gateway.monitor.set_visible(self.isVisible())
                 gateway.newscap_checker.message_received.connect(
                     self.on_message_received
                 )
@@ -508,6 +516,9 @@ class MainWindow(QMainWindow):
             view.open_magic_folder_join_dialog()
 
     def open_invite_receiver(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        from gridsync.gui.share import InviteReceiverDialog
+
         invite_receiver_dialog = InviteReceiverDialog(self.gateways)
         invite_receiver_dialog.completed.connect(self.on_invite_received)
         invite_receiver_dialog.closed.connect(self.on_invite_closed)
@@ -515,6 +526,9 @@ class MainWindow(QMainWindow):
         self.active_invite_receiver_dialogs.append(invite_receiver_dialog)
 
     def open_invite_sender_dialog(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        from gridsync.gui.share import InviteSenderDialog
+
         gateway = self.combo_box.currentData()
         if gateway:
             view = self.current_view()
@@ -607,7 +621,15 @@ class MainWindow(QMainWindow):
             event.ignore()
             self.confirm_quit()
 
+    def _set_monitors_visible(self, visible: bool) -> None:
+        for gateway in self.gateways:
+            gateway.monitor.set_visible(visible)
+
+    def hideEvent(self, _: QHideEvent) -> None:
+        self._set_monitors_visible(False)
+
     def showEvent(self, _: QShowEvent) -> None:
+        self._set_monitors_visible(True)
         if self.pending_news_message:
             gateway, title, message = self.pending_news_message
             self.pending_news_message = ()
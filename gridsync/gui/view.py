@@ -61,7 +61,6 @@ from gridsync.gui.magic_folder import (
 )
 from gridsync.gui.model import Model
 from gridsync.gui.pixmap import Pixmap
-from gridsync.gui.share import InviteSenderDialog
 from gridsync.gui.widgets import ClickableLabel, HSpacer, VSpacer
 from gridsync.magic_folder import MagicFolderStatus
 from gridsync.msg import error
@@ -210,6 +209,9 @@ class View(QTreeView):
             self.select_download_location([name])
 
     def open_invite_sender_dialog(self, folder_names: list) -> None:
+        # pylint: disable=import-outside-toplevel
+        from gridsync.gui.share import InviteSenderDialog
+
         isd = InviteSenderDialog(self.gateway, self.gui, folder_names)
         self.invite_sender_dialogs.append(isd)  # TODO: Remove on close
         isd.show()
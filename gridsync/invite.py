@@ -1,31 +1,40 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import TYPE_CHECKING, Optional
 
 from qtpy.QtCore import QObject, Signal
 from twisted.internet.defer import Deferred, inlineCallbacks
 
-try:
-    from wormhole.wordlist import raw_words
-except ImportError:  # TODO: Switch to new magic-wormhole completion API?
-    from wormhole._wordlist import raw_words
-
 from gridsync import cheatcodes, load_settings_from_cheatcode
 from gridsync.setup import SetupRunner, validate_settings
 from gridsync.types_ import TwistedDeferred
-from gridsync.wormhole_ import Wormhole
 
 if TYPE_CHECKING:
     from gridsync.tahoe import Tahoe
 
 
-wordlist = []  # type: list
-for word in raw_words.items():
-    wordlist.extend(word[1])
-for c in cheatcodes:
-    wordlist.extend(c.split("-"))
-wordlist = sorted([word.lower() for word in wordlist])
+@lru_cache(maxsize=1)
+def get_wordlist() -> list[str]:
+    """
+    Return the (sorted) list of words that may appear in an invite code.
+
+    The wordlist is loaded on first use since doing so imports the
+    magic-wormhole package, which is comparatively slow to import.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from wormhole.wordlist import raw_words
+    except ImportError:  # TODO: Switch to new magic-wormhole completion API?
+        from wormhole._wordlist import raw_words
+
+    wordlist = []  # type: list
+    for word in raw_words.items():
+        wordlist.extend(word[1])
+    for c in cheatcodes:
+        wordlist.extend(c.split("-"))
+    return sorted([word.lower() for word in wordlist])
 
 
 def is_valid_code(code: str) -> bool:
@@ -34,6 +43,7 @@ def is_valid_code(code: str) -> bool:
         return False
     if not words[0].isdigit():
         return False
+    wordlist = get_wordlist()
     if words[1] not in wordlist:
         return False
     if words[2] not in wordlist:
@@ -74,6 +84,9 @@ class InviteReceiver(QObject):
         self.setup_runner.joined_folders.connect(self.joined_folders.emit)
         self.setup_runner.done.connect(self.done.emit)
 
+        # pylint: disable=import-outside-toplevel
+        from gridsync.wormhole_ import Wormhole
+
         self.wormhole = Wormhole(use_tor)
         self.wormhole.got_welcome.connect(self.got_welcome.emit)
         self.wormhole.got_introduction.connect(self.got_introduction.emit)
@@ -122,6 +135,9 @@ class InviteSender(QObject):
         super().__init__()
         self.use_tor = use_tor
 
+        # pylint: disable=import-outside-toplevel
+        from gridsync.wormhole_ import Wormhole
+
         self.wormhole = Wormhole(use_tor)
         self.wormhole.got_welcome.connect(self.got_welcome.emit)
         self.wormhole.got_code.connect(self.got_code.emit)
@@ -1,9 +1,23 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
 import logging
+import mmap
+import os
+import queue
+import shutil
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for_futures
 from datetime import datetime, timezone
-from logging.handlers import RotatingFileHandler
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
 from twisted.python.log import PythonLoggingObserver, startLogging
 
@@ -21,13 +35,318 @@ else:
 LOGGING_ENABLED = to_bool(_logging_settings.get("enabled", "false"))
 LOGGING_MAX_BYTES = int(_logging_settings.get("max_bytes", 10_000_000))
 LOGGING_BACKUP_COUNT = int(_logging_settings.get("backup_count", 1))
+# Whether MultiFileLogger writes (e.g., Tahoe-LAFS and Magic-Folder eliot logs)
+# should be handed off to a background thread rather than written in-line.
+LOGGING_QUEUED = to_bool(_logging_settings.get("queued", "true"))
+# The maximum number of records that may be waiting to be written; records
+# logged while the queue is full are dropped (and counted).
+LOGGING_QUEUE_SIZE = int(_logging_settings.get("queue_size", 10_000))
+# Whether rotated MultiFileLogger backups should be gzip-compressed (by a
+# background thread) and, if so, how many of them to keep for each log.
+LOGGING_COMPRESS = to_bool(_logging_settings.get("compress", "true"))
+LOGGING_COMPRESSED_BACKUP_COUNT = int(
+    _logging_settings.get("compressed_backup_count", 10)
+)
+# The maximum number of bytes that compressed logs (and their backups) may
+# occupy on disk in total, or 0 for no limit; the oldest backups are removed
+# first when this is exceeded.
+LOGGING_DISK_BUDGET = int(_logging_settings.get("disk_budget", 200_000_000))
+# The number of bytes, from the end of each log, to show in the debug exporter
+# (or 0 to show logs in their entirety).
+LOGGING_DEBUG_TAIL_BYTES = int(
+    _logging_settings.get("debug_tail_bytes", 2_000_000)
+)
 
 
 class LogFormatter(logging.Formatter):
     def formatTime(
         self, record: logging.LogRecord, datefmt: Optional[str] = None
     ) -> str:
-        return datetime.now(timezone.utc).isoformat()
+        # Use the time the record was created (rather than the time that it
+        # is formatted) since records may be written by a background thread.
+        return datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+
+
+class _BatchedRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler that leaves flushing to the _BatchingQueueListener
+    which feeds it, so that a burst of records is flushed only once.
+    """
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+    def close(self) -> None:
+        self.flush_batch()
+        super().close()
+
+
+class LogCompressor:
+    """
+    Compresses rotated log backups in a background thread and keeps the
+    logs registered with it within a shared disk budget.
+
+    :ivar budget: The maximum combined size, in bytes, of the registered
+        logs and their backups (or 0 for no limit).
+    """
+
+    def __init__(self, budget: int = LOGGING_DISK_BUDGET) -> None:
+        self.budget = budget
+        self._base_filenames: set[str] = set()
+        self._pending: dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def register(self, base_filename: str) -> None:
+        with self._lock:
+            self._base_filenames.add(base_filename)
+
+    def compress(self, base_filename: str, path: str) -> Future:
+        """
+        Compress the backup at ``path`` (of the log at ``base_filename``) to
+        ``path`` + ".gz", removing the original once done.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="LogCompressor"
+                )
+            future = self._executor.submit(self._compress, path)
+            self._pending[base_filename] = future
+        return future
+
+    def wait(self, base_filename: Optional[str] = None) -> None:
+        """
+        Block until the pending compression of the backup of
+        ``base_filename`` (or of every log, if not given) has finished.
+        """
+        with self._lock:
+            if base_filename is None:
+                futures = list(self._pending.values())
+                self._pending.clear()
+            else:
+                future = self._pending.pop(base_filename, None)
+                futures = [future] if future else []
+        wait_for_futures(futures)
+
+    def _compress(self, path: str) -> None:
+        gz_path = f"{path}.gz"
+        tmp_path = f"{gz_path}.tmp"
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, gz_path)
+        os.remove(path)
+        self.enforce_budget()
+
+    def enforce_budget(self) -> list[Path]:
+        """
+        Remove the oldest backups of the registered logs until their total
+        size (including that of the logs themselves) is within budget.
+
+        :returns: The paths of the removed backups.
+        """
+        if not self.budget:
+            return []
+        with self._lock:
+            base_filenames = list(self._base_filenames)
+        total = 0
+        backups = []
+        for base_filename in base_filenames:
+            base = Path(base_filename)
+            for path in [base, *base.parent.glob(f"{base.name}.*")]:
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                total += stat.st_size
+                if path != base:
+                    backups.append((stat.st_mtime, stat.st_size, path))
+        removed = []
+        for _, size, path in sorted(backups):
+            if total <= self.budget:
+                break
+            path.unlink(missing_ok=True)
+            removed.append(path)
+            total -= size
+        return removed
+
+
+LOG_COMPRESSOR = LogCompressor()
+
+
+class _CompressingRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler whose backups are gzip-compressed (and kept within
+    the global disk budget) by ``LOG_COMPRESSOR``.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:  # type: ignore
+        super().__init__(*args, **kwargs)
+        LOG_COMPRESSOR.register(self.baseFilename)
+
+    def rotation_filename(self, default_name: str) -> str:
+        return f"{default_name}.gz"
+
+    def rotate(self, source: str, dest: str) -> None:
+        if not os.path.exists(source):
+            return
+        # Move the log aside (without the ".gz" suffix) straight away so that
+        # logging can continue while the backup is compressed.
+        path = dest.removesuffix(".gz")
+        os.replace(source, path)
+        LOG_COMPRESSOR.compress(self.baseFilename, path)
+
+    def doRollover(self) -> None:
+        # The previous backup must be compressed before it can be shifted.
+        LOG_COMPRESSOR.wait(self.baseFilename)
+        super().doRollover()
+
+
+class _FlushMarker:
+    """
+    Placed on a LogQueue so that the listener can signal when every record
+    queued before it has been written.
+    """
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+
+
+class _BatchingQueueListener(QueueListener):
+    """
+    A QueueListener that dispatches each (handler, record) pair to its
+    handler, flushing the handlers written to whenever the queue empties.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self._unflushed: set[logging.Handler] = set()
+
+    def handle(self, record: logging.LogRecord) -> None:
+        if isinstance(record, _FlushMarker):
+            self.flush()
+            record.event.set()
+            return
+        handler, record = record  # type: ignore
+        handler.handle(record)
+        self._unflushed.add(handler)
+        if self.queue.empty():
+            self.flush()
+
+    def flush(self) -> None:
+        for handler in self._unflushed:
+            if isinstance(handler, _BatchedRotatingFileHandler):
+                handler.flush_batch()
+            else:
+                handler.flush()
+        self._unflushed.clear()
+
+    def enqueue_sentinel(self) -> None:
+        # Block (rather than raise queue.Full) if the queue is full
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        super().stop()
+        self.flush()
+
+
+class _BatchedCompressingRotatingFileHandler(
+    _BatchedRotatingFileHandler, _CompressingRotatingFileHandler
+):
+    pass
+
+
+class _TargetQueueHandler(QueueHandler):
+    """
+    A QueueHandler that enqueues records -- paired with the handler that
+    should eventually write them -- without blocking; records that do not
+    fit in the queue are dropped and counted.
+    """
+
+    def __init__(self, log_queue: LogQueue, target: logging.Handler) -> None:
+        super().__init__(log_queue.queue)
+        self.log_queue = log_queue
+        self.target = target
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait((self.target, record))  # type: ignore
+        except queue.Full:
+            self.log_queue.record_dropped(record)
+
+
+class LogQueue:
+    """
+    A bounded queue of log records and a single background thread that
+    writes them out in batches, keeping disk latency off of the thread
+    doing the logging.
+
+    :ivar dropped: The number of records dropped (because the queue was
+        full), by logger name.
+    """
+
+    def __init__(self, maxsize: int = LOGGING_QUEUE_SIZE) -> None:
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.dropped: Counter[str] = Counter()
+        self._listener: Optional[_BatchingQueueListener] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = _BatchingQueueListener(self.queue)
+            self._listener.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._listener is None:
+                return
+            self._listener.stop()
+            self._listener = None
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Block until every record queued so far (but not those queued
+        afterwards) has been written, or until ``timeout`` seconds pass.
+
+        :return: Whether the records were written within ``timeout``.
+        """
+        if self._listener is None:
+            return True
+        marker = _FlushMarker()
+        try:
+            self.queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.event.wait(timeout)
+
+    def handler(self, target: logging.Handler) -> QueueHandler:
+        """
+        Return a handler that queues records to be written by ``target``.
+        """
+        self.start()
+        return _TargetQueueHandler(self, target)
+
+    def record_dropped(self, record: logging.LogRecord) -> None:
+        if not self.dropped:
+            logging.warning(
+                "Log queue full; dropping messages from %s", record.name
+            )
+        self.dropped[record.name] += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": sum(self.dropped.values()),
+        }
+
+
+LOG_QUEUE = LogQueue()
 
 
 def make_file_logger(
@@ -36,7 +355,15 @@ def make_file_logger(
     backup_count: int = LOGGING_BACKUP_COUNT,
     fmt: Optional[str] = "%(asctime)s %(levelname)s %(funcName)s %(message)s",
     use_null_handler: bool = False,
+    queued: bool = False,
+    compress: bool = False,
 ) -> logging.Logger:
+    """
+    :param queued: Whether records should be written by the background
+        ``LOG_QUEUE`` thread rather than by the thread doing the logging.
+    :param compress: Whether rotated backups should be gzip-compressed (in
+        the background) and counted against ``LOGGING_DISK_BUDGET``.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
     logger.propagate = False
@@ -49,15 +376,28 @@ def make_file_logger(
     handler: Union[logging.NullHandler, RotatingFileHandler]
     if use_null_handler or not LOGGING_ENABLED:
         handler = logging.NullHandler()
+        queued = False
     else:
-        handler = RotatingFileHandler(
+        handler_class: type[RotatingFileHandler]
+        if queued and compress:
+            handler_class = _BatchedCompressingRotatingFileHandler
+        elif queued:
+            handler_class = _BatchedRotatingFileHandler
+        elif compress:
+            handler_class = _CompressingRotatingFileHandler
+        else:
+            handler_class = RotatingFileHandler
+        handler = handler_class(
             Path(LOGS_PATH, f"{name}.log"),
             maxBytes=max_bytes,
             backupCount=backup_count,
         )
     if fmt:
         handler.setFormatter(LogFormatter(fmt=fmt))
-    logger.addHandler(handler)
+    if queued:
+        logger.addHandler(LOG_QUEUE.handler(handler))
+    else:
+        logger.addHandler(handler)
     return logger
 
 
@@ -80,13 +420,150 @@ def initialize_logger(
     logging.debug("Hello World!")
 
 
-def read_log(path: Optional[Path] = None) -> str:
+def iter_log_paths(path: Path, include_backups: bool = True) -> Iterator[Path]:
+    """
+    Lazily yield ``path`` followed by its rotated backups (as created by
+    RotatingFileHandler, and possibly compressed), from newest to oldest.
+    """
+    yield path
+    if not include_backups:
+        return
+    for i in count(1):
+        backup = Path(f"{path}.{i}")
+        if not backup.exists():
+            backup = Path(f"{backup}.gz")
+            if not backup.exists():
+                return
+        yield backup
+
+
+def _iter_buffer_lines_reversed(
+    buf: Union[bytes, mmap.mmap],
+) -> Iterator[bytes]:
+    end = len(buf)
+    while end > 0:
+        start = buf.rfind(b"\n", 0, end - 1) + 1
+        yield buf[start:end]
+        end = start
+
+
+def iter_lines_reversed(path: Path) -> Iterator[bytes]:
+    """
+    Yield the lines of the file at ``path`` (each including its trailing
+    newline, if any) from last to first.
+
+    The file is memory-mapped and scanned backwards, so reading the last N
+    lines costs O(N) irrespective of the size of the file. Compressed (".gz")
+    backups are decompressed into memory first.
+    """
+    if path.suffix == ".gz":
+        try:
+            data = gzip.decompress(path.read_bytes())
+        except FileNotFoundError:
+            return
+        yield from _iter_buffer_lines_reversed(data)
+        return
+    try:
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped
+                return
+    except FileNotFoundError:
+        # The backup may have been compressed since it was found
+        compressed = Path(f"{path}.gz")
+        if compressed.exists():
+            yield from iter_lines_reversed(compressed)
+        return
+    with mm:
+        yield from _iter_buffer_lines_reversed(mm)
+
+
+def iter_log_lines_reversed(
+    path: Optional[Path] = None, include_backups: bool = True
+) -> Iterator[str]:
+    """
+    Yield the lines of a log (and, optionally, its rotated backups) from
+    newest to oldest, without reading any more of the log than is consumed.
+    """
     if path is None:
         path = Path(LOGS_PATH, f"{APP_NAME}.log")
+    for log_path in iter_log_paths(path, include_backups):
+        for line in iter_lines_reversed(log_path):
+            yield line.decode("utf-8", errors="replace")
+
+
+def _line_timestamp(line: bytes) -> Optional[float]:
+    """
+    Return the time at which a log line was written, if it can be
+    determined: either from a leading ISO 8601 timestamp (as written by
+    LogFormatter) or from the "timestamp" field of an eliot message.
+    """
+    if line.startswith(b"{"):
+        try:
+            timestamp = json.loads(line).get("timestamp")
+        except (ValueError, AttributeError):
+            return None
+        return timestamp if isinstance(timestamp, (int, float)) else None
     try:
-        return path.read_text("utf-8")
-    except FileNotFoundError:
-        return ""
+        return datetime.fromisoformat(
+            line.split(b" ", 1)[0].decode("ascii")
+        ).timestamp()
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def read_log(
+    path: Optional[Path] = None,
+    tail_bytes: int = 0,
+    since: Optional[datetime] = None,
+    include_backups: bool = False,
+) -> str:
+    """
+    Return the contents of the log at ``path`` (or of the application log).
+
+    :param tail_bytes: If non-zero, read at most this many bytes from the end
+        of the log, starting at the first complete line.
+    :param since: If given, only return the lines logged at or after this
+        time. Lines without a timestamp of their own (e.g., tracebacks) are
+        considered part of the timestamped line before them.
+    :param include_backups: Whether to include rotated backups of the log.
+    """
+    if path is None:
+        path = Path(LOGS_PATH, f"{APP_NAME}.log")
+    if not tail_bytes and since is None and not include_backups:
+        try:
+            return path.read_text("utf-8")
+        except FileNotFoundError:
+            return ""
+    cutoff = since.timestamp() if since is not None else None
+    lines: list[bytes] = []
+    pending: list[bytes] = []  # Lines awaiting a timestamped line
+    remaining = tail_bytes
+    for log_path in iter_log_paths(path, include_backups):
+        for line in iter_lines_reversed(log_path):
+            if tail_bytes:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+            if cutoff is None:
+                lines.append(line)
+                continue
+            pending.append(line)
+            timestamp = _line_timestamp(line)
+            if timestamp is None:
+                continue
+            if timestamp < cutoff:
+                break
+            lines.extend(pending)
+            pending.clear()
+        else:
+            continue
+        break
+    else:
+        # Reached the start of the log without finding an older line
+        lines.extend(pending)
+    return b"".join(reversed(lines)).decode("utf-8", errors="replace")
 
 
 class MultiFileLogger:
@@ -102,15 +579,36 @@ class MultiFileLogger:
         name = f"{self.basename}.{logger_name}"
         logger = self._loggers.get(name)
         if not logger:
+            kwargs = {
+                "backup_count": (
+                    LOGGING_COMPRESSED_BACKUP_COUNT
+                    if LOGGING_COMPRESS
+                    else LOGGING_BACKUP_COUNT
+                ),
+                "queued": LOGGING_QUEUED,
+                "compress": LOGGING_COMPRESS,
+            }
             if omit_fmt:
-                logger = make_file_logger(name, fmt=None)
+                logger = make_file_logger(name, fmt=None, **kwargs)
             else:
-                logger = make_file_logger(name)
+                logger = make_file_logger(name, **kwargs)
             self._loggers[name] = logger
         logger.debug(message)
 
-    def read_log(self, logger_name: str) -> str:
-        return read_log(Path(LOGS_PATH, f"{self.basename}.{logger_name}.log"))
+    def read_log(
+        self,
+        logger_name: str,
+        tail_bytes: int = 0,
+        since: Optional[datetime] = None,
+        include_backups: bool = False,
+    ) -> str:
+        LOG_QUEUE.flush()
+        return read_log(
+            Path(LOGS_PATH, f"{self.basename}.{logger_name}.log"),
+            tail_bytes,
+            since,
+            include_backups,
+        )
 
 
 class NullLogger:
@@ -120,6 +618,10 @@ class NullLogger:
         pass
 
     def read_log(  # pylint: disable=unused-argument
-        self, logger_name: str
+        self,
+        logger_name: str,
+        tail_bytes: int = 0,
+        since: Optional[datetime] = None,
+        include_backups: bool = False,
     ) -> str:
         return ""
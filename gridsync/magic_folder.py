@@ -4,17 +4,25 @@ import json
 import logging
 import os
 import sqlite3
+import time
+from array import array
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional, Union, cast
 
 import treq
-from qtpy.QtCore import QObject, Signal
+from qtpy.QtCore import QObject, Signal, Slot
 from twisted.internet import reactor
-from twisted.internet.defer import Deferred, DeferredList
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    DeferredSemaphore,
+    FirstError,
+)
 from twisted.internet.error import ConnectionRefusedError as ConnectionRefused
-from twisted.internet.task import deferLater
+from twisted.internet.task import LoopingCall
+from twisted.web.client import HTTPConnectionPool
 
 if TYPE_CHECKING:
     from gridsync.tahoe import Tahoe  # pylint: disable=cyclic-import
@@ -30,9 +38,11 @@ from gridsync.magic_folder_events import (
     MagicFolderEventsMonitor,
     MagicFolderStatus,
 )
+from gridsync.metrics import RequestMetrics, endpoint_name
 from gridsync.msg import critical
 from gridsync.supervisor import Supervisor
 from gridsync.system import SubprocessProtocol, which
+from gridsync.util import CoalescingScheduler
 from gridsync.watchdog import Watchdog
 
 
@@ -122,19 +132,40 @@ class MagicFolderMonitor(QObject):
 
     total_folders_size_updated = Signal(object)  # "object" avoids overflows
 
-    def __init__(self, magic_folder: MagicFolder) -> None:
+    def __init__(
+        self,
+        magic_folder: MagicFolder,
+        reconcile_interval: int = 60,
+        min_check_interval: float = 0.5,
+    ) -> None:
         super().__init__()
         self.magic_folder = magic_folder
+        # How often (in seconds) to fetch the full file-status of every
+        # folder, as a safety net for anything missed by the incremental
+        # updates applied from status events.
+        self.reconcile_interval = reconcile_interval
 
         self.running: bool = False
 
         self._known_folders: dict[str, dict] = {}
         self._known_backups: list[str] = []
 
+        # folder_name -> relpath -> file status
+        self._file_index: dict[str, dict[str, dict]] = {}
         self._folder_sizes: dict[str, int] = {}
+        self._folder_mtimes: dict[str, int] = {}
         self._total_folders_size: int = 0
 
         self._watchdog = MagicFolderWatchdog(self.magic_folder)
+        # Checks are requested from several event handlers at once; run
+        # at most one at a time and fold any requests made in the meantime
+        # into a single follow-up check.
+        self.check_scheduler = CoalescingScheduler(
+            reactor, self._do_check, min_check_interval
+        )
+        self._reconcile_timer = LoopingCall(
+            lambda: Deferred.fromCoroutine(self._reconcile())
+        )
 
         self.event_handler = MagicFolderEventHandler()
         self.events_monitor = MagicFolderEventsMonitor(self.event_handler)
@@ -145,9 +176,8 @@ class MagicFolderMonitor(QObject):
         self.event_handler.folder_removed.connect(
             lambda _: Deferred.fromCoroutine(self.do_check())
         )
-        self.event_handler.folder_status_changed.connect(
-            lambda f, s: Deferred.fromCoroutine(self.do_check())
-        )
+        self.event_handler.upload_finished.connect(self.on_file_synced)
+        self.event_handler.download_finished.connect(self.on_file_synced)
 
     def compare_folders(
         self,
@@ -166,6 +196,9 @@ class MagicFolderMonitor(QObject):
             if folder not in current_folders:
                 magic_path = data.get("magic_path", "")
                 self._watchdog.remove_watch(magic_path)
+                self._file_index.pop(folder, None)
+                self._folder_sizes.pop(folder, None)
+                self._folder_mtimes.pop(folder, None)
 
     def compare_backups(
         self, current_backups: list[str], previous_backups: list[str]
@@ -183,61 +216,61 @@ class MagicFolderMonitor(QObject):
     @staticmethod
     def _parse_file_status(
         file_status: list[dict], magic_path: str
-    ) -> tuple[dict[str, dict], list[int], int, int]:
+    ) -> tuple[dict[str, dict], int, int]:
         files = {}
-        sizes = []
+        total_size = 0
         latest_mtime = 0
         for item in file_status:
             relpath = item.get("relpath", "")
             item["path"] = str(Path(magic_path, relpath).resolve())
             files[relpath] = item
-            size = int(item.get("size") or 0)  # XXX "size" is None if deleted
-            sizes.append(size)
+            # XXX "size" is None if deleted
+            total_size += int(item.get("size") or 0)
             mtime = item.get("last-updated", 0)
             if mtime > latest_mtime:
                 latest_mtime = mtime
-        total_size = sum(sizes)
-        return files, sizes, total_size, latest_mtime
+        return files, total_size, latest_mtime
+
+    def _compare_file(
+        self, folder_name: str, status: dict, prev_status: Optional[dict]
+    ) -> None:
+        if prev_status is None:
+            self.file_added.emit(folder_name, status)
+            return
+        modified = False
+        if status.get("mtime") != prev_status.get("mtime", 0):
+            modified = True
+            self.file_mtime_updated.emit(folder_name, status)
+        if status.get("size") != prev_status.get("size", 0):
+            modified = True
+            self.file_size_updated.emit(folder_name, status)
+        if modified:
+            self.file_modified.emit(folder_name, status)
+
+    def _update_folder_totals(
+        self, folder_name: str, total_size: int, latest_mtime: int
+    ) -> None:
+        if total_size != self._folder_sizes.get(folder_name, 0):
+            self.folder_size_updated.emit(folder_name, total_size)
+        if latest_mtime != self._folder_mtimes.get(folder_name, 0):
+            self.folder_mtime_updated.emit(folder_name, latest_mtime)
+        self._folder_sizes[folder_name] = total_size
+        self._folder_mtimes[folder_name] = latest_mtime
 
     def _compare_file_status(
-        self,
-        folder_name: str,
-        magic_path: str,
-        file_status: list[dict],
-        previous_file_status: list[dict],
+        self, folder_name: str, magic_path: str, file_status: list[dict]
     ) -> None:
-        current = self._parse_file_status(file_status, magic_path)
-        current_files, _, current_total_size, current_latest_mtime = current
-        previous = self._parse_file_status(previous_file_status, magic_path)
-        prev_files, _, prev_total_size, prev_latest_mtime = previous
-
-        for file, status in current_files.items():
-            if file not in prev_files:
-                self.file_added.emit(folder_name, status)
-            else:
-                prev_status = prev_files.get(file, {})
-                prev_size = prev_status.get("size", 0)
-                prev_mtime = prev_status.get("mtime", 0)
-                size = status.get("size")
-                mtime = status.get("mtime")
-                modified = False
-                if mtime != prev_mtime:
-                    modified = True
-                    self.file_mtime_updated.emit(folder_name, status)
-                if size != prev_size:
-                    modified = True
-                    self.file_size_updated.emit(folder_name, status)
-                if modified:
-                    self.file_modified.emit(folder_name, status)
-        for file, status in prev_files.items():
-            if file not in prev_files:
+        files, total_size, latest_mtime = self._parse_file_status(
+            file_status, magic_path
+        )
+        prev_files = self._file_index.get(folder_name, {})
+        for relpath, status in files.items():
+            self._compare_file(folder_name, status, prev_files.get(relpath))
+        for relpath, status in prev_files.items():
+            if relpath not in files:
                 self.file_removed.emit(folder_name, status)
-        if current_total_size != prev_total_size:
-            self.folder_size_updated.emit(folder_name, current_total_size)
-        if current_latest_mtime != prev_latest_mtime:
-            self.folder_mtime_updated.emit(folder_name, current_latest_mtime)
-
-        self._folder_sizes[folder_name] = current_total_size
+        self._file_index[folder_name] = files
+        self._update_folder_totals(folder_name, total_size, latest_mtime)
 
     def _check_total_folders_size(self) -> None:
         total = sum(self._folder_sizes.values())
@@ -245,18 +278,64 @@ class MagicFolderMonitor(QObject):
             self._total_folders_size = total
             self.total_folders_size_updated.emit(total)
 
-    def compare_files(
-        self, current_folders: dict, previous_folders: dict
-    ) -> None:
-        for folder_name, data in current_folders.items():
+    def compare_files(self, file_statuses: dict[str, list[dict]]) -> None:
+        for folder_name, file_status in file_statuses.items():
             self._compare_file_status(
                 folder_name,
-                data.get("magic_path", ""),
-                data.get("file_status", []),
-                previous_folders.get(folder_name, {}).get("file_status", []),
+                self._known_folders.get(folder_name, {}).get("magic_path", ""),
+                file_status,
             )
         self._check_total_folders_size()
 
+    @Slot(str, str, float)
+    def on_file_synced(
+        self, folder_name: str, relpath: str, timestamp: float
+    ) -> None:
+        """
+        Apply a single upload or download to the file index, without
+        re-fetching the file-status of the whole folder.
+
+        The status events sent by Magic-Folder carry only the relpath, so
+        the new size and mtime are read from the (now in-sync) local file.
+        If the folder has not been indexed yet -- e.g., because it was
+        added after the last check or because an earlier event was missed
+        -- a full check is requested instead.
+        """
+        files = self._file_index.get(folder_name)
+        magic_path = self._known_folders.get(folder_name, {}).get(
+            "magic_path", ""
+        )
+        if files is None or not magic_path:
+            Deferred.fromCoroutine(self._reconcile())
+            return
+        prev_status = files.get(relpath)
+        status = dict(prev_status or {})
+        path = Path(magic_path, relpath)
+        status["relpath"] = relpath
+        status["path"] = str(path.resolve())
+        status["last-updated"] = int(timestamp)
+        try:
+            stat = path.stat()
+        except OSError:  # Deleted
+            status["size"] = None
+        else:
+            status["size"] = stat.st_size
+            status["mtime"] = int(stat.st_mtime)
+        self._compare_file(folder_name, status, prev_status)
+        files[relpath] = status
+
+        prev_size = int((prev_status or {}).get("size") or 0)
+        total_size = (
+            self._folder_sizes.get(folder_name, 0)
+            - prev_size
+            + int(status["size"] or 0)
+        )
+        latest_mtime = max(
+            self._folder_mtimes.get(folder_name, 0), status["last-updated"]
+        )
+        self._update_folder_totals(folder_name, total_size, latest_mtime)
+        self._check_total_folders_size()
+
     async def _get_file_status(
         self, folder_name: str
     ) -> tuple[str, list[dict]]:
@@ -264,13 +343,35 @@ class MagicFolderMonitor(QObject):
         return (folder_name, result)
 
     async def do_check(self) -> None:
-        folders = await self.magic_folder.get_folders()
+        await self.check_scheduler.request()
+
+    async def _do_check(self) -> None:
+        # The folder backups come from Tahoe-LAFS (not Magic-Folder) and the
+        # file-status of each folder only depends on the folder list, so
+        # start all of these requests as early as possible rather than
+        # waiting for each response in turn.
+        backups_d = Deferred.fromCoroutine(
+            self.magic_folder.get_folder_backups()
+        )
+        try:
+            folders = await self.magic_folder.get_folders()
+        except Exception:  # pylint: disable=broad-except
+            backups_d.addErrback(lambda _: None)
+            raise
+        file_statuses_d = DeferredList(
+            [
+                Deferred.fromCoroutine(self._get_file_status(f))
+                for f in folders
+            ],
+            consumeErrors=True,
+        )
+
         current_folders = dict(folders)
         previous_folders = dict(self._known_folders)
         self.compare_folders(current_folders, previous_folders)
         self._known_folders = current_folders
 
-        backups = await self.magic_folder.get_folder_backups()
+        backups = await backups_d
         if backups is None:
             logging.warning("Could not read Magic-Folder backups during check")
         else:
@@ -279,19 +380,19 @@ class MagicFolderMonitor(QObject):
             self.compare_backups(current_backups, previous_backups)
             self._known_backups = current_backups
 
-        results = await DeferredList(
-            [
-                Deferred.fromCoroutine(self._get_file_status(f))
-                for f in current_folders
-            ],
-            consumeErrors=True,
-        )
+        results = await file_statuses_d
+        file_statuses = {}
         for success, result in results:
             if success:  # XXX
                 folder_name, file_status = result
-                current_folders[folder_name]["file_status"] = file_status
-        self.compare_files(current_folders, previous_folders)
-        self._known_folders = current_folders
+                file_statuses[folder_name] = file_status
+        self.compare_files(file_statuses)
+
+    async def _reconcile(self) -> None:
+        try:
+            await self.do_check()
+        except Exception as exc:  # pylint: disable=broad-except
+            logging.warning("Error checking Magic-Folder state: %s", str(exc))
 
     def start(self) -> None:
         self.events_monitor.start(
@@ -299,11 +400,13 @@ class MagicFolderMonitor(QObject):
         )
         self._watchdog.start()
         self.running = True
-        # XXX Something should wait on the result
-        Deferred.fromCoroutine(self.do_check())
+        if not self._reconcile_timer.running:
+            self._reconcile_timer.start(self.reconcile_interval, now=True)
 
     def stop(self) -> None:
         self.running = False
+        if self._reconcile_timer.running:
+            self._reconcile_timer.stop()
         self._watchdog.stop()
         self.events_monitor.stop()
 
@@ -314,10 +417,20 @@ class MagicFolder:
         gateway: Tahoe,
         executable: Optional[str] = "",
         enable_logging: bool = True,
+        max_connections: int = 4,
     ) -> None:
         self.gateway = gateway
         self.executable = executable
 
+        # All requests go to the same (local) API endpoint, so keep a few
+        # connections alive and cap the number of concurrent requests at
+        # the same number so that those connections actually get re-used.
+        self._pool = HTTPConnectionPool(reactor)
+        self._pool.maxPersistentPerHost = max_connections
+        self._request_semaphore = DeferredSemaphore(max_connections)
+        self._running_waiters: list[Deferred[None]] = []
+        self.request_metrics = RequestMetrics()
+
         self.configdir = Path(gateway.nodedir, "private", "magic-folder")
         self.api_port: int = 0
         self.api_token: str = ""
@@ -346,8 +459,8 @@ class MagicFolder:
         else:
             self.logger.log("stderr", line)
 
-    def get_log(self, name: str) -> str:
-        return self.logger.read_log(name)
+    def get_log(self, name: str, tail_bytes: int = 0) -> str:
+        return self.logger.read_log(name, tail_bytes)
 
     def _base_command_args(self) -> list[str]:
         if not self.executable:
@@ -375,6 +488,7 @@ class MagicFolder:
 
     async def stop(self) -> None:
         self.monitor.stop()
+        await self._pool.closeCachedConnections()
         await self.supervisor.stop()
 
     def _read_api_token(self) -> str:
@@ -411,6 +525,10 @@ class MagicFolder:
         self.api_token = self._read_api_token()
         self.api_port = self._read_api_port()
         self.monitor.start()
+        waiting = self._running_waiters
+        self._running_waiters = []
+        for w in waiting:
+            w.callback(None)
 
     async def start(self) -> None:
         logging.debug("Starting magic-folder...")
@@ -444,8 +562,26 @@ class MagicFolder:
         logging.debug("Started magic-folder")
 
     async def await_running(self) -> None:
-        while not self.monitor.running:  # XXX
-            await deferLater(reactor, 0.2, lambda: None)  # type: ignore
+        if self.monitor.running:
+            return
+        waiting: Deferred[None] = Deferred()
+        self._running_waiters.append(waiting)
+        await waiting
+
+    async def _send(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[int, bytes]:
+        resp = await treq.request(
+            method,
+            f"http://127.0.0.1:{self.api_port}{path}",
+            headers={"Authorization": f"Bearer {self.api_token}"},
+            data=body,
+            pool=self._pool,
+        )
+        # Always consume the body so that the connection can be returned
+        # to the pool and re-used.
+        content = await treq.content(resp)
+        return resp.code, content
 
     async def _request(
         self,
@@ -459,37 +595,30 @@ class MagicFolder:
             raise MagicFolderWebError("API token not found")
         if not self.api_port:
             raise MagicFolderWebError("API port not found")
+        await self._request_semaphore.acquire()
+        # Only time the request itself, not how long it waited for a slot.
+        time_started = time.monotonic()
         try:
-            resp = await treq.request(
-                method,
-                f"http://127.0.0.1:{self.api_port}{path}",
-                headers={"Authorization": f"Bearer {self.api_token}"},
-                data=body,
-            )
-        except (ConnectionRefusedError, ConnectionRefused):
-            self.api_port = self._read_api_port()
-            resp = await treq.request(
-                method,
-                f"http://127.0.0.1:{self.api_port}{path}",
-                headers={"Authorization": f"Bearer {self.api_token}"},
-                data=body,
-            )
-        if resp.code == 401:
-            # From https://github.com/LeastAuthority/magic-folder/blob/
-            # main/docs/interface.rst: "The token value is periodically
-            # rotated so clients must be prepared to receive an
-            # Unauthorized response even when supplying the token. In
-            # this case, the client should re-read the token from the
-            # filesystem to determine if the value held in memory has
-            # become stale."
-            self.api_token = self._read_api_token()
-            resp = await treq.request(
-                method,
-                f"http://127.0.0.1:{self.api_port}{path}",
-                headers={"Authorization": f"Bearer {self.api_token}"},
-                data=body,
-            )
-        content = await treq.content(resp)
+            try:
+                code, content = await self._send(method, path, body)
+            except (ConnectionRefusedError, ConnectionRefused):
+                self.api_port = self._read_api_port()
+                code, content = await self._send(method, path, body)
+            if code == 401:
+                # From https://github.com/LeastAuthority/magic-folder/blob/
+                # main/docs/interface.rst: "The token value is periodically
+                # rotated so clients must be prepared to receive an
+                # Unauthorized response even when supplying the token. In
+                # this case, the client should re-read the token from the
+                # filesystem to determine if the value held in memory has
+                # become stale."
+                self.api_token = self._read_api_token()
+                code, content = await self._send(method, path, body)
+        finally:
+            self._request_semaphore.release()
+        self.request_metrics.record(
+            endpoint_name(method, path), time.monotonic() - time_started
+        )
         try:
             json_content = json.loads(content)
         except json.JSONDecodeError:
@@ -501,11 +630,11 @@ class MagicFolder:
                 reason = None
         else:
             reason = None
-        if resp.code in (200, 201) or (resp.code == 404 and error_404_ok):
+        if code in (200, 201) or (code == 404 and error_404_ok):
             return json_content
         raise MagicFolderWebError(
-            f"Error {resp.code} requesting {method} {path}: {content}",
-            code=resp.code,
+            f"Error {code} requesting {method} {path}: {content}",
+            code=code,
             reason=reason,
         )
 
@@ -659,11 +788,34 @@ class MagicFolder:
             f"Expected object sizes as list, instead got {type(sizes)!r}"
         )
 
-    async def get_all_object_sizes(self) -> list[int]:
-        all_sizes = []
+    async def get_all_object_sizes(self, max_concurrency: int = 4) -> array:
+        """
+        Return the sizes of the Tahoe-LAFS objects of every folder, fetching
+        the sizes for up to ``max_concurrency`` folders at once.
+
+        The sizes are collected into an unsigned 64-bit ``array`` rather than
+        a list, since there may be very many of them and they are only ever
+        passed along, as a whole, to ZKAPAuthorizer.calculate_price().
+        """
         folders = await self.get_folders()
-        for folder in folders:
-            sizes = await self.get_object_sizes(folder)
+        semaphore = DeferredSemaphore(max_concurrency)
+        try:
+            results = await DeferredList(
+                [
+                    semaphore.run(
+                        lambda f=folder: Deferred.fromCoroutine(
+                            self.get_object_sizes(f)
+                        )
+                    )
+                    for folder in folders
+                ],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
+        all_sizes = array("Q")
+        for _, sizes in results:
             all_sizes.extend(sizes)
         return all_sizes
 
@@ -702,13 +854,15 @@ class MagicFolder:
             raise ValueError("Collective dircap in folder data is missing")
         if upload_dircap is None:
             raise ValueError("Upload dircap in folder data is missing")
-        await self.rootcap_manager.add_backup(
-            ".magic-folders",
-            f"{folder_name} (collective)",
-            collective_dircap,
-        )
-        await self.rootcap_manager.add_backup(
-            ".magic-folders", f"{folder_name} (personal)", upload_dircap
+        await self.rootcap_manager.add_backups(
+            [
+                (
+                    ".magic-folders",
+                    f"{folder_name} (collective)",
+                    collective_dircap,
+                ),
+                (".magic-folders", f"{folder_name} (personal)", upload_dircap),
+            ]
         )
 
     async def get_folder_backups(self) -> Optional[dict[str, dict]]:
@@ -727,18 +881,10 @@ class MagicFolder:
         return dict(folders)
 
     async def remove_folder_backup(self, folder_name: str) -> None:
-        await DeferredList(
+        await self.rootcap_manager.remove_backups(
             [
-                Deferred.fromCoroutine(
-                    self.rootcap_manager.remove_backup(
-                        ".magic-folders", folder_name + " (collective)"
-                    )
-                ),
-                Deferred.fromCoroutine(
-                    self.rootcap_manager.remove_backup(
-                        ".magic-folders", folder_name + " (personal)"
-                    )
-                ),
+                (".magic-folders", f"{folder_name} (collective)"),
+                (".magic-folders", f"{folder_name} (personal)"),
             ]
         )
         try:
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import bisect
+import math
+import re
+import time
+from collections import defaultdict
+
+# Upper bounds (in seconds) of the latency histogram buckets; the last bucket
+# catches everything slower than the largest finite bound.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    math.inf,
+)
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """
+    Return a label for the web API endpoint targeted by a request, with any
+    capabilities, voucher identifiers and (user-chosen) magic-folder names
+    removed and only the ``t`` operation of the query string kept.
+    """
+    path, _, query = path.partition("?")
+    path = path or "/"
+    path = re.sub(r"/uri/[^?]*", "/uri/{cap}", path)
+    path = re.sub(r"/voucher/[^/]+", "/voucher/{voucher}", path)
+    path = re.sub(r"(/magic-folder/)[^/]+", r"\1{folder}", path)
+    match = re.search(r"(?:^|&)t=([^&]+)", query)
+    if match:
+        path = f"{path}?t={match.group(1)}"
+    return f"{method} {path}"
+
+
+class LatencyHistogram:
+    """
+    A fixed-bucket histogram of request latencies, cheap enough to update on
+    every request.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def mean(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, pct: float) -> float:
+        """
+        Return the upper bound of the bucket containing the given percentile
+        (or the largest latency seen, if that bucket is unbounded).
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class RequestMetrics:
+    """
+    Collect per-endpoint latency histograms (and request rates) for an HTTP
+    API client.
+    """
+
+    def __init__(self) -> None:
+        self.time_started = time.monotonic()
+        self.histograms: defaultdict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self.histograms[endpoint].record(seconds)
+
+    def rate(self, endpoint: str) -> float:
+        """
+        Return the average number of requests per second made to the given
+        endpoint since these metrics started being collected.
+        """
+        elapsed = time.monotonic() - self.time_started
+        if elapsed <= 0 or endpoint not in self.histograms:
+            return 0.0
+        return self.histograms[endpoint].count / elapsed
+
+    def summary(self) -> dict[str, dict]:
+        return {
+            endpoint: dict(histogram.summary(), rate=self.rate(endpoint))
+            for endpoint, histogram in sorted(self.histograms.items())
+        }
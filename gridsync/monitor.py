@@ -2,30 +2,96 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Hashable, Optional, Union
 
 import attr
 from qtpy.QtCore import QObject, Signal
-from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    inlineCallbacks,
+    maybeDeferred,
+)
 from twisted.internet.error import ConnectError
 from twisted.internet.task import LoopingCall
 
+from gridsync import settings
 from gridsync.errors import TahoeWebError
 from gridsync.types_ import TwistedDeferred
+from gridsync.zkap_history import ZKAPHistory
 
 if TYPE_CHECKING:
     from gridsync.tahoe import Tahoe
 
+_monitor_settings = settings.get("monitor", {})
+
+# The bounds, in seconds, of the interval at which each checker polls; the
+# interval doubles (up to the maximum) after every check in which nothing
+# changed and drops back to the minimum when something does.
+GRID_CHECK_MIN_INTERVAL = float(
+    _monitor_settings.get("grid_check_min_interval", 2)
+)
+GRID_CHECK_MAX_INTERVAL = float(
+    _monitor_settings.get("grid_check_max_interval", 60)
+)
+ZKAP_CHECK_MIN_INTERVAL = float(
+    _monitor_settings.get("zkap_check_min_interval", 2)
+)
+ZKAP_CHECK_MAX_INTERVAL = float(
+    _monitor_settings.get("zkap_check_max_interval", 120)
+)
+# How much longer to wait between checks while the window is hidden (unless
+# a checker needs close attention, e.g., while a voucher is being redeemed).
+HIDDEN_INTERVAL_MULTIPLIER = float(
+    _monitor_settings.get("hidden_interval_multiplier", 4)
+)
+
+
+@attr.s
+class AdaptiveInterval:
+    """
+    A polling interval that backs off exponentially while nothing changes.
+
+    :ivar current: The current interval, in seconds.
+    """
+
+    minimum: float = attr.ib(default=2.0)
+    maximum: float = attr.ib(default=60.0)
+    factor: float = attr.ib(default=2.0)
+    current: float = attr.ib(init=False)
+
+    @current.default
+    def _current_default(self) -> float:
+        return self.minimum
+
+    def reset(self) -> float:
+        self.current = self.minimum
+        return self.current
+
+    def backoff(self) -> float:
+        self.current = min(self.current * self.factor, self.maximum)
+        return self.current
+
 
 class GridChecker(QObject):
     connected = Signal()
     disconnected = Signal()
     nodes_updated = Signal(int, int)
     space_updated = Signal(object)
+    grid_status_checked = Signal(int)  # num_connected
 
-    def __init__(self, gateway: Tahoe) -> None:
+    # The number of connection state changes, within the flapping window,
+    # at which the connection is considered to be flapping.
+    flapping_threshold = 2
+    flapping_window = 300
+
+    def __init__(
+        self, gateway: Tahoe, clock: Callable[[], float] = time.monotonic
+    ) -> None:
         super().__init__()
         self.gateway = gateway
         self.num_connected = 0
@@ -33,6 +99,32 @@ class GridChecker(QObject):
         self.num_happy = 0
         self.is_connected = False
         self.available_space = 0
+        self._clock = clock
+        self._transitions: deque[float] = deque(maxlen=self.flapping_threshold)
+
+    def state(self) -> Hashable:
+        return (
+            self.num_connected,
+            self.num_known,
+            self.available_space,
+            self.is_connected,
+        )
+
+    def _record_transition(self) -> None:
+        self._transitions.append(self._clock())
+
+    def is_flapping(self) -> bool:
+        return (
+            len(self._transitions) == self.flapping_threshold
+            and self._clock() - self._transitions[0] <= self.flapping_window
+        )
+
+    def needs_attention(self) -> bool:
+        """
+        Whether the grid should be checked as often as possible; i.e., while
+        it is not (yet) connected or the connection is flapping.
+        """
+        return not self.is_connected or self.is_flapping()
 
     @inlineCallbacks
     def do_check(self) -> TwistedDeferred[None]:
@@ -43,6 +135,7 @@ class GridChecker(QObject):
             num_connected = 0
             num_known = 0
             available_space = 0
+        self.grid_status_checked.emit(num_connected)
         if available_space != self.available_space:
             self.available_space = available_space
             self.space_updated.emit(available_space)
@@ -54,10 +147,12 @@ class GridChecker(QObject):
             if num_happy and num_connected >= num_happy:
                 if not self.is_connected:
                     self.is_connected = True
+                    self._record_transition()
                     self.connected.emit()
             elif num_happy and num_connected < num_happy:
                 if self.is_connected:
                     self.is_connected = False
+                    self._record_transition()
                     self.disconnected.emit()
             self.num_connected = num_connected
             self.num_known = num_known
@@ -87,6 +182,127 @@ class _VoucherParse:
     zkaps_last_redeemed: str = attr.ib()
 
 
+@attr.s
+class _VoucherIndex:
+    """
+    The state of each of the vouchers known to ZKAPAuthorizer, updated
+    incrementally so that only those vouchers whose state has changed since
+    the previous update need to be examined again.
+
+    :ivar time_started: See ``_parse_vouchers``.
+    """
+
+    time_started: datetime = attr.ib()
+    total_tokens: int = attr.ib(default=0)
+    unpaid_vouchers: set[str] = attr.ib(factory=set)
+    redeeming_vouchers: set[str] = attr.ib(factory=set)
+    zkaps_last_redeemed: str = attr.ib(default="")
+    # The last-seen state of each voucher, by voucher number.
+    _states: dict[str, dict] = attr.ib(factory=dict)
+    # The token count and "finished" time of each redeemed voucher.
+    _redeemed: dict[str, tuple[int, str]] = attr.ib(factory=dict)
+    # Whether each voucher was created after ``time_started``; a voucher's
+    # creation time never changes so it need only be parsed once.
+    _created_since_start: dict[str, bool] = attr.ib(factory=dict)
+
+    def _created_after_start(self, voucher: dict) -> Optional[bool]:
+        number = voucher["number"]
+        cached = self._created_since_start.get(number)
+        if cached is not None:
+            return cached
+        created = voucher["created"]
+        if created is None:
+            return None
+        time_created = datetime.fromisoformat(created)
+        time_started = self.time_started.astimezone(tz=time_created.tzinfo)
+        result = self._created_since_start[number] = (
+            time_created > time_started
+        )
+        return result
+
+    def _forget(self, number: str) -> bool:
+        """
+        Remove the contribution of the voucher ``number``.
+
+        :return: Whether ``zkaps_last_redeemed`` must be recomputed.
+        """
+        self.unpaid_vouchers.discard(number)
+        self.redeeming_vouchers.discard(number)
+        redeemed = self._redeemed.pop(number, None)
+        if redeemed is None:
+            return False
+        tokens, finished = redeemed
+        self.total_tokens -= tokens
+        return finished == self.zkaps_last_redeemed
+
+    def _add(self, voucher: dict) -> None:
+        number = voucher["number"]
+        state = voucher["state"]
+        name = state["name"]
+        if name == "unpaid":  # or "redeeming"?
+            # XXX There is no reliable way of knowing whether the user
+            # intends to pay for an older voucher -- i.e., one that
+            # was created before the application started --
+            # so ignore those older vouchers for now and only monitor
+            # those vouchers that were created during *this* run.
+            if self._created_after_start(voucher):
+                self.unpaid_vouchers.add(number)
+        elif name == "redeeming" and state.get("counter", 0):
+            self.redeeming_vouchers.add(number)
+        elif name == "redeemed":
+            tokens = state["token-count"]
+            finished = state["finished"]
+            self._redeemed[number] = (tokens, finished)
+            self.total_tokens += tokens
+            self.zkaps_last_redeemed = max(self.zkaps_last_redeemed, finished)
+
+    def update(self, vouchers: list[dict]) -> tuple[bool, bool]:
+        """
+        Bring the index up to date with ``vouchers``, re-examining only those
+        vouchers that are new or whose state has changed and dropping those
+        that are no longer present.
+
+        :param vouchers: See ``_parse_vouchers``.
+
+        :return: A two-tuple of whether the set of unpaid vouchers and the
+            set of redeeming vouchers (respectively) changed.
+        """
+        unpaid_before = frozenset(self.unpaid_vouchers)
+        redeeming_before = frozenset(self.redeeming_vouchers)
+        recompute_last_redeemed = False
+        seen = set()
+        for voucher in vouchers:
+            number = voucher["number"]
+            seen.add(number)
+            state = voucher["state"]
+            if self._states.get(number) == state:
+                continue
+            recompute_last_redeemed |= self._forget(number)
+            self._add(voucher)
+            self._states[number] = state
+        for number in set(self._states) - seen:
+            recompute_last_redeemed |= self._forget(number)
+            del self._states[number]
+            self._created_since_start.pop(number, None)
+        if recompute_last_redeemed:
+            self.zkaps_last_redeemed = max(
+                (finished for _, finished in self._redeemed.values()),
+                default="",
+            )
+        return (
+            self.unpaid_vouchers != unpaid_before,
+            self.redeeming_vouchers != redeeming_before,
+        )
+
+    def parse(self) -> _VoucherParse:
+        return _VoucherParse(
+            self.total_tokens,
+            sorted(self.unpaid_vouchers),
+            sorted(self.redeeming_vouchers),
+            self.zkaps_last_redeemed,
+        )
+
+
 def _parse_vouchers(
     vouchers: list[dict],
     time_started: datetime,
@@ -108,39 +324,9 @@ def _parse_vouchers(
     :return: A summary of the state of the vouchers and the number of tokens
         available.
     """
-    total = 0
-    zkaps_last_redeemed = ""
-    unpaid_vouchers = set()
-    redeeming_vouchers = set()
-    for voucher in vouchers:
-        number = voucher["number"]
-        state = voucher["state"]
-        name = state["name"]
-        if name == "unpaid":  # or "redeeming"?
-            # XXX There is no reliable way of knowing whether the user
-            # intends to pay for an older voucher -- i.e., one that
-            # was created before the application started --
-            # so ignore those older vouchers for now and only monitor
-            # those vouchers that were created during *this* run.
-            created = voucher["created"]
-            if created is None:
-                continue
-            time_created = datetime.fromisoformat(created)
-            time_started = time_started.astimezone(tz=time_created.tzinfo)
-            if time_created > time_started:
-                unpaid_vouchers.add(number)
-        elif name == "redeeming" and state.get("counter", 0):
-            redeeming_vouchers.add(number)
-        elif name == "redeemed":
-            total += state["token-count"]
-            finished = state["finished"]
-            zkaps_last_redeemed = max(zkaps_last_redeemed, finished)
-    return _VoucherParse(
-        total,
-        sorted(unpaid_vouchers),
-        sorted(redeeming_vouchers),
-        zkaps_last_redeemed,
-    )
+    index = _VoucherIndex(time_started)
+    index.update(vouchers)
+    return index.parse()
 
 
 class ZKAPChecker(QObject):
@@ -159,7 +345,9 @@ class ZKAPChecker(QObject):
         self.gateway = gateway
 
         self._time_started: Optional[datetime] = None
+        self._vouchers: Optional[_VoucherIndex] = None
         self._low_zkaps_warning_shown: bool = False
+        self._history: Optional[ZKAPHistory] = None
 
         self.zkaps_remaining: int = 0
         self.zkaps_total: int = 0
@@ -169,7 +357,38 @@ class ZKAPChecker(QObject):
         self.unpaid_vouchers: list = []
         self.redeeming_vouchers: list = []
 
+    def state(self) -> Hashable:
+        return (
+            self.zkaps_remaining,
+            self.zkaps_total,
+            self.zkaps_last_redeemed,
+            self.zkaps_renewal_cost,
+            tuple(self.unpaid_vouchers),
+            tuple(self.redeeming_vouchers),
+        )
+
+    def needs_attention(self) -> bool:
+        """
+        Whether ZKAPs should be checked as often as possible; i.e., while any
+        voucher is awaiting payment or being redeemed.
+        """
+        return bool(self.unpaid_vouchers or self.redeeming_vouchers)
+
+    @property
+    def history(self) -> ZKAPHistory:
+        """
+        The recorded history of this gateway's ZKAP balance.
+        """
+        if self._history is None:
+            self._history = ZKAPHistory(
+                Path(self.gateway.nodedir, "private", "zkaps", "history")
+            )
+        return self._history
+
     def consumption_rate(self) -> float:
+        rate = self.history.spend_rate(time.time())
+        if rate is not None:
+            return rate
         zkaps_spent = self.zkaps_total - self.zkaps_remaining
         # XXX zkaps_last_redeemed starts as "0" which cannot be parsed as an
         # ISO8601 datetime.
@@ -238,7 +457,8 @@ class ZKAPChecker(QObject):
             ) as f:
                 return int(f.read())
         except FileNotFoundError:
-            return 0
+            last = self.history.last()
+            return last.total if last else 0
 
     def emit_zkaps_updated(self, remaining: int, total: int) -> None:
         used = total - remaining
@@ -283,7 +503,9 @@ class ZKAPChecker(QObject):
         price = p.get("price", 0)
         period = p.get("period", 0)
         self.zkaps_price_updated.emit(price, period)
-        if price and period:
+        if price and period and self.days_remaining_forecast() is None:
+            # Fall back to assuming that the whole balance will be spent
+            # renewing leases until enough history has been recorded.
             seconds_remaining = self.zkaps_remaining / price * period
             self.days_remaining = int(seconds_remaining / 86400)
             self.days_remaining_updated.emit(self.days_remaining)
@@ -321,10 +543,36 @@ class ZKAPChecker(QObject):
             self.zkaps_renewal_cost_updated.emit(count)
             self.zkaps_renewal_cost = count
 
+    def days_remaining_forecast(self) -> Optional[int]:
+        return self.history.days_remaining(time.time())
+
+    def _record_history(self) -> None:
+        """
+        Record the current ZKAP balance and, if enough history has been
+        recorded to forecast it, propagate the number of days until the
+        remaining ZKAPs will have been spent.
+        """
+        if not self.zkaps_total:
+            return
+        self.history.record(
+            time.time(),
+            self.zkaps_remaining,
+            self.zkaps_total,
+            self.zkaps_renewal_cost,
+        )
+        days_remaining = self.days_remaining_forecast()
+        if days_remaining is not None and (
+            days_remaining != self.days_remaining
+        ):
+            self.days_remaining = days_remaining
+            self.days_remaining_updated.emit(days_remaining)
+
     @inlineCallbacks
     def do_check(self) -> TwistedDeferred[None]:
         if self._time_started is None:
             self._time_started = datetime.now(tz=timezone.utc)
+        if self._vouchers is None:
+            self._vouchers = _VoucherIndex(self._time_started)
         if not self.gateway.zkap_auth_required or not self.gateway.nodeurl:
             # Either the node doesn't use ZKAPs or isn't running.
             return
@@ -337,14 +585,17 @@ class ZKAPChecker(QObject):
                 self._maybe_load_last_redeemed()
             else:
                 self.emit_zkaps_updated(self.zkaps_remaining, self.zkaps_total)
-        parse = _parse_vouchers(
-            vouchers,
-            self._time_started,
-        )
-        total = parse.total_tokens
-        self._update_unpaid_vouchers(parse.unpaid_vouchers)
-        self._update_redeeming_vouchers(parse.redeeming_vouchers)
-        self._update_zkaps_last_redeemed(parse.zkaps_last_redeemed)
+        unpaid_changed, redeeming_changed = self._vouchers.update(vouchers)
+        total = self._vouchers.total_tokens
+        if unpaid_changed:
+            self._update_unpaid_vouchers(
+                sorted(self._vouchers.unpaid_vouchers)
+            )
+        if redeeming_changed:
+            self._update_redeeming_vouchers(
+                sorted(self._vouchers.redeeming_vouchers)
+            )
+        self._update_zkaps_last_redeemed(self._vouchers.zkaps_last_redeemed)
 
         try:
             lm = yield self.gateway.zkapauthorizer.get_lease_maintenance()
@@ -357,15 +608,7 @@ class ZKAPChecker(QObject):
         count = lm.get("spending", None)
         self._update_renewal_cost(count)
 
-        # XXX/FIXME: This assumes that leases will be renewed every 27 days.
-        # daily_cost = self.zkaps_renewal_cost / 27
-        # try:
-        #    days_remaining = int(self.zkaps_remaining / daily_cost)
-        # except ZeroDivisionError:
-        #    return
-        # if days_remaining != self.days_remaining:
-        #    self.days_remaining = days_remaining
-        #    self.days_remaining_updated.emit(days_remaining)
+        self._record_history()
         self._maybe_emit_low_zkaps_warning()
 
 
@@ -392,6 +635,7 @@ class Monitor(QObject):
     disconnected = Signal()
     nodes_updated = Signal(int, int)
     space_updated = Signal(object)
+    grid_status_checked = Signal(int)
 
     check_finished = Signal()
 
@@ -405,16 +649,23 @@ class Monitor(QObject):
     redeeming_vouchers_updated = Signal(list)
     low_zkaps_warning = Signal()
 
-    def __init__(self, gateway: Tahoe) -> None:
+    def __init__(
+        self, gateway: Tahoe, clock: Callable[[], float] = time.monotonic
+    ) -> None:
         super().__init__()
         self.gateway = gateway
-        self.timer = LoopingCall(self.do_checks)
+        self.timer = LoopingCall(self._tick)
+        self._clock = clock
+        self.visible = True
 
         self.grid_checker = GridChecker(self.gateway)
         self.grid_checker.connected.connect(self.connected.emit)
         self.grid_checker.disconnected.connect(self.disconnected.emit)
         self.grid_checker.nodes_updated.connect(self.nodes_updated.emit)
         self.grid_checker.space_updated.connect(self.space_updated.emit)
+        self.grid_checker.grid_status_checked.connect(
+            self.grid_status_checked.emit
+        )
 
         self.zkap_checker = ZKAPChecker(self.gateway)
         self.zkap_checker.zkaps_updated.connect(self.zkaps_updated.emit)
@@ -437,12 +688,80 @@ class Monitor(QObject):
             self.low_zkaps_warning.emit
         )
 
+        self.intervals = {
+            "zkap": AdaptiveInterval(
+                ZKAP_CHECK_MIN_INTERVAL, ZKAP_CHECK_MAX_INTERVAL
+            ),
+            "grid": AdaptiveInterval(
+                GRID_CHECK_MIN_INTERVAL, GRID_CHECK_MAX_INTERVAL
+            ),
+        }
+        self._next_check = {"zkap": 0.0, "grid": 0.0}
+        self._checking: set[str] = set()
+
+    def _checkers(self) -> dict[str, Union[ZKAPChecker, GridChecker]]:
+        return {"zkap": self.zkap_checker, "grid": self.grid_checker}
+
+    def set_visible(self, visible: bool) -> None:
+        """
+        Note whether the gateway's state is currently visible to the user;
+        while it isn't, checks are made less often. Becoming visible makes
+        every checker due immediately.
+        """
+        if visible and not self.visible:
+            self._next_check = dict.fromkeys(self._next_check, 0.0)
+        self.visible = visible
+
+    def time_until_check(self, name: str) -> float:
+        """
+        Return the number of seconds until the checker ``name`` is next due.
+        """
+        return max(0.0, self._next_check[name] - self._clock())
+
+    @inlineCallbacks
+    def _check(
+        self, name: str, checker: Union[ZKAPChecker, GridChecker]
+    ) -> TwistedDeferred[None]:
+        before = checker.state()
+        self._checking.add(name)
+        try:
+            yield maybeDeferred(checker.do_check)
+        finally:
+            self._checking.discard(name)
+            interval = self.intervals[name]
+            urgent = checker.needs_attention()
+            if urgent or checker.state() != before:
+                delay = interval.reset()
+            else:
+                delay = interval.backoff()
+            if not self.visible and not urgent:
+                delay *= HIDDEN_INTERVAL_MULTIPLIER
+            self._next_check[name] = self._clock() + delay
+
     @inlineCallbacks
     def do_checks(self) -> TwistedDeferred[None]:
-        yield self.zkap_checker.do_check()
-        yield self.grid_checker.do_check()
+        """
+        Run (concurrently) whichever checks are due and not still running.
+        """
+        now = self._clock()
+        results = yield DeferredList(
+            [
+                self._check(name, checker)
+                for name, checker in self._checkers().items()
+                if name not in self._checking and now >= self._next_check[name]
+            ],
+            consumeErrors=True,
+        )
+        for success, result in results:
+            if not success:
+                logging.warning("Error checking %s: %s", self.gateway, result)
         self.check_finished.emit()
 
+    def _tick(self) -> None:
+        # Don't make the LoopingCall wait for the checks to finish so that
+        # a slow check doesn't hold up the next round of the other one.
+        self.do_checks()
+
     def start(self, interval: int = 2) -> None:
         if not self._started:
             self._started = True
@@ -2,10 +2,16 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from atomicwrites import atomic_write
-from twisted.internet.defer import DeferredLock
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    DeferredLock,
+    DeferredSemaphore,
+    FirstError,
+)
 
 from gridsync import APP_NAME
 from gridsync.errors import UpgradeRequiredError
@@ -43,6 +49,8 @@ class RootcapManager:
         self.gateway = gateway
         self.basedir = basedir
         self.lock = DeferredLock()
+        # The maximum number of directories to list at once when importing
+        self.max_concurrent_requests: int = 8
         self._rootcap_path = Path(gateway.nodedir, "private", "rootcap")
         self._rootcap: str = ""
         self._basedircap = ""
@@ -145,14 +153,66 @@ class RootcapManager:
         if not backup_cap:
             backup_cap = await self.create_backup_cap(name, basedircap)
             backup_caps[name] = backup_cap
-        self._backup_caps = backup_caps
+        self._backup_caps.update(backup_caps)
         return backup_cap
 
+    async def _get_backup_caps(self, dirnames: list[str]) -> dict[str, str]:
+        """
+        Return the caps of the backup directories ``dirnames``, creating any
+        that are missing.
+        """
+        # The first lookup lists (and caches) every backup directory so that
+        # the rest can be resolved concurrently; only those that are missing
+        # need a request (to create them, under the lock) of their own.
+        await self.get_backup_cap(dirnames[0])
+        try:
+            results = await DeferredList(
+                [
+                    Deferred.fromCoroutine(self.get_backup_cap(dirname))
+                    for dirname in dirnames
+                ],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
+        return {dirname: cap for dirname, (_, cap) in zip(dirnames, results)}
+
     async def add_backup(self, dirname: str, name: str, cap: str) -> None:
-        backup_cap = await self.get_backup_cap(dirname)
+        await self.add_backups([(dirname, name, cap)])
+
+    async def add_backups(
+        self, backups: Iterable[tuple[str, str, str]]
+    ) -> None:
+        """
+        Add many backups at once, linking all of those for the same backup
+        directory in a single request.
+
+        :param backups: ``(dirname, name, cap)`` tuples, with the same
+            meanings as the arguments to add_backup.
+        """
+        children: dict[str, dict[str, str]] = {}
+        for dirname, name, cap in backups:
+            children.setdefault(dirname, {})[name] = cap
+        if not children:
+            return
+        backup_caps = await self._get_backup_caps(list(children))
         await self.lock.acquire()
         try:
-            await self.gateway.link(backup_cap, name, cap)
+            # Each backup directory is a distinct mutable object, so they
+            # can safely be written to concurrently.
+            await DeferredList(
+                [
+                    Deferred.fromCoroutine(
+                        self.gateway.set_children(backup_caps[dirname], names)
+                    )
+                    for dirname, names in children.items()
+                ],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
         finally:
             self.lock.release()
 
@@ -178,10 +238,44 @@ class RootcapManager:
         return ls_output
 
     async def remove_backup(self, dirname: str, name: str) -> None:
-        backup_cap = await self.get_backup_cap(dirname)
+        await self.remove_backups([(dirname, name)])
+
+    async def remove_backups(self, backups: Iterable[tuple[str, str]]) -> None:
+        """
+        Remove many backups at once, looking up each backup directory only
+        once and unlinking from different directories concurrently.
+
+        :param backups: ``(dirname, name)`` tuples, with the same meanings
+            as the arguments to remove_backup.
+        """
+        names: dict[str, list[str]] = {}
+        for dirname, name in backups:
+            names.setdefault(dirname, []).append(name)
+        if not names:
+            return
+        backup_caps = await self._get_backup_caps(list(names))
+
+        async def unlink_all(dirname: str) -> None:
+            # The web API has no way to unlink several children in a single
+            # request and concurrent writes to the same (mutable) directory
+            # would collide, so those are made one after another.
+            for name in names[dirname]:
+                await self.gateway.unlink(
+                    backup_caps[dirname], name, missing_ok=True
+                )
+
         await self.lock.acquire()
         try:
-            await self.gateway.unlink(backup_cap, name, missing_ok=True)
+            await DeferredList(
+                [
+                    Deferred.fromCoroutine(unlink_all(dirname))
+                    for dirname in names
+                ],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
         finally:
             self.lock.release()
 
@@ -203,8 +297,24 @@ class RootcapManager:
         if not src_backupdirs:
             logging.warning("No backups found in imported rootcap")
             return
-        for backupdir_name, backupdir_data in src_backupdirs.items():
-            dir_contents = await self.gateway.ls(backupdir_data["cap"])
+        semaphore = DeferredSemaphore(self.max_concurrent_requests)
+        try:
+            results = await DeferredList(
+                [
+                    semaphore.run(
+                        lambda cap=data["cap"]: Deferred.fromCoroutine(
+                            self.gateway.ls(cap)
+                        )
+                    )
+                    for data in src_backupdirs.values()
+                ],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
+        backups = []
+        for backupdir_name, (_, dir_contents) in zip(src_backupdirs, results):
             if not dir_contents:
                 logging.warning(
                     'Backup directory "%s" is empty; not restoring',
@@ -212,4 +322,5 @@ class RootcapManager:
                 )
                 continue
             for name, data in dir_contents.items():
-                await self.add_backup(backupdir_name, name, data["cap"])
+                backups.append((backupdir_name, name, data["cap"]))
+        await self.add_backups(backups)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from atomicwrites import atomic_write
+from psutil import Process
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    DeferredSemaphore,
+    FirstError,
+    ensureDeferred,
+)
+
+from gridsync import config_dir, settings
+
+T = TypeVar("T")
+
+# The maximum number of gateways that may be starting at the same time.
+MAX_PARALLEL_GATEWAY_STARTS = int(
+    settings.get("startup", {}).get("max_parallel_gateways", 4)
+)
+
+
+class StartupTimer:
+    """
+    Record how long each phase of startup takes.
+
+    :ivar phases: The accumulated duration, in seconds, of each phase, in
+        the order that the phases began.
+    """
+
+    def __init__(self, timer: Callable[[], float] = time.monotonic) -> None:
+        self._timer = timer
+        self.started = timer()
+        self.phases: dict[str, float] = {}
+
+    def record(self, name: str, duration: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self._timer()
+        try:
+            yield
+        finally:
+            self.record(name, self._timer() - started)
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.phase(name):
+            return await awaitable
+
+    def elapsed(self) -> float:
+        return self._timer() - self.started
+
+    def summary(self) -> str:
+        phases = ", ".join(
+            f"{name}: {duration:.3f}s"
+            for name, duration in self.phases.items()
+        )
+        return f"Startup took {self.elapsed():.3f}s ({phases})"
+
+
+def run_concurrently(
+    funcs: Iterable[Callable[[], Awaitable[T]]], max_concurrency: int
+) -> Deferred[list[T]]:
+    """
+    Call each of the given functions, allowing no more than
+    ``max_concurrency`` of the awaitables that they return to be running at
+    once.
+
+    :returns: A Deferred that fires with the results, in order, or with the
+        first failure.
+    """
+
+    async def run() -> list[T]:
+        semaphore = DeferredSemaphore(max_concurrency)
+        try:
+            results = await DeferredList(
+                [
+                    semaphore.run(lambda f=f: ensureDeferred(f()))
+                    for f in funcs
+                ],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
+        return [result for _, result in results]
+
+    return Deferred.fromCoroutine(run())
+
+
+class VersionCache:
+    """
+    The versions of executables, persisted across runs and keyed on each
+    executable's path, modification time and size so that a cached version
+    is discarded as soon as the executable is replaced.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or Path(config_dir, "versions.json")
+        self._versions: Optional[dict[str, dict[str, Any]]] = None
+
+    @staticmethod
+    def _key(executable: str) -> tuple[str, list[int]]:
+        path = os.path.realpath(executable)
+        st = os.stat(path)
+        return path, [st.st_mtime_ns, st.st_size]
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._versions is None:
+            try:
+                self._versions = json.loads(self.path.read_text("utf-8"))
+            except (OSError, ValueError):
+                self._versions = {}
+        return self._versions  # type: ignore
+
+    def get(self, executable: str) -> Optional[str]:
+        try:
+            path, stat = self._key(executable)
+        except OSError:
+            return None
+        entry = self._load().get(path)
+        if entry and entry.get("stat") == stat:
+            return entry.get("version")
+        return None
+
+    def set(self, executable: str, version: str) -> None:
+        path, stat = self._key(executable)
+        versions = self._load()
+        versions[path] = {"stat": stat, "version": version}
+        try:
+            with atomic_write(str(self.path), mode="w", overwrite=True) as f:
+                f.write(json.dumps(versions))
+        except OSError as e:
+            logging.warning("Error saving version cache: %s", str(e))
+
+
+async def get_executable_version(
+    executable: str,
+    probe: Callable[[], Awaitable[str]],
+    cache: Optional[VersionCache] = None,
+) -> str:
+    """
+    Return the version of ``executable``, from ``cache`` if it is known
+    there or, otherwise, by awaiting ``probe`` (and caching the result).
+    """
+    if cache is not None:
+        version = cache.get(executable)
+        if version is not None:
+            return version
+    version = await probe()
+    if cache is not None:
+        cache.set(executable, version)
+    return version
+
+
+class StartupProfiler:
+    """
+    Profile application startup with cProfile, noting when each of a number
+    of milestones (e.g., "reactor started") was reached relative to the
+    creation of the process, and write a report of both to ``path``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.milestones: dict[str, float] = {}
+        self._profile = cProfile.Profile()
+        self._process_created = Process().create_time()
+
+    def start(self) -> None:
+        self.mark("profiling started")
+        self._profile.enable()
+
+    def mark(self, name: str) -> None:
+        if name not in self.milestones:
+            self.milestones[name] = time.time() - self._process_created
+
+    def report(self, limit: int = 50) -> str:
+        lines = ["Milestones (seconds since process creation):"]
+        for name, elapsed in self.milestones.items():
+            lines.append(f"  {elapsed:8.3f}  {name}")
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        lines.extend(["", stream.getvalue()])
+        return "\n".join(lines)
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self.mark("profiling stopped")
+        try:
+            with atomic_write(str(self.path), mode="w", overwrite=True) as f:
+                f.write(self.report())
+        except OSError as e:
+            logging.warning("Error writing startup profile: %s", str(e))
+            return
+        logging.info("Startup profile written to %s", self.path)
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def start_profiling(path: Path) -> StartupProfiler:
+    global _profiler  # pylint: disable=global-statement
+    _profiler = StartupProfiler(path)
+    _profiler.start()
+    return _profiler
+
+
+def mark_startup(name: str) -> None:
+    """
+    Note that startup has reached the milestone ``name`` (if profiling).
+    """
+    if _profiler is not None:
+        _profiler.mark(name)
+
+
+def stop_profiling() -> None:
+    global _profiler  # pylint: disable=global-statement
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import codecs
 import logging
+import re
 import shutil
 import time
-from io import BytesIO
+from functools import lru_cache
 from typing import TYPE_CHECKING, Callable, Optional, Union
 
 from psutil import NoSuchProcess, Process, TimeoutExpired
@@ -90,7 +92,7 @@ def terminate(
     :returns: a Deferred that fires when the process has terminated or been killed.
     """
     # mypy is very confused by zope.interface
-    proc.transport.signalProcess("TERM")  # type:ignore
+    proc.transport.signalProcess("TERM")  # type: ignore
 
     waiting = [proc.when_exited()]
     if kill_after:
@@ -102,9 +104,9 @@ def terminate(
         # the timeout fired (not when_exited())
         logging.debug(
             "Failed to terminate, sending KILL to %i",
-            proc.transport.pid,  # type:ignore
+            proc.transport.pid,  # type: ignore
         )
-        proc.transport.signalProcess("KILL")  # type:ignore
+        proc.transport.signalProcess("KILL")  # type: ignore
         try:
             yield proc.when_exited()
         except Exception:  # pylint: disable=broad-except
@@ -115,6 +117,43 @@ class SubprocessError(Exception):
     pass
 
 
+# The maximum number of bytes of a subprocess's output to retain; once
+# exceeded, the oldest output is discarded (a line at a time).
+MAX_OUTPUT_BYTES = 1_000_000
+
+
+@lru_cache(maxsize=32)
+def _compile_triggers(texts: tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Compile the given trigger texts into a single pattern in which the text
+    at index ``i`` is matched by group ``i + 1``.
+    """
+    if not texts:
+        return None
+    return re.compile("|".join(f"({re.escape(text)})" for text in texts))
+
+
+class _LineFramer:
+    """
+    Incrementally decode a stream of UTF-8 bytes into complete lines,
+    buffering any partial line (or character) until the rest arrives.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def feed(self, data: bytes) -> list[str]:
+        lines = (self._partial + self._decoder.decode(data)).split("\n")
+        self._partial = lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+    def flush(self) -> list[str]:
+        line = (self._partial + self._decoder.decode(b"", True)).rstrip("\r")
+        self._partial = ""
+        return [line] if line else []
+
+
 class SubprocessProtocol(ProcessProtocol):
     def __init__(  # pylint: disable=too-many-arguments
         self,
@@ -123,40 +162,57 @@ class SubprocessProtocol(ProcessProtocol):
         stdout_line_collector: Optional[Callable] = None,
         stderr_line_collector: Optional[Callable] = None,
         on_process_ended: Optional[Callable] = None,
+        max_output_bytes: int = MAX_OUTPUT_BYTES,
     ) -> None:
         self.callback_triggers = callback_triggers
         self.errback_triggers = errback_triggers
         self.stdout_line_collector = stdout_line_collector
         self.stderr_line_collector = stderr_line_collector
         self._on_process_ended = on_process_ended
-        self._output = BytesIO()
+        self.max_output_bytes = max_output_bytes
+        self._output = bytearray()
+        self._framers: dict[int, _LineFramer] = {}
         self.done: Deferred = Deferred()
         # becomes None once we've exited
         self._awaiting_ended: Optional[list[Deferred]] = []
 
+    def _get_output(self) -> str:
+        return self._output.decode("utf-8", errors="replace").strip()
+
+    def _append_output(self, data: bytes) -> None:
+        self._output += data
+        excess = len(self._output) - self.max_output_bytes
+        if self.max_output_bytes and excess > 0:
+            # Discard the oldest output, up to the end of the line it cuts
+            newline = self._output.find(b"\n", excess)
+            del self._output[: newline + 1 if newline >= 0 else excess]
+
+    def _triggers(self) -> list[tuple[str, Optional[type[Exception]]]]:
+        triggers: list[tuple[str, Optional[type[Exception]]]] = []
+        for text in self.callback_triggers or []:
+            if text:
+                triggers.append((text, None))
+        for pair in self.errback_triggers or []:
+            if pair and pair[0] and pair[1]:
+                triggers.append(pair)
+        return triggers
+
     def _check_triggers(self, line: str) -> None:
-        if self.callback_triggers:
-            for text in self.callback_triggers:
-                if text and text in line:
-                    self.done.callback(
-                        self._output.getvalue().decode("utf-8").strip()
-                    )
-        if self.errback_triggers:
-            for pair in self.errback_triggers:
-                if not pair:
-                    continue
-                text, exception = pair
-                if text and exception and text in line:
-                    self.done.errback(
-                        exception(
-                            self._output.getvalue().decode("utf-8").strip()
-                        )
-                    )
+        triggers = self._triggers()
+        pattern = _compile_triggers(tuple(text for text, _ in triggers))
+        if pattern is None:
+            return
+        match = pattern.search(line)
+        if match is None:
+            return
+        _, exception = triggers[match.lastindex - 1]  # type: ignore
+        if exception is None:
+            self.done.callback(self._get_output())
+        else:
+            self.done.errback(exception(self._get_output()))
 
-    def childDataReceived(self, childFD: int, data: bytes) -> None:
-        if not self.done.called:
-            self._output.write(data)
-        for line in data.decode("utf-8").strip().split("\n"):
+    def _lines_received(self, childFD: int, lines: list[str]) -> None:
+        for line in lines:
             if self.stdout_line_collector and childFD == 1:
                 self.stdout_line_collector(line)
             elif self.stderr_line_collector and childFD == 2:
@@ -164,6 +220,19 @@ class SubprocessProtocol(ProcessProtocol):
             if not self.done.called:
                 self._check_triggers(line)
 
+    def childDataReceived(self, childFD: int, data: bytes) -> None:
+        if not self.done.called:
+            self._append_output(data)
+        framer = self._framers.get(childFD)
+        if framer is None:
+            framer = self._framers[childFD] = _LineFramer()
+        self._lines_received(childFD, framer.feed(data))
+
+    def childConnectionLost(self, childFD: int) -> None:
+        framer = self._framers.pop(childFD, None)
+        if framer is not None:
+            self._lines_received(childFD, framer.flush())
+
     def when_exited(self) -> Deferred[None]:
         """
         :returns: a Deferred that fires when this process has exited
@@ -177,8 +246,10 @@ class SubprocessProtocol(ProcessProtocol):
         return d
 
     def processEnded(self, reason: Failure) -> None:
+        for childFD in list(self._framers):
+            self.childConnectionLost(childFD)
         if not self.done.called:
-            output = self._output.getvalue().decode("utf-8").strip()
+            output = self._get_output()
             if isinstance(reason.value, ProcessDone):
                 self.done.callback(output)
             else:
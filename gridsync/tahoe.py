@@ -5,15 +5,24 @@ import logging as log
 import os
 import re
 import shutil
+import time
 from pathlib import Path
-from typing import Optional, Union, cast
+from typing import Callable, Optional, Union, cast
 
 import treq
 import yaml
 from atomicwrites import atomic_write
-from twisted.internet.defer import Deferred
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    DeferredSemaphore,
+    FirstError,
+    succeed,
+)
 from twisted.internet.error import ConnectError
 from twisted.internet.interfaces import IReactorTime
+from twisted.web.client import HTTPConnectionPool
+from twisted.web.iweb import IResponse
 
 from gridsync import APP_NAME, grid_settings
 from gridsync import settings as global_settings
@@ -27,13 +36,26 @@ from gridsync.errors import (
 )
 from gridsync.log import MultiFileLogger, NullLogger
 from gridsync.magic_folder import MagicFolder
+from gridsync.metrics import RequestMetrics, endpoint_name
 from gridsync.monitor import Monitor
 from gridsync.msg import critical
 from gridsync.news import NewscapChecker
 from gridsync.rootcap import RootcapManager
 from gridsync.supervisor import Supervisor
 from gridsync.system import SubprocessProtocol, which
-from gridsync.util import Poller
+from gridsync.transfer import (
+    DOWNLOAD_SEGMENT_SIZE,
+    DownloadJournal,
+    ProgressCallback,
+    UploadProducer,
+    parse_content_range,
+)
+from gridsync.util import (
+    READINESS_MAX_AGE,
+    Poller,
+    ReadinessTracker,
+    TTLCache,
+)
 from gridsync.websocket import WebSocketReaderService
 from gridsync.zkapauthorizer import PLUGIN_NAME as ZKAPAUTHZ_PLUGIN_NAME
 from gridsync.zkapauthorizer import ZKAPAuthorizer
@@ -77,7 +99,6 @@ def get_nodedirs(basedir: str) -> list:
 
 
 class Tahoe:
-
     """
     :ivar zkap_auth_required: ``True`` if the node is configured to use
         ZKAPAuthorizer and spend ZKAPs for storage operations, ``False``
@@ -91,12 +112,14 @@ class Tahoe:
     STARTED = 2
     STOPPING = 3
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         nodedir: str = "",
         executable: str = "",
         reactor: Optional[IReactorTime] = None,
         enable_logging: bool = True,
+        max_persistent_per_host: Optional[int] = None,
+        connection_idle_timeout: Optional[int] = None,
     ) -> None:
         if reactor is None:
             from twisted.internet import reactor as reactor_
@@ -104,6 +127,33 @@ class Tahoe:
             # To avoid mypy "assignment" error ("expression has type Module")
             reactor = cast(IReactorTime, reactor_)
         self._reactor = reactor
+
+        # A single, persistent connection pool for all requests to this
+        # gateway's web API (including those made by ZKAPAuthorizer and
+        # NewscapChecker) so that the periodic polling re-uses connections.
+        http_settings = global_settings.get("http", {})
+        if max_persistent_per_host is None:
+            max_persistent_per_host = int(
+                http_settings.get("max_persistent_per_host", 4)
+            )
+        if connection_idle_timeout is None:
+            connection_idle_timeout = int(
+                http_settings.get("connection_idle_timeout", 240)
+            )
+        self.http_pool = HTTPConnectionPool(reactor)
+        self.http_pool.maxPersistentPerHost = max_persistent_per_host
+        self.http_pool.cachedConnectionTimeout = connection_idle_timeout
+        self.request_metrics = RequestMetrics()
+        # Callables to be called with the method, endpoint name, response
+        # code and duration (in seconds) of every web API request.
+        self.request_hooks: list[Callable[[str, str, int, float], None]] = []
+        # Recent "?t=json" listings, keyed by cap (or cap/path). Entries are
+        # dropped whenever the directory is changed through this object.
+        self.dirnode_cache = TTLCache(
+            ttl=float(http_settings.get("dirnode_cache_ttl", 30)),
+            max_size=int(http_settings.get("dirnode_cache_size", 256)),
+        )
+        self._dirnode_generation = 0
         self.executable = executable
         if nodedir:
             self.nodedir = os.path.expanduser(nodedir)
@@ -132,17 +182,33 @@ class Tahoe:
         self.storage_furl: str = ""
         self.rootcap_manager = RootcapManager(self)
         self.magic_folder = MagicFolder(self)
+        self.magic_folder.monitor.total_folders_size_updated.connect(
+            lambda _: self.zkapauthorizer.invalidate_price()
+        )
 
         self.supervisor = Supervisor(Path(self.pidfile))
 
+        # Readiness is normally pushed in by the GridChecker (which polls the
+        # grid status anyway) and by Magic-Folder "tahoe-connection-changed"
+        # events. The Poller is only used as a fallback when that state is
+        # stale -- e.g., before the Monitor has been started.
         # TODO: Replace with "readiness" API?
         # https://tahoe-lafs.org/trac/tahoe-lafs/ticket/2844
+        self.readiness = ReadinessTracker(reactor)
+        self.monitor.grid_status_checked.connect(self._on_grid_status_checked)
+        self.monitor.check_finished.connect(self._update_readiness_max_age)
+        self.monitor.disconnected.connect(lambda: self.readiness.update(False))
+        self.magic_folder.events.connection_changed.connect(
+            self._on_magic_folder_connection_changed
+        )
+
         async def poll() -> bool:
             ready = await self.is_ready()
             if ready:
                 log.debug('Connected to "%s"', self.name)
             else:
                 log.debug('Connecting to "%s"...', self.name)
+            self.readiness.update(ready)
             return ready
 
         self._ready_poller = Poller(reactor, poll, 0.2)
@@ -155,6 +221,66 @@ class Tahoe:
 
         self._ws_reader: Optional[WebSocketReaderService] = None
 
+    @property
+    def dirnode_generation(self) -> int:
+        """
+        A counter that is incremented whenever a directory is changed
+        through this object.
+        """
+        return self._dirnode_generation
+
+    def invalidate_dirnode(self, cap: str) -> None:
+        """
+        Drop any cached listings of the directory ``cap`` (under either its
+        read-write or read-only form) and of paths beneath it.
+        """
+        self._dirnode_generation += 1
+        caps = {cap}
+        try:
+            caps.add(diminish(cap))
+        except ValueError:
+            pass
+        self.dirnode_cache.discard(
+            lambda key: any(
+                key == c or str(key).startswith(c + "/") for c in caps
+            )
+        )
+
+    def record_request(
+        self, method: str, path: str, code: int, time_started: float
+    ) -> None:
+        """
+        Record the duration of a completed web API request and pass it along
+        to any registered ``request_hooks``.
+        """
+        duration = time.monotonic() - time_started
+        endpoint = endpoint_name(method, path)
+        self.request_metrics.record(endpoint, duration)
+        for hook in self.request_hooks:
+            try:
+                hook(method, endpoint, code, duration)
+            except Exception as e:  # pylint: disable=broad-except
+                log.warning("Error calling request hook: %s", str(e))
+
+    def _on_grid_status_checked(self, num_connected: int) -> None:
+        self.readiness.update(
+            bool(self.shares_happy and num_connected >= self.shares_happy)
+        )
+
+    def _update_readiness_max_age(self) -> None:
+        # The GridChecker backs off while nothing changes (and further still
+        # while the window is hidden), so trust the state it last reported
+        # until a little after its next check is due.
+        self.readiness.max_age = max(
+            READINESS_MAX_AGE,
+            self.monitor.time_until_check("grid") + READINESS_MAX_AGE,
+        )
+
+    def _on_magic_folder_connection_changed(
+        self, _connected: int, _desired: int, happy: bool
+    ) -> None:
+        self.readiness.update(happy)
+
     def _log_stdout_message(self, message: str) -> None:
         self.logger.log("stdout", message)
 
@@ -471,12 +597,13 @@ class Tahoe:
             log.debug("Lock released; resuming stop operation...")
         if not self.is_storage_node():
             await self.magic_folder.stop()
+        await self.http_pool.closeCachedConnections()
         await self.supervisor.stop()
         self.state = Tahoe.STOPPED
         log.debug('Finished stopping "%s" tahoe client', self.name)
 
-    def get_log(self, name: str) -> str:
-        return self.logger.read_log(name)
+    def get_log(self, name: str, tail_bytes: int = 0) -> str:
+        return self.logger.read_log(name, tail_bytes)
 
     def _on_started(self) -> None:
         self.load_settings()
@@ -540,26 +667,28 @@ class Tahoe:
         shutil.copy2(tahoe_cfg, tahoe_cfg_tmp)
 
         config = Config(tahoe_cfg_tmp)
+        with config.transaction():
+            hide_ip = settings.get("hide-ip")
+            if hide_ip:
+                config.set("node", "reveal-ip-address", "false")
 
-        hide_ip = settings.get("hide-ip")
-        if hide_ip:
-            config.set("node", "reveal-ip-address", "false")
+            introducer_furl = settings.get("introducer")
+            if introducer_furl:
+                config.set("client", "introducer.furl", introducer_furl)
 
-        introducer_furl = settings.get("introducer")
-        if introducer_furl:
-            config.set("client", "introducer.furl", introducer_furl)
-
-        shares_needed = settings.get("shares-needed", settings.get("needed"))
-        if shares_needed:
-            config.set("client", "shares.needed", shares_needed)
+            shares_needed = settings.get(
+                "shares-needed", settings.get("needed")
+            )
+            if shares_needed:
+                config.set("client", "shares.needed", shares_needed)
 
-        shares_happy = settings.get("shares-happy", settings.get("happy"))
-        if shares_happy:
-            config.set("client", "shares.happy", shares_happy)
+            shares_happy = settings.get("shares-happy", settings.get("happy"))
+            if shares_happy:
+                config.set("client", "shares.happy", shares_happy)
 
-        shares_total = settings.get("shares-total", settings.get("total"))
-        if shares_total:
-            config.set("client", "shares.total", shares_total)
+            shares_total = settings.get("shares-total", settings.get("total"))
+            if shares_total:
+                config.set("client", "shares.total", shares_total)
 
         servers_yaml = os.path.join(self.nodedir, "private", "servers.yaml")
         servers_yaml_tmp = os.path.join(
@@ -660,8 +789,13 @@ class Tahoe:
         url = self.nodeurl + path
         if "headers" not in kwargs:
             kwargs["headers"] = {"Accept": "text/plain"}
-        resp = await treq.request(method, url, **kwargs)
+        params = kwargs.get("params")
+        if isinstance(params, dict) and "t" in params:
+            path = f"{path}?t={params['t']}"
+        time_started = time.monotonic()
+        resp = await treq.request(method, url, pool=self.http_pool, **kwargs)
         content = await treq.content(resp)
+        self.record_request(method, path, resp.code, time_started)
         content = content.decode("utf-8")
         if resp.code in (200, 201):
             return content
@@ -700,8 +834,23 @@ class Tahoe:
         num_connected, _, _ = status
         return bool(num_connected and num_connected >= self.shares_happy)
 
-    def await_ready(self) -> Deferred[bool]:
-        return self._ready_poller.wait_for_completion()
+    def await_ready(self) -> Deferred[None]:
+        if self.readiness.is_ready():
+            return succeed(None)
+        # Rather than waiting for the next grid check (which may be minutes
+        # away), poll -- feeding the result back into the tracker -- but stop
+        # waiting as soon as readiness is pushed in by some other means.
+        d = DeferredList(
+            [
+                self.readiness.wait_for_ready(),
+                self._ready_poller.wait_for_completion(),
+            ],
+            fireOnOneCallback=True,
+            fireOnOneErrback=True,
+            consumeErrors=True,
+        )
+        d.addCallbacks(lambda _: None, lambda f: f.value.subFailure)
+        return d
 
     async def mkdir(
         self, parentcap: Optional[str] = None, childname: Optional[str] = None
@@ -713,15 +862,35 @@ class Tahoe:
         else:
             path = "/uri"
             params = {"t": "mkdir"}
-        cap = await self._request("POST", path, params=params)
+        try:
+            cap = await self._request("POST", path, params=params)
+        finally:
+            if parentcap and childname:
+                self.invalidate_dirnode(parentcap)
         return cap
 
     async def create_rootcap(self) -> str:
         return await self.rootcap_manager.create_rootcap()
 
-    async def upload(
-        self, local_path: str, dircap: str = "", mutable: bool = False
+    async def upload(  # pylint: disable=too-many-arguments
+        self,
+        local_path: str,
+        dircap: str = "",
+        mutable: bool = False,
+        progress_callback: Optional[ProgressCallback] = None,
+        rate_limit: int = 0,
     ) -> str:
+        """
+        Upload the file at ``local_path``, streaming it to the gateway.
+
+        :param progress_callback: Called as the upload progresses with the
+            number of bytes sent, the total size and the throughput so far
+            (in bytes per second).
+        :param rate_limit: The maximum average upload rate (in bytes per
+            second) or 0 for no limit.
+
+        To cancel the upload, cancel the Deferred wrapping this coroutine.
+        """
         if dircap:
             filename = Path(local_path).name
             path = f"/uri/{dircap}/{filename}"
@@ -732,23 +901,200 @@ class Tahoe:
         log.debug("Uploading %s...", local_path)
         await self.await_ready()
         with open(local_path, "rb") as f:
-            cap = await self._request("PUT", path, data=f)
+            producer = UploadProducer(
+                f,
+                self._reactor,
+                rate_limit=rate_limit,
+                progress_callback=progress_callback,
+            )
+            try:
+                cap = await self._request("PUT", path, data=producer)
+            finally:
+                if dircap:
+                    self.invalidate_dirnode(dircap)
         log.debug("Successfully uploaded %s", local_path)
         return cap
 
-    async def download(self, cap: str, local_path: str) -> None:
-        log.debug("Downloading %s...", local_path)
-        await self.await_ready()
+    async def _stream_download(
+        self,
+        resp: IResponse,
+        local_path: str,
+        progress: Callable[[int, int], None],
+    ) -> None:
+        total = resp.length if isinstance(resp.length, int) else 0
+        received = 0
+
+        def write(data: bytes) -> None:
+            nonlocal received
+            f.write(data)
+            received += len(data)
+            progress(received, total)
+
+        with atomic_write(local_path, mode="wb", overwrite=True) as f:
+            await treq.collect(resp, write)
+
+    async def _download_whole(
+        self, cap: str, local_path: str, progress: Callable[[int, int], None]
+    ) -> None:
+        time_started = time.monotonic()
         resp = await treq.get(
-            f"{self.nodeurl}uri/{cap}", headers={"Accept": "text/plain"}
+            f"{self.nodeurl}uri/{cap}",
+            headers={"Accept": "text/plain"},
+            pool=self.http_pool,
         )
-        if resp.code == 200:
+        if resp.code != 200:
+            content = await treq.content(resp)
+            self.record_request("GET", f"/uri/{cap}", resp.code, time_started)
+            raise TahoeWebError(content.decode("utf-8"))
+        await self._stream_download(resp, local_path, progress)
+        self.record_request("GET", f"/uri/{cap}", resp.code, time_started)
+
+    async def _start_download(
+        self,
+        cap: str,
+        local_path: str,
+        segment_size: int,
+        progress: Callable[[int, int], None],
+    ) -> Optional[DownloadJournal]:
+        """
+        Request the first segment of ``cap`` and, if the file is larger than
+        that segment, return a new DownloadJournal for the remainder of the
+        download. Otherwise, write the whole file to ``local_path`` and
+        return None.
+        """
+        time_started = time.monotonic()
+        resp = await treq.get(
+            f"{self.nodeurl}uri/{cap}",
+            headers={
+                "Accept": "text/plain",
+                "Range": f"bytes=0-{segment_size - 1}",
+            },
+            pool=self.http_pool,
+        )
+        if resp.code == 416:  # Range Not Satisfiable; i.e., an empty file
+            await treq.content(resp)
+            self.record_request("GET", f"/uri/{cap}", resp.code, time_started)
+            await self._download_whole(cap, local_path, progress)
+            return None
+        if resp.code == 200:  # The gateway ignored the Range request
+            await self._stream_download(resp, local_path, progress)
+            self.record_request("GET", f"/uri/{cap}", resp.code, time_started)
+            return None
+        content = await treq.content(resp)
+        self.record_request("GET", f"/uri/{cap}", resp.code, time_started)
+        if resp.code != 206:
+            raise TahoeWebError(content.decode("utf-8"))
+        content_range = resp.headers.getRawHeaders("content-range", [""])[0]
+        try:
+            _, _, size = parse_content_range(content_range)
+        except ValueError as e:
+            raise TahoeWebError(str(e)) from e
+        if len(content) >= size:
+            # The whole file fit in the first segment so there is nothing
+            # to resume and no need for a partial file or journal.
             with atomic_write(local_path, mode="wb", overwrite=True) as f:
-                await treq.collect(resp, f.write)
+                f.write(content)
+            progress(size, size)
+            return None
+        journal = DownloadJournal.create(local_path, cap, size, segment_size)
+        journal.write_segment(0, content)
+        progress(journal.bytes_completed, size)
+        return journal
+
+    async def _download_segment(
+        self, cap: str, journal: DownloadJournal, index: int
+    ) -> None:
+        first, last = journal.segment_range(index)
+        time_started = time.monotonic()
+        resp = await treq.get(
+            f"{self.nodeurl}uri/{cap}",
+            headers={"Accept": "text/plain", "Range": f"bytes={first}-{last}"},
+            pool=self.http_pool,
+        )
+        content = await treq.content(resp)
+        self.record_request("GET", f"/uri/{cap}", resp.code, time_started)
+        if resp.code != 206:
+            raise TahoeWebError(content.decode("utf-8"))
+        journal.write_segment(index, content)
+
+    async def download(  # pylint: disable=too-many-arguments
+        self,
+        cap: str,
+        local_path: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        segment_size: int = DOWNLOAD_SEGMENT_SIZE,
+        max_parallel: int = 4,
+    ) -> None:
+        """
+        Download ``cap`` to ``local_path``. Immutable files ("URI:CHK:"
+        caps) larger than ``segment_size`` bytes are fetched in segments,
+        up to ``max_parallel`` at a time, using HTTP Range requests;
+        anything else is fetched with a single request.
+
+        Segments are written to "<local_path>.part" and recorded in a
+        journal so that, if the download is interrupted, calling this method
+        again resumes it rather than starting over. The partial file is only
+        moved into place once every segment has been written. Since the
+        contents of a mutable file can change between requests, those are
+        never downloaded in segments.
+
+        :param progress_callback: Called as the download progresses with the
+            number of bytes received, the total size and the throughput so
+            far (in bytes per second).
+        """
+        log.debug("Downloading %s...", local_path)
+        await self.await_ready()
+        time_started = time.monotonic()
+        bytes_resumed = 0
+
+        def progress(received: int, total: int) -> None:
+            if not progress_callback:
+                return
+            elapsed = time.monotonic() - time_started
+            rate = (received - bytes_resumed) / elapsed if elapsed > 0 else 0
+            progress_callback(received, total, rate)
+
+        if not cap.startswith("URI:CHK:"):
+            await self._download_whole(cap, local_path, progress)
             log.debug("Successfully downloaded %s", local_path)
+            return
+
+        journal = DownloadJournal.load(local_path, cap)
+        if journal:
+            bytes_resumed = journal.bytes_completed
+            log.debug(
+                "Resuming download of %s (%i/%i bytes)",
+                local_path,
+                bytes_resumed,
+                journal.size,
+            )
         else:
-            content = await treq.content(resp)
-            raise TahoeWebError(content.decode("utf-8"))
+            journal = await self._start_download(
+                cap, local_path, segment_size, progress
+            )
+            if journal is None:
+                log.debug("Successfully downloaded %s", local_path)
+                return
+
+        semaphore = DeferredSemaphore(max_parallel)
+
+        async def fetch(index: int) -> None:
+            await self._download_segment(cap, journal, index)
+            progress(journal.bytes_completed, journal.size)
+
+        try:
+            await DeferredList(
+                [
+                    semaphore.run(lambda i=i: Deferred.fromCoroutine(fetch(i)))
+                    for i in journal.missing_segments()
+                ],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
+        journal.finish()
+        log.debug("Successfully downloaded %s", local_path)
 
     async def link(self, dircap: str, childname: str, childcap: str) -> None:
         dircap_hash = trunchash(dircap)
@@ -760,9 +1106,13 @@ class Tahoe:
             dircap_hash,
         )
         await self.await_ready()
-        await self._request(
-            "POST", f"/uri/{dircap}/?t=uri&name={childname}&uri={childcap}"
-        )
+        try:
+            await self._request(
+                "POST",
+                f"/uri/{dircap}/?t=uri&name={childname}&uri={childcap}",
+            )
+        finally:
+            self.invalidate_dirnode(dircap)
         log.debug(
             'Done linking "%s" (%s) into %s',
             childname,
@@ -770,28 +1120,82 @@ class Tahoe:
             dircap_hash,
         )
 
+    async def set_children(
+        self, dircap: str, children: dict[str, str], replace: bool = True
+    ) -> None:
+        """
+        Link each of ``children`` (a mapping of child names to caps) into
+        the directory ``dircap`` in a single request.
+        """
+        dircap_hash = trunchash(dircap)
+        log.debug("Linking %i children into %s...", len(children), dircap_hash)
+        await self.await_ready()
+        # Like "?t=uri", pass the child cap as both the write- and read-cap
+        # and let Tahoe-LAFS work out which it is.
+        body = {
+            name: ["unknown", {"rw_uri": cap, "ro_uri": cap}]
+            for name, cap in children.items()
+        }
+        try:
+            await self._request(
+                "POST",
+                f"/uri/{dircap}/",
+                params={
+                    "t": "set_children",
+                    "replace": "true" if replace else "false",
+                },
+                data=json.dumps(body).encode("utf-8"),
+            )
+        finally:
+            self.invalidate_dirnode(dircap)
+        log.debug(
+            "Done linking %i children into %s", len(children), dircap_hash
+        )
+
     async def unlink(
         self, dircap: str, childname: str, missing_ok: bool = False
     ) -> None:
         dircap_hash = trunchash(dircap)
         log.debug('Unlinking "%s" from %s...', childname, dircap_hash)
         await self.await_ready()
+        path = f"/uri/{dircap}/?t=unlink&name={childname}"
+        time_started = time.monotonic()
         resp = await treq.post(
-            f"{self.nodeurl}uri/{dircap}/?t=unlink&name={childname}",
+            f"{self.nodeurl}{path.lstrip('/')}",
             headers={"Accept": "text/plain"},
+            pool=self.http_pool,
         )
+        self.record_request("POST", path, resp.code, time_started)
+        self.invalidate_dirnode(dircap)
+        # Always consume the body so the pooled connection can be reused.
+        content = await treq.content(resp)
         if resp.code == 404 and missing_ok:
             pass
         elif resp.code != 200:
-            content = await treq.content(resp)
             raise TahoeWebError(content.decode("utf-8"))
         log.debug('Done unlinking "%s" from %s', childname, dircap_hash)
 
+    async def get_dirnode_content(self, cap: str) -> str:
+        """
+        Return the (raw, undecoded) "?t=json" listing of ``cap``, from the
+        dirnode cache if possible.
+        """
+        # The raw response is cached (rather than the decoded JSON) so that
+        # each caller gets its own copy to modify.
+        content = self.dirnode_cache.get(cap)
+        if content is None:
+            generation = self._dirnode_generation
+            content = await self._request("GET", f"/uri/{cap}/?t=json")
+            # Don't cache a listing that may predate a concurrent change.
+            if generation == self._dirnode_generation:
+                self.dirnode_cache.put(cap, content)
+        return cast(str, content)
+
     async def get_json(self, cap: str) -> Optional[Union[dict, list]]:
         if not cap:
             return None
         try:
-            content = await self._request("GET", f"/uri/{cap}/?t=json")
+            content = await self.get_dirnode_content(cap)
         except (ConnectError, RuntimeError, TahoeWebError):
             return None
         return json.loads(content)
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from typing import BinaryIO, Callable, Optional
+
+from atomicwrites import atomic_write
+from twisted.internet.defer import Deferred
+from twisted.internet.interfaces import IConsumer, IDelayedCall, IReactorTime
+from twisted.web.iweb import UNKNOWN_LENGTH, IBodyProducer
+from zope.interface import implementer
+
+# progress_callback(bytes_transferred, bytes_total, bytes_per_second)
+ProgressCallback = Callable[[int, int, float], None]
+
+DOWNLOAD_SEGMENT_SIZE = 2**20
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+def parse_content_range(value: str) -> tuple[int, int, int]:
+    """
+    Parse the value of a "Content-Range" header into a tuple of
+    (first byte, last byte, complete length).
+    """
+    match = _CONTENT_RANGE_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid Content-Range: {value}")
+    first, last, length = (int(group) for group in match.groups())
+    if first > last or last >= length:
+        raise ValueError(f"Invalid Content-Range: {value}")
+    return first, last, length
+
+
+@implementer(IBodyProducer)
+class UploadProducer:
+    """
+    Stream the contents of a file to an HTTP request body, one chunk per
+    reactor iteration, reporting progress and optionally limiting the rate
+    at which data is written.
+
+    At most one chunk is read ahead of the consumer; when the transport's
+    buffers are full it pauses this producer until they drain, so memory use
+    stays bounded irrespective of the size of the file.
+
+    The upload can be cancelled either by cancelling the Deferred returned
+    by ``startProducing`` or by calling ``stopProducing``.
+
+    :param f: A file opened in binary mode, positioned at the start of the
+        data to upload. It is not closed by this producer.
+    :param clock: The reactor to use to schedule writes.
+    :param chunk_size: The number of bytes to read and write at once.
+    :param rate_limit: The maximum average number of bytes to write per
+        second, or 0 for no limit.
+    :param progress_callback: Called after each chunk with the number of
+        bytes written so far, the total length and the average throughput.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        f: BinaryIO,
+        clock: IReactorTime,
+        chunk_size: int = 2**16,
+        rate_limit: int = 0,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> None:
+        self._file = f
+        self._clock = clock
+        self.chunk_size = chunk_size
+        self.rate_limit = rate_limit
+        self.progress_callback = progress_callback
+
+        self.length = self._determine_length(f)
+        self.bytes_sent = 0
+
+        self._consumer: Optional[IConsumer] = None
+        self._finished: Optional[Deferred[None]] = None
+        self._delayed_call: Optional[IDelayedCall] = None
+        self._time_started: float = 0.0
+        self._paused = False
+        self._stopped = False
+
+    @staticmethod
+    def _determine_length(f: BinaryIO) -> int:
+        try:
+            return os.fstat(f.fileno()).st_size - f.tell()
+        except (AttributeError, OSError, ValueError):
+            return UNKNOWN_LENGTH
+
+    @property
+    def bytes_per_second(self) -> float:
+        elapsed = self._clock.seconds() - self._time_started
+        if elapsed <= 0:
+            return 0.0
+        return self.bytes_sent / elapsed
+
+    def startProducing(self, consumer: IConsumer) -> Deferred[None]:
+        self._consumer = consumer
+        self._time_started = self._clock.seconds()
+        self._finished = Deferred(lambda _: self.stopProducing())
+        self._schedule(0)
+        return self._finished
+
+    def _schedule(self, delay: float) -> None:
+        self._delayed_call = self._clock.callLater(  # type: ignore
+            delay, self._write_chunk
+        )
+
+    def _throttle_delay(self) -> float:
+        if not self.rate_limit:
+            return 0.0
+        expected = self.bytes_sent / self.rate_limit
+        elapsed = self._clock.seconds() - self._time_started
+        return max(0.0, expected - elapsed)
+
+    def _write_chunk(self) -> None:
+        self._delayed_call = None
+        if self._paused or self._stopped:
+            return
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            if self._finished is not None and not self._finished.called:
+                self._finished.callback(None)
+            return
+        if self._consumer is not None:
+            self._consumer.write(chunk)
+        self.bytes_sent += len(chunk)
+        if self.progress_callback:
+            self.progress_callback(
+                self.bytes_sent, self.length, self.bytes_per_second
+            )
+        self._schedule(self._throttle_delay())
+
+    def _cancel_delayed_call(self) -> None:
+        if self._delayed_call is not None and self._delayed_call.active():
+            self._delayed_call.cancel()
+        self._delayed_call = None
+
+    def pauseProducing(self) -> None:
+        self._paused = True
+        self._cancel_delayed_call()
+
+    def resumeProducing(self) -> None:
+        self._paused = False
+        if not self._stopped and self._delayed_call is None:
+            self._schedule(self._throttle_delay())
+
+    def stopProducing(self) -> None:
+        # Like twisted.web.client.FileBodyProducer, the Deferred returned by
+        # startProducing is intentionally left unfired when stopped.
+        self._stopped = True
+        self._cancel_delayed_call()
+
+
+class DownloadJournal:
+    """
+    Track the segments of a download that have been written to a partial
+    file ("<local_path>.part") so that an interrupted download can resume
+    where it left off. The journal itself is stored alongside the partial
+    file (as "<local_path>.part.json") and records a digest of the cap --
+    rather than the cap itself -- so that no secrets are written to disk.
+
+    :param local_path: The final destination of the downloaded file.
+    :param cap: The capability being downloaded.
+    :param size: The total size of the file, in bytes.
+    :param segment_size: The number of bytes fetched per range request.
+    :param completed: The indices of the segments already written.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        local_path: str,
+        cap: str,
+        size: int,
+        segment_size: int = DOWNLOAD_SEGMENT_SIZE,
+        completed: Optional[set[int]] = None,
+    ) -> None:
+        self.local_path = local_path
+        self.part_path = local_path + ".part"
+        self.journal_path = local_path + ".part.json"
+        self.cap_digest = self.digest(cap)
+        self.size = size
+        self.segment_size = segment_size
+        self.completed: set[int] = completed or set()
+
+    @staticmethod
+    def digest(cap: str) -> str:
+        return hashlib.sha256(cap.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def create(
+        cls,
+        local_path: str,
+        cap: str,
+        size: int,
+        segment_size: int = DOWNLOAD_SEGMENT_SIZE,
+    ) -> DownloadJournal:
+        journal = cls(local_path, cap, size, segment_size)
+        with open(journal.part_path, "wb") as f:
+            f.truncate(size)
+        journal.save()
+        return journal
+
+    @classmethod
+    def load(cls, local_path: str, cap: str) -> Optional[DownloadJournal]:
+        """
+        Return the journal of a previous, incomplete download of ``cap`` to
+        ``local_path`` or None if there is no such download to resume.
+        """
+        try:
+            with open(local_path + ".part.json", encoding="utf-8") as f:
+                state = json.load(f)
+            part_size = os.path.getsize(local_path + ".part")
+        except (OSError, ValueError):
+            return None
+        try:
+            if state["cap_digest"] != cls.digest(cap):
+                return None
+            if part_size != state["size"]:
+                return None
+            return cls(
+                local_path,
+                cap,
+                state["size"],
+                state["segment_size"],
+                set(state["completed"]),
+            )
+        except (KeyError, TypeError):
+            return None
+
+    def save(self) -> None:
+        with atomic_write(
+            self.journal_path, mode="w", overwrite=True, encoding="utf-8"
+        ) as f:
+            json.dump(
+                {
+                    "cap_digest": self.cap_digest,
+                    "size": self.size,
+                    "segment_size": self.segment_size,
+                    "completed": sorted(self.completed),
+                },
+                f,
+            )
+
+    @property
+    def num_segments(self) -> int:
+        return -(-self.size // self.segment_size)
+
+    def segment_range(self, index: int) -> tuple[int, int]:
+        """
+        Return the first and last byte offsets (inclusive) of a segment.
+        """
+        first = index * self.segment_size
+        return first, min(first + self.segment_size, self.size) - 1
+
+    def missing_segments(self) -> list[int]:
+        return [i for i in range(self.num_segments) if i not in self.completed]
+
+    @property
+    def bytes_completed(self) -> int:
+        return sum(
+            last - first + 1
+            for first, last in map(self.segment_range, self.completed)
+        )
+
+    def write_segment(self, index: int, data: bytes) -> None:
+        first, last = self.segment_range(index)
+        if len(data) != last - first + 1:
+            raise ValueError(
+                f"Segment {index} should be {last - first + 1} bytes; "
+                f"got {len(data)}"
+            )
+        with open(self.part_path, "r+b") as f:
+            f.seek(first)
+            f.write(data)
+        self.completed.add(index)
+        self.save()
+
+    def finish(self) -> None:
+        """
+        Atomically move the completed partial file into place and remove
+        the journal.
+        """
+        missing = self.missing_segments()
+        if missing:
+            raise ValueError(f"Download incomplete; missing {missing}")
+        with open(self.part_path, "r+b") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.part_path, self.local_path)
+        self.discard()
+
+    def discard(self) -> None:
+        for path in (self.journal_path, self.part_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -2,14 +2,28 @@
 from __future__ import annotations
 
 from binascii import hexlify, unhexlify
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from html.parser import HTMLParser
-from time import time
+from time import monotonic, time
 from traceback import format_exception
-from typing import TYPE_CHECKING, Callable, Coroutine, Optional, TypeVar, Union
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Coroutine,
+    Hashable,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 import attr
-from twisted.internet.defer import Deferred, ensureDeferred, inlineCallbacks
+from twisted.internet.defer import (
+    Deferred,
+    ensureDeferred,
+    inlineCallbacks,
+    succeed,
+)
 from twisted.internet.interfaces import IReactorTime
 from twisted.internet.task import deferLater
 from twisted.python.failure import Failure
@@ -238,3 +252,252 @@ class Poller:
         Schedule the next polling iteration.
         """
         deferLater(self.clock, self.interval, self._iterate_poll)
+
+
+@attr.s
+class CoalescingScheduler:
+    """
+    Run some asynchronous function on request, making sure that at most one
+    call is in flight at a time.  Any number of requests made while a call is
+    running (or waiting to run) are collapsed into a single follow-up call.
+
+    :ivar clock: The reactor to use to schedule the calls.
+    :ivar target: The asynchronous function to call.
+    :ivar min_interval: The minimum time, in seconds, between the start of
+        one call and the start of the next.
+
+    :ivar requested: The number of times ``request`` has been called.
+    :ivar coalesced: The number of requests that were satisfied by a call
+        that had already been scheduled on behalf of an earlier request.
+    :ivar executed: The number of times the target function has been called.
+
+    :ivar _running: ``True`` if the target function is currently running.
+    :ivar _scheduled: ``True`` if the next call has been scheduled.
+    :ivar _last_started: The time at which the last call was started.
+    :ivar _waiting: The ``Deferred`` instances which will be fired with the
+        result of the next call.
+    """
+
+    clock: IReactorTime = attr.ib()
+
+    target: Callable[
+        [],
+        Union[
+            Coroutine[Deferred[object], _T, object],
+            Deferred[object],
+        ],
+    ] = attr.ib()
+
+    min_interval: float = attr.ib(default=0.0)
+
+    requested: int = attr.ib(default=0)
+    coalesced: int = attr.ib(default=0)
+    executed: int = attr.ib(default=0)
+
+    _running: bool = attr.ib(default=False)
+    _scheduled: bool = attr.ib(default=False)
+    _last_started: Optional[float] = attr.ib(default=None)
+    _waiting: list[Deferred[object]] = attr.ib(default=attr.Factory(list))
+
+    def request(self) -> Deferred:
+        """
+        Request a call of the target function.
+
+        :return: A ``Deferred`` that fires with the result of the first call
+            that starts after this request was made.
+        """
+        self.requested += 1
+        waiting: Deferred = Deferred()
+        if self._waiting:
+            self.coalesced += 1
+        self._waiting.append(waiting)
+        if not self._running and not self._scheduled:
+            self._schedule()
+        return waiting
+
+    def _schedule(self) -> None:
+        """
+        Schedule the next call, honouring ``min_interval``.
+        """
+        delay = 0.0
+        if self._last_started is not None:
+            delay = (
+                self._last_started + self.min_interval - self.clock.seconds()
+            )
+        if delay > 0:
+            self._scheduled = True
+            self.clock.callLater(delay, self._run)  # type: ignore
+        else:
+            self._run()
+
+    @inlineCallbacks
+    def _run(self) -> TwistedDeferred[None]:
+        """
+        Call the target function once and deliver its result to everything
+        that requested it, then start a follow-up call if more requests came
+        in while it was running.
+        """
+        self._scheduled = False
+        self._running = True
+        self._last_started = self.clock.seconds()
+        self.executed += 1
+        waiting = self._waiting
+        self._waiting = []
+        try:
+            result = yield ensureDeferred(self.target())
+        except Exception:  # pylint: disable=broad-except
+            result = Failure()
+        self._running = False
+        for w in waiting:
+            if isinstance(result, Failure):
+                w.errback(result)
+            else:
+                w.callback(result)
+        if self._waiting and not self._running and not self._scheduled:
+            self._schedule()
+
+
+# The default number of seconds for which a pushed "ready" state is trusted.
+READINESS_MAX_AGE = 30.0
+
+
+@attr.s
+class ReadinessTracker:
+    """
+    Cache a "ready" state that is pushed in from elsewhere (rather than
+    polled for) and notify as many Deferreds as are waiting for it.
+
+    The cached state is only trusted for ``max_age`` seconds after it was
+    last updated; after that it is considered stale and callers should
+    determine readiness some other way (and ideally feed the result back
+    through ``update``).
+
+    :ivar clock: The reactor to use to determine the age of the state.
+    :ivar max_age: The number of seconds for which an update remains valid.
+
+    :ivar _ready: The most recently reported state.
+    :ivar _last_updated: The time of the most recent update or ``None`` if
+        there has not been one.
+    :ivar _waiting: The ``Deferred`` instances which will be fired when
+        the state next becomes ready.
+    """
+
+    clock: IReactorTime = attr.ib()
+    max_age: float = attr.ib(default=READINESS_MAX_AGE)
+
+    _ready: bool = attr.ib(default=False)
+    _last_updated: Optional[float] = attr.ib(default=None)
+    _waiting: list[Deferred[None]] = attr.ib(default=attr.Factory(list))
+
+    def update(self, ready: bool) -> None:
+        """
+        Record the current state and, if it is ready, deliver notifications.
+        """
+        self._ready = ready
+        self._last_updated = self.clock.seconds()
+        if ready:
+            waiting = self._waiting
+            self._waiting = []
+            for w in waiting:
+                w.callback(None)
+
+    def invalidate(self) -> None:
+        """
+        Forget the current state, making it stale.
+        """
+        self._ready = False
+        self._last_updated = None
+
+    def is_stale(self) -> bool:
+        if self._last_updated is None:
+            return True
+        return self.clock.seconds() - self._last_updated > self.max_age
+
+    def is_ready(self) -> bool:
+        return self._ready and not self.is_stale()
+
+    def wait_for_ready(self) -> Deferred:
+        """
+        :return: A ``Deferred`` that fires the next time the state is updated
+            to ready (or immediately, if it is already ready and not stale).
+        """
+        if self.is_ready():
+            return succeed(None)
+        waiting: Deferred = Deferred()
+        self._waiting.append(waiting)
+        return waiting
+
+
+@attr.s
+class TTLCache:
+    """
+    A size-bounded, least-recently-used cache whose entries expire a fixed
+    number of seconds after they were stored.
+
+    :ivar ttl: The number of seconds for which an entry remains valid.
+    :ivar max_size: The maximum number of entries to keep; when exceeded, the
+        least recently used entry is evicted.
+    :ivar timer: A function returning the current (monotonic) time.
+
+    :ivar hits: The number of lookups that found a valid entry.
+    :ivar misses: The number of lookups that did not.
+    :ivar evictions: The number of entries dropped to stay within
+        ``max_size``.
+
+    :ivar _entries: A mapping of keys to (time stored, value) pairs, ordered
+        from least to most recently used.
+    """
+
+    ttl: float = attr.ib(default=30.0)
+    max_size: int = attr.ib(default=256)
+    timer: Callable[[], float] = attr.ib(default=monotonic)
+
+    hits: int = attr.ib(default=0)
+    misses: int = attr.ib(default=0)
+    evictions: int = attr.ib(default=0)
+
+    _entries: OrderedDict[Hashable, tuple[float, object]] = attr.ib(
+        default=attr.Factory(OrderedDict)
+    )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """
+        :return: The value stored for ``key`` or ``None`` if there is no
+            such value (or it has expired).
+        """
+        entry = self._entries.get(key)
+        if entry is None or self.timer() - entry[0] > self.ttl:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: object) -> None:
+        self._entries[key] = (self.timer(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Remove every entry whose key satisfies ``predicate``.
+        """
+        for key in [k for k in self._entries if predicate(k)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,212 @@
+"""
+A compact, on-disk history of a gateway's ZKAP balance, and forecasts of
+future ZKAP consumption derived from it.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+from array import array
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from atomicwrites import atomic_write
+
+from gridsync import settings
+
+_monitor_settings = settings.get("monitor", {})
+
+# The maximum number of samples to keep; once full, the oldest sample is
+# overwritten by each new one.
+ZKAP_HISTORY_SIZE = int(_monitor_settings.get("zkap_history_size", 2048))
+# The minimum time, in seconds, between samples for which nothing changed.
+ZKAP_HISTORY_MIN_INTERVAL = float(
+    _monitor_settings.get("zkap_history_min_interval", 3600)
+)
+# How far back, in seconds, to look when forecasting consumption.
+ZKAP_FORECAST_WINDOW = float(
+    _monitor_settings.get("zkap_forecast_window", 30 * 86400)
+)
+# How much history, in seconds, is needed before forecasting at all.
+ZKAP_FORECAST_MIN_SPAN = float(
+    _monitor_settings.get("zkap_forecast_min_span", 86400)
+)
+
+_MAGIC = b"ZKH1"
+_HEADER = struct.Struct("<4sIII")  # magic, capacity, start, count
+_FIELDS = 4
+
+
+class ZKAPSample(NamedTuple):
+    timestamp: float
+    remaining: int
+    total: int
+    renewal_cost: int
+
+
+class ZKAPHistory:
+    """
+    A ring buffer of ``ZKAPSample``s, stored as a flat array of doubles
+    (preceded by a small header) in the file at ``path``.
+
+    The file is read on first use and rewritten atomically whenever a
+    sample is recorded.
+    """
+
+    def __init__(self, path: Path, capacity: int = ZKAP_HISTORY_SIZE) -> None:
+        self.path = path
+        self.capacity = capacity
+        self._data: Optional[array] = None
+        self._start = 0
+        self._count = 0
+        # Incremented whenever a sample is recorded so that forecasts
+        # derived from the history can be cached until it changes.
+        self.version = 0
+        self._rate: tuple[int, float, Optional[float]] = (-1, 0.0, None)
+
+    def _load(self) -> array:
+        if self._data is not None:
+            return self._data
+        self._data = array("d", bytes(8 * _FIELDS * self.capacity))
+        try:
+            content = self.path.read_bytes()
+        except FileNotFoundError:
+            return self._data
+        except OSError as e:
+            logging.warning("Error reading ZKAP history: %s", str(e))
+            return self._data
+        try:
+            magic, capacity, start, count = _HEADER.unpack_from(content)
+            offset = _HEADER.size
+            data = array("d")
+            data.frombytes(content[offset:])
+        except (struct.error, ValueError):
+            logging.warning("Ignoring malformed ZKAP history %s", self.path)
+            return self._data
+        if magic != _MAGIC or len(data) != _FIELDS * capacity:
+            logging.warning("Ignoring malformed ZKAP history %s", self.path)
+            return self._data
+        self._start = self._count = 0
+        for i in range(min(count, capacity)):
+            j = _FIELDS * ((start + i) % capacity)
+            k = j + _FIELDS
+            self._append(data[j:k])
+        return self._data
+
+    def _append(self, values: array) -> None:
+        data = self._data
+        assert data is not None
+        j = _FIELDS * ((self._start + self._count) % self.capacity)
+        k = j + _FIELDS
+        data[j:k] = array("d", values)
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+        self.version += 1
+
+    def _save(self) -> None:
+        data = self._load()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(str(self.path), mode="wb", overwrite=True) as f:
+                f.write(
+                    _HEADER.pack(
+                        _MAGIC, self.capacity, self._start, self._count
+                    )
+                )
+                data.tofile(f)
+        except OSError as e:
+            logging.warning("Error saving ZKAP history: %s", str(e))
+
+    def __len__(self) -> int:
+        self._load()
+        return self._count
+
+    def _get(self, i: int) -> ZKAPSample:
+        data = self._load()
+        j = _FIELDS * ((self._start + i) % self.capacity)
+        k = j + _FIELDS
+        timestamp, remaining, total, renewal_cost = data[j:k]
+        return ZKAPSample(
+            timestamp, int(remaining), int(total), int(renewal_cost)
+        )
+
+    def last(self) -> Optional[ZKAPSample]:
+        if not len(self):
+            return None
+        return self._get(self._count - 1)
+
+    def samples(self, since: float = 0.0) -> list[ZKAPSample]:
+        """
+        Return the recorded samples (oldest first) taken at or after the
+        time ``since``.
+        """
+        count = len(self)
+        # Samples are recorded in chronological order so find the first
+        # matching sample by bisection.
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._get(mid).timestamp < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return [self._get(i) for i in range(lo, count)]
+
+    def record(
+        self, timestamp: float, remaining: int, total: int, renewal_cost: int
+    ) -> bool:
+        """
+        Record a sample, unless it matches the previous sample and was taken
+        less than ``ZKAP_HISTORY_MIN_INTERVAL`` seconds after it.
+
+        :return: Whether the sample was recorded.
+        """
+        last = self.last()
+        if last is not None:
+            if timestamp < last.timestamp:
+                return False  # The clock went backwards
+            unchanged = (remaining, total, renewal_cost) == last[1:]
+            recent = timestamp - last.timestamp < ZKAP_HISTORY_MIN_INTERVAL
+            if unchanged and recent:
+                return False
+        self._append(array("d", (timestamp, remaining, total, renewal_cost)))
+        self._save()
+        return True
+
+    def spend_rate(self, now: float) -> Optional[float]:
+        """
+        Return the rate, in ZKAPs per second, at which ZKAPs were spent over
+        the last ``ZKAP_FORECAST_WINDOW`` seconds, or None if there is too
+        little history to tell. Increases in the number of ZKAPs remaining
+        (i.e., redemptions) are not counted as negative spending.
+        """
+        version, cached_now, rate = self._rate
+        if version == self.version and now - cached_now < 60:
+            return rate
+        samples = self.samples(since=now - ZKAP_FORECAST_WINDOW)
+        rate = None
+        if samples:
+            span = samples[-1].timestamp - samples[0].timestamp
+            if span >= ZKAP_FORECAST_MIN_SPAN:
+                spent = sum(
+                    max(0, a.remaining - b.remaining)
+                    for a, b in zip(samples, samples[1:])
+                )
+                rate = spent / span
+        self._rate = (self.version, now, rate)
+        return rate
+
+    def days_remaining(self, now: float) -> Optional[int]:
+        """
+        Return the number of days until the ZKAPs remaining (as of the most
+        recent sample) will have been spent at the current ``spend_rate``,
+        or None if that cannot (yet) be forecast.
+        """
+        last = self.last()
+        rate = self.spend_rate(now)
+        if last is None or not rate:
+            return None
+        return int(last.remaining / rate / 86400)
@@ -4,11 +4,19 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
-from typing import TYPE_CHECKING, Callable, Optional
+import time
+from array import array
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Union
 
 import treq
 from autobahn.twisted.websocket import create_client_agent
-from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    DeferredSemaphore,
+    FirstError,
+    inlineCallbacks,
+)
 
 from gridsync.errors import TahoeWebError
 from gridsync.types_ import TwistedDeferred
@@ -20,6 +28,21 @@ if TYPE_CHECKING:
 PLUGIN_NAME = "privatestorageio-zkapauthz-v2"
 
 
+def fingerprint_sizes(sizes: Union[array, list[int]]) -> str:
+    """
+    Return a digest of the multiset of ``sizes`` (i.e., one that does not
+    depend upon the order in which the sizes were collected).
+    """
+    return hashlib.sha256(array("Q", sorted(sizes)).tobytes()).hexdigest()
+
+
+class _CachedPrice(NamedTuple):
+    state: tuple[int, int]
+    time: float
+    fingerprint: str
+    price: dict
+
+
 class ZKAPAuthorizer:
     def __init__(self, gateway: Tahoe) -> None:
         self.gateway = gateway
@@ -31,6 +54,15 @@ class ZKAPAuthorizer:
         # Default batch-size from zkapauthorizer.resource.NUM_TOKENS
         self.zkap_batch_size: int = 2**15
         self._recovery_capability: str = ""
+        # Limits and caching for the directory traversal in get_sizes()
+        self.max_concurrent_requests: int = 8
+        self.cache_dirnode_sizes: bool = True
+        # How long, in seconds, get_price() may return a cached price without
+        # collecting the sizes again, so long as nothing is known to have
+        # changed. This bounds the staleness due to changes made elsewhere.
+        self.price_cache_ttl: float = 300.0
+        self._price_generation: int = 0
+        self._cached_price: Optional[_CachedPrice] = None
 
         # XXX/TODO: Move this later?
         gateway.monitor.zkaps_redeemed.connect(lambda _: self.backup_zkaps())
@@ -55,6 +87,7 @@ class ZKAPAuthorizer:
     def _request(
         self, method: str, path: str, data: Optional[bytes] = None
     ) -> TwistedDeferred[tuple[int, str]]:
+        time_started = time.monotonic()
         resp = yield treq.request(
             method,
             f"{self.gateway.nodeurl}storage-plugins/{PLUGIN_NAME}{path}",
@@ -63,8 +96,15 @@ class ZKAPAuthorizer:
                 "Content-Type": "application/json",
             },
             data=data,
+            pool=self.gateway.http_pool,
         )
         content = yield treq.content(resp)
+        self.gateway.record_request(
+            method,
+            f"/storage-plugins/{PLUGIN_NAME}{path}",
+            resp.code,
+            time_started,
+        )
         return (resp.code, content.decode("utf-8").strip())
 
     @inlineCallbacks
@@ -78,45 +118,114 @@ class ZKAPAuthorizer:
 
     @inlineCallbacks
     def _get_content(self, cap: str) -> TwistedDeferred[bytes]:
-        resp = yield treq.get(f"{self.gateway.nodeurl}uri/{cap}")
+        time_started = time.monotonic()
+        resp = yield treq.get(
+            f"{self.gateway.nodeurl}uri/{cap}", pool=self.gateway.http_pool
+        )
+        self.gateway.record_request(
+            "GET", f"/uri/{cap}", resp.code, time_started
+        )
+        content = yield treq.content(resp)
         if resp.code == 200:
-            content = yield treq.content(resp)
             return content
         raise TahoeWebError(f"Error getting cap content: {resp.code}")
 
     @inlineCallbacks
-    def get_sizes(self) -> TwistedDeferred[list[Optional[int]]]:
-        sizes: list = []
-        rootcap = self.gateway.get_rootcap()
-        rootcap_bytes = yield self._get_content(f"{rootcap}/?t=json")
+    def _get_dirnode_bytes(
+        self, cap: str, use_cache: bool
+    ) -> TwistedDeferred[bytes]:
+        if use_cache:
+            content = yield Deferred.fromCoroutine(
+                self.gateway.get_dirnode_content(cap)
+            )
+            return content.encode("utf-8")
+        content = yield self._get_content(f"{cap}/?t=json")
+        return content
+
+    @inlineCallbacks
+    def _get_dircap_sizes(
+        self, dircap: str, use_cache: bool
+    ) -> TwistedDeferred[list[int]]:
+        dircap_bytes = yield self._get_dirnode_bytes(dircap, use_cache)
+        sizes = [len(dircap_bytes)]
+        dircap_data = json.loads(dircap_bytes.decode("utf-8"))
+        for data in dircap_data[1]["children"].values():
+            size = data[1].get("size", 0)
+            if size:
+                sizes.append(size)
+        return sizes
+
+    @inlineCallbacks
+    def get_sizes(
+        self,
+        max_concurrency: Optional[int] = None,
+        use_cache: Optional[bool] = None,
+    ) -> TwistedDeferred[array]:
+        """
+        Collect the sizes of everything stored on the grid on behalf of the
+        user: the rootcap listing, the listings of (and files in) each
+        writable directory linked into it, and all Magic-Folder objects.
+
+        The writable directories are listed concurrently (up to
+        ``max_concurrency`` at a time) and alongside the Magic-Folder
+        queries so that this costs little more than two round-trips.
+
+        :param max_concurrency: The maximum number of directory listings to
+            request at once; defaults to ``self.max_concurrent_requests``.
+        :param use_cache: Whether to re-use the gateway's cached listings of
+            directories that have not changed; defaults to
+            ``self.cache_dirnode_sizes``.
+        """
+        if max_concurrency is None:
+            max_concurrency = self.max_concurrent_requests
+        if use_cache is None:
+            use_cache = self.cache_dirnode_sizes
+        mf_sizes_d = Deferred.fromCoroutine(
+            self.gateway.magic_folder.get_all_object_sizes()
+        )
+        sizes = array("Q")
+        try:
+            rootcap = self.gateway.get_rootcap()
+            rootcap_bytes = yield self._get_dirnode_bytes(rootcap, use_cache)
+        except Exception:
+            mf_sizes_d.addErrback(lambda _: None)
+            raise
         if not rootcap_bytes:
+            mf_sizes_d.addErrback(lambda _: None)
             return sizes
         sizes.append(len(rootcap_bytes))
         rootcap_data = json.loads(rootcap_bytes.decode("utf-8"))
+        dircaps = []
         if rootcap_data:
-            dircaps = []
             for data in rootcap_data[1]["children"].values():
                 rw_uri = data[1].get("rw_uri", "")
                 if rw_uri:  # Only care about dirs the user can write to
                     dircaps.append(rw_uri)
-            for dircap in dircaps:
-                dircap_bytes = yield self._get_content(f"{dircap}/?t=json")
-                sizes.append(len(dircap_bytes))
-                dircap_data = json.loads(dircap_bytes.decode("utf-8"))
-                for data in dircap_data[1]["children"].values():
-                    size = data[1].get("size", 0)
-                    if size:
-                        sizes.append(size)
-        mf_sizes = yield Deferred.fromCoroutine(
-            self.gateway.magic_folder.get_all_object_sizes()
-        )
-        sizes.extend(mf_sizes)
+        semaphore = DeferredSemaphore(max_concurrency)
+        try:
+            results = yield DeferredList(
+                [
+                    semaphore.run(self._get_dircap_sizes, dircap, use_cache)
+                    for dircap in dircaps
+                ]
+                + [mf_sizes_d],
+                fireOnOneErrback=True,
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
+        for _, result in results:
+            sizes.extend(result)
         return sizes
 
     @inlineCallbacks
-    def calculate_price(self, sizes: list[int]) -> TwistedDeferred[dict]:
+    def calculate_price(
+        self, sizes: Union[array, list[int]]
+    ) -> TwistedDeferred[dict]:
         if not self.gateway.nodeurl:
             return {}
+        if isinstance(sizes, array):
+            sizes = sizes.tolist()
         code, body = yield self._request(
             "POST",
             "/calculate-price",
@@ -126,11 +235,47 @@ class ZKAPAuthorizer:
             return json.loads(body)
         raise TahoeWebError(f"Error ({code}) calculating price: {body}")
 
+    def invalidate_price(self) -> None:
+        """
+        Note that the sizes of the user's data have (or may have) changed so
+        that the next call to get_price() collects them again.
+        """
+        self._price_generation += 1
+
+    def _price_state(self) -> tuple[int, int]:
+        return (self.gateway.dirnode_generation, self._price_generation)
+
     @inlineCallbacks
     def get_price(self) -> TwistedDeferred[dict]:
+        """
+        Return the price of storing everything that the user has stored.
+
+        The sizes are only collected again if a directory has been changed
+        (through this gateway) or the price has been invalidated since they
+        were last collected, or after ``price_cache_ttl`` seconds; the price
+        is only calculated again if the collected sizes differ.
+        """
+        state = self._price_state()
+        cached = self._cached_price
+        if (
+            cached
+            and cached.state == state
+            and time.monotonic() - cached.time < self.price_cache_ttl
+        ):
+            return dict(cached.price)
         sizes = yield self.get_sizes()
-        price = yield self.calculate_price(sizes)
-        return price
+        fingerprint = fingerprint_sizes(sizes)
+        if cached and cached.fingerprint == fingerprint:
+            price = cached.price
+        else:
+            price = yield self.calculate_price(sizes)
+        if price:
+            # The state from *before* the sizes were collected is recorded
+            # so that any change made meanwhile will invalidate the price.
+            self._cached_price = _CachedPrice(
+                state, time.monotonic(), fingerprint, price
+            )
+        return dict(price)
 
     @inlineCallbacks
     def add_voucher(
@@ -159,3 +159,55 @@ def test_debug_exporter_export_to_file_failure(monkeypatch, tmpdir):
     monkeypatch.setattr("gridsync.gui.debug.error", fake_error)
     de.export_to_file()
     assert fake_error.call_args[0][2] == error_message
+
+
+def test_log_loader_emits_each_log_as_it_is_loaded(core, monkeypatch):
+    monkeypatch.setattr("gridsync.gui.debug.read_log", lambda **_: "Test")
+    log_loader = LogLoader(core)
+    chunks = []
+    log_loader.chunk_loaded.connect(lambda c, f: chunks.append((c, f)))
+    log_loader.load()
+    # The header, application log, and 3 logs each for Tahoe and Magic-Folder
+    assert (
+        len(chunks),
+        "".join(c for c, _ in chunks),
+        "".join(f for _, f in chunks),
+    ) == (8, log_loader.content, log_loader.filtered_content)
+
+
+def test_log_loader_emits_progress(core):
+    log_loader = LogLoader(core)
+    progress = []
+    log_loader.progress.connect(lambda *args: progress.append(args))
+    log_loader.load()
+    assert progress[-1] == (7, 7)
+
+
+def test_log_loader_reads_tail_of_logs(core):
+    LogLoader(core, tail_bytes=1234).load()
+    assert core.gateways[0].get_log.call_args[0] == ("eliot", 1234)
+
+
+def test_log_loader_cancel(core):
+    log_loader = LogLoader(core)
+    core.gateways[0].get_log.side_effect = lambda *_: log_loader.cancel()
+    log_loader.load()
+    assert core.gateways[0].magic_folder.get_log.call_count == 0
+
+
+def test_debug_exporter_reject_cancels_loading(core):
+    de = DebugExporter(core)
+    de.log_loader_thread = Mock()
+    de.log_loader_thread.isRunning = Mock(return_value=True)
+    de.log_loader.cancel = Mock()
+    de.reject()
+    assert de.log_loader.cancel.call_count == 1
+
+
+def test_debug_exporter_on_chunk_loaded_appends_content(core):
+    de = DebugExporter(core)
+    de.checkbox.setCheckState(Qt.Unchecked)
+    de._clear_on_next_chunk = True
+    de.on_chunk_loaded("one\n", "<Filtered>\n")
+    de.on_chunk_loaded("two\n", "<Filtered>\n")
+    assert de.plaintextedit.toPlainText() == "one\ntwo\n"
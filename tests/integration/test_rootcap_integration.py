@@ -72,6 +72,69 @@ async def test_import_rootcap(tahoe_client, rootcap_manager):
     assert cap == backup_cap
 
 
+@ensureDeferred
+async def test_add_backups(tahoe_client, rootcap_manager):
+    caps = [await tahoe_client.mkdir() for _ in range(3)]
+    await rootcap_manager.add_backups(
+        [
+            ("TestBackups-7", "backup-7a", caps[0]),
+            ("TestBackups-7", "backup-7b", caps[1]),
+            ("TestBackups-8", "backup-8", caps[2]),
+        ]
+    )
+    backups_7 = await rootcap_manager.get_backups("TestBackups-7")
+    backups_8 = await rootcap_manager.get_backups("TestBackups-8")
+    assert (
+        backups_7["backup-7a"]["cap"],
+        backups_7["backup-7b"]["cap"],
+        backups_8["backup-8"]["cap"],
+    ) == tuple(caps)
+
+
+@ensureDeferred
+async def test_remove_backups(tahoe_client, rootcap_manager):
+    caps = [await tahoe_client.mkdir() for _ in range(3)]
+    await rootcap_manager.add_backups(
+        [
+            ("TestBackups-10", "backup-10a", caps[0]),
+            ("TestBackups-10", "backup-10b", caps[1]),
+            ("TestBackups-11", "backup-11", caps[2]),
+        ]
+    )
+    await rootcap_manager.remove_backups(
+        [
+            ("TestBackups-10", "backup-10a"),
+            ("TestBackups-11", "backup-11"),
+        ]
+    )
+    backups_10 = await rootcap_manager.get_backups("TestBackups-10")
+    backups_11 = await rootcap_manager.get_backups("TestBackups-11")
+    assert (sorted(backups_10), backups_11) == (["backup-10b"], {})
+
+
+@ensureDeferred
+async def test_import_rootcap_restores_many_backups(
+    tahoe_client, rootcap_manager
+):
+    source_rootcap = await tahoe_client.mkdir()
+    source_basedir = await tahoe_client.mkdir(source_rootcap, "v1")
+    expected = {}
+    for i in range(3):
+        source_backups = await tahoe_client.mkdir(
+            source_basedir, f"TestBackups-9-{i}"
+        )
+        expected[f"TestBackups-9-{i}"] = await tahoe_client.mkdir(
+            source_backups, f"backup-9-{i}"
+        )
+    await rootcap_manager.import_rootcap(source_rootcap)
+    restored = {}
+    for dirname in expected:
+        restored[dirname] = await rootcap_manager.get_backup(
+            dirname, f"backup-9-{dirname[-1]}"
+        )
+    assert restored == expected
+
+
 @ensureDeferred
 async def test_import_rootcap_raises_upgrade_required_error_for_v0_basedir(
     tahoe_client, rootcap_manager
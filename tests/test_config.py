@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import os
+import threading
+from unittest.mock import Mock
 
+import pytest
+
+from gridsync import config as config_module
 from gridsync.config import Config
 
 
@@ -45,3 +50,85 @@ def test_config_load(tmpdir):
     with open(config.filename, "w") as f:
         f.write("[test_section]\ntest_option = test_value\n\n")
     assert config.load() == {"test_section": {"test_option": "test_value"}}
+
+
+def test_read_config_is_cached_until_file_changes(tmpdir, monkeypatch):
+    filename = os.path.join(str(tmpdir), "test_cached.ini")
+    with open(filename, "w") as f:
+        f.write("[test_section]\ntest_option = test_value\n")
+    parse = Mock(wraps=config_module._parse)
+    monkeypatch.setattr(config_module, "_parse", parse)
+    config = Config(filename)
+    config.get("test_section", "test_option")
+    config.get("test_section", "test_option")
+    assert parse.call_count == 1
+
+
+def test_read_config_rereads_file_on_change(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_reread.ini"))
+    with open(config.filename, "w") as f:
+        f.write("[test_section]\ntest_option = old_value\n")
+    config.get("test_section", "test_option")
+    with open(config.filename, "w") as f:
+        f.write("[test_section]\ntest_option = changed_value\n")
+    assert config.get("test_section", "test_option") == "changed_value"
+
+
+def test_config_set_updates_cache(tmpdir):
+    filename = os.path.join(str(tmpdir), "test_set_cache.ini")
+    Config(filename).set("test_section", "test_option", "test_value")
+    assert Config(filename).get("test_section", "test_option") == (
+        "test_value"
+    )
+
+
+def test_config_transaction_writes_once(tmpdir, monkeypatch):
+    config = Config(os.path.join(str(tmpdir), "test_transaction.ini"))
+    write = Mock(wraps=config._write)
+    monkeypatch.setattr(config, "_write", write)
+    with config.transaction():
+        config.set("test_section", "option_1", "value_1")
+        config.set("test_section", "option_2", "value_2")
+        assert config.get("test_section", "option_1") == "value_1"
+        assert not os.path.exists(config.filename)
+    assert (write.call_count, config.load()) == (
+        1,
+        {"test_section": {"option_1": "value_1", "option_2": "value_2"}},
+    )
+
+
+def test_config_transaction_discards_changes_on_error(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_transaction_error.ini"))
+    config.set("test_section", "test_option", "old_value")
+    with pytest.raises(ValueError):
+        with config.transaction():
+            config.set("test_section", "test_option", "new_value")
+            raise ValueError
+    assert config.get("test_section", "test_option") == "old_value"
+
+
+def test_config_transaction_is_not_visible_to_other_threads(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_transaction_thread.ini"))
+    config.set("test_section", "test_option", "old_value")
+    seen = []
+    with config.transaction():
+        config.set("test_section", "test_option", "new_value")
+        thread = threading.Thread(
+            target=lambda: seen.append(
+                config.get("test_section", "test_option")
+            )
+        )
+        thread.start()
+        thread.join()
+    assert (seen, config.get("test_section", "test_option")) == (
+        ["old_value"],
+        "new_value",
+    )
+
+
+def test_config_transaction_does_not_cache_yielded_parser(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_transaction_cache.ini"))
+    with config.transaction() as parser:
+        config.set("test_section", "test_option", "test_value")
+    parser.set("test_section", "test_option", "modified_value")
+    assert config.get("test_section", "test_option") == "test_value"
@@ -1,19 +1,26 @@
 # -*- coding: utf-8 -*-
 
+import io
 import json
 import os
+import time
 from collections import OrderedDict
 from unittest.mock import Mock
 
 import pytest
 
 from gridsync import autostart_file_path, config_dir, pkgdir
+from gridsync.crypto import randstr
 from gridsync.filter import (
+    _compile_filters,
+    apply_eliot_filters,
     apply_filters,
     filter_eliot_log_message,
     filter_eliot_logs,
     get_filters,
+    iter_filtered_eliot_messages,
     join_eliot_logs,
+    write_filtered_eliot_log,
 )
 
 
@@ -154,6 +161,82 @@ def test_apply_filters_filtered_string_in_result(core, string, filtered):
     assert "<Filtered:{}>".format(filtered) in result
 
 
+def test_apply_filters_earlier_filters_take_precedence():
+    filters = [("/home/user/gridsync", "PkgDir"), ("/home/user", "HomeDir")]
+    result = apply_filters("/home/user/gridsync and /home/user", filters)
+    assert result == "<Filtered:PkgDir> and <Filtered:HomeDir>"
+
+
+def test_apply_filters_masks_all_of_overlapping_strings():
+    filters = [("abc123", "A"), ("xabc", "B")]
+    assert apply_filters("xabc123 xabc abc123", filters) == (
+        "<Filtered:A> <Filtered:B> <Filtered:A>"
+    )
+
+
+def test_apply_filters_prefers_longest_string_at_each_position():
+    filters = [("/home/user", "HomeDir"), ("/home/user/gridsync", "PkgDir")]
+    result = apply_filters("/home/user/gridsync and /home/user", filters)
+    assert result == "<Filtered:PkgDir> and <Filtered:HomeDir>"
+
+
+def test_apply_filters_does_not_filter_inserted_masks():
+    filters = [("secret", "Filtered"), ("Filtered", "Word")]
+    assert apply_filters("secret", filters) == "<Filtered:Filtered>"
+
+
+def test_apply_filters_skips_empty_filters():
+    filters = [("", "Empty"), (None, "None"), ("secret", "")]
+    assert apply_filters("secret", filters) == "secret"
+
+
+def test_apply_filters_escapes_regular_expression_characters():
+    filters = [("a.b*", "Pattern")]
+    assert apply_filters("a.b* aXb", filters) == "<Filtered:Pattern> aXb"
+
+
+def test_apply_filters_compiles_each_filter_set_once(core):
+    filters = get_filters(core)
+    _compile_filters.cache_clear()
+    apply_filters("TestGrid", filters)
+    apply_filters("TestGrid", list(filters))
+    assert _compile_filters.cache_info().misses == 1
+
+
+@pytest.mark.slow
+def test_apply_filters_benchmark():
+    filters = [
+        (f"URI:DIR2:{randstr(26)}:{randstr(52)}", f"Cap:{i}")
+        for i in range(500)
+    ]
+    filters += [(f"/home/user/Folder{i}", f"Path:{i}") for i in range(500)]
+    lines = []
+    for i in range(10 * 2**20 // 100):
+        secret = filters[i % len(filters)][0]
+        lines.append(f"INFO {secret} was processed".ljust(99) + "\n")
+    content = "".join(lines)
+
+    time_started = time.perf_counter()
+    expected = content
+    # Some paths are prefixes of others (e.g., "Folder1" of "Folder10") so,
+    # to mask the longest match, replace the longest strings first.
+    for s, mask in sorted(filters, key=lambda f: len(f[0]), reverse=True):
+        expected = expected.replace(s, f"<Filtered:{mask}>")
+    naive_duration = time.perf_counter() - time_started
+
+    time_started = time.perf_counter()
+    result = apply_filters(content, filters)
+    duration = time.perf_counter() - time_started
+
+    assert result == expected
+    # A single pass should be many times faster than one str.replace per
+    # filter; the numbers are reported in the message should it fail.
+    assert duration < naive_duration, (
+        f"apply_filters: {len(content)} bytes, {len(filters)} filters: "
+        f"{duration:.3f}s (one str.replace per filter: {naive_duration:.3f}s)"
+    )
+
+
 @pytest.mark.parametrize(
     "msg,keys",
     [
@@ -655,3 +738,39 @@ def test_filter_eliot_logs_apply_filter_use_identifier():
 def test_join_eliot_logs_sort_output():
     messages = ['{"C": 3, "A": 1, "B": 2}']
     assert join_eliot_logs(messages) == '{"A": 1, "B": 2, "C": 3}'
+
+
+def test_iter_filtered_eliot_messages_is_lazy():
+    def lines():
+        yield '{"action_type": "magic-folder:full-scan", "nickname": "A"}\n'
+        raise AssertionError("Read past the first message")
+
+    messages = iter_filtered_eliot_messages(lines(), "1")
+    assert next(messages) == (
+        '{"action_type": "magic-folder:full-scan", '
+        '"nickname": "<Filtered:GatewayName:1>"}'
+    )
+
+
+def test_write_filtered_eliot_log_skips_blank_lines():
+    out = io.StringIO()
+    write_filtered_eliot_log(['{"B": 2, "A": 1}\n', "\n", '{"C": 3}\n'], out)
+    assert out.getvalue() == '{"A": 1, "B": 2}\n{"C": 3}'
+
+
+def test_apply_eliot_filters_keeps_nan_and_large_integers():
+    content = '{"A": NaN}\n{"B": 123456789012345678901234567890}\n'
+    assert apply_eliot_filters(content) == (
+        '{"A": NaN}\n{"B": 123456789012345678901234567890}'
+    )
+
+
+def test_apply_eliot_filters_matches_filter_and_join():
+    content = (
+        '{"C": 3, "action_type": "magic-folder:full-scan", "nickname": "X"}\n'
+        "\n"
+        '{"message_type": "magic-folder:all-files", "files": ["a", "b"]}\n'
+    )
+    assert apply_eliot_filters(content, "1") == join_eliot_logs(
+        filter_eliot_logs(content.split("\n"), "1")
+    )
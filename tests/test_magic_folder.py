@@ -1,6 +1,8 @@
 from pathlib import Path
 
 import pytest
+from pytest_twisted import ensureDeferred
+from twisted.internet.defer import Deferred
 
 from gridsync.crypto import randstr
 from gridsync.magic_folder import (
@@ -55,3 +57,130 @@ def test__read_api_port_raises_magic_folder_config_error_if_not_int(tmp_path):
     Path(magic_folder.configdir / "api_client_endpoint").write_text(endpoint)
     with pytest.raises(MagicFolderConfigError):
         magic_folder._read_api_port()
+
+
+def fake_file_status(relpath, size, mtime=1, last_updated=1):
+    return {
+        "relpath": relpath,
+        "size": size,
+        "mtime": mtime,
+        "last-updated": last_updated,
+    }
+
+
+@pytest.fixture()
+def monitor(tmp_path):
+    magic_folder = MagicFolder(Tahoe(tmp_path / "nodedir"))
+    monitor = magic_folder.monitor
+    monitor._known_folders = {"TestFolder": {"magic_path": str(tmp_path)}}
+    return monitor
+
+
+def test_monitor_compare_files_emits_file_removed(monitor, qtbot):
+    monitor.compare_files(
+        {"TestFolder": [fake_file_status("a", 1), fake_file_status("b", 2)]}
+    )
+    with qtbot.wait_signal(monitor.file_removed) as blocker:
+        monitor.compare_files({"TestFolder": [fake_file_status("a", 1)]})
+    assert blocker.args[1]["relpath"] == "b"
+
+
+def test_monitor_compare_files_emits_total_folders_size_updated(
+    monitor, qtbot
+):
+    with qtbot.wait_signal(monitor.total_folders_size_updated) as blocker:
+        monitor.compare_files(
+            {
+                "TestFolder": [
+                    fake_file_status("a", 3),
+                    fake_file_status("b", 4),
+                ]
+            }
+        )
+    assert blocker.args == [7]
+
+
+def test_monitor_on_file_synced_updates_index_incrementally(
+    monitor, tmp_path, qtbot
+):
+    monitor.compare_files({"TestFolder": [fake_file_status("a", 3)]})
+    Path(tmp_path, "a").write_text("12345")
+    with qtbot.wait_signal(monitor.file_size_updated) as blocker:
+        monitor.on_file_synced("TestFolder", "a", 2.0)
+    assert (blocker.args[1]["size"], monitor._folder_sizes["TestFolder"]) == (
+        5,
+        5,
+    )
+
+
+def test_monitor_on_file_synced_emits_file_added(monitor, tmp_path, qtbot):
+    monitor.compare_files({"TestFolder": [fake_file_status("a", 3)]})
+    Path(tmp_path, "b").write_text("1234")
+    with qtbot.wait_signal(monitor.total_folders_size_updated) as blocker:
+        monitor.on_file_synced("TestFolder", "b", 2.0)
+    assert blocker.args == [7]
+
+
+def test_monitor_on_file_synced_marks_deleted_files(monitor, qtbot):
+    monitor.compare_files({"TestFolder": [fake_file_status("a", 3)]})
+    monitor.on_file_synced("TestFolder", "a", 2.0)
+    assert monitor._file_index["TestFolder"]["a"]["size"] is None
+
+
+def test_monitor_on_file_synced_reconciles_unknown_folder(monitor):
+    calls = []
+
+    async def fake_reconcile():
+        calls.append(True)
+
+    monitor._reconcile = fake_reconcile
+    monitor.on_file_synced("UnknownFolder", "a", 2.0)
+    assert calls == [True]
+
+
+@ensureDeferred
+async def test_await_running_returns_immediately_if_running(tmp_path):
+    magic_folder = MagicFolder(Tahoe(tmp_path / "nodedir"))
+    magic_folder.monitor.running = True
+    await magic_folder.await_running()
+    assert magic_folder._running_waiters == []
+
+
+@pytest.fixture()
+def magic_folder_with_sizes(tmp_path):
+    magic_folder = MagicFolder(Tahoe(tmp_path / "nodedir"))
+    pending = {}
+
+    async def get_folders():
+        return {"A": {}, "B": {}, "C": {}}
+
+    async def get_object_sizes(folder_name):
+        d = Deferred()
+        pending[folder_name] = d
+        return await d
+
+    magic_folder.get_folders = get_folders
+    magic_folder.get_object_sizes = get_object_sizes
+    return magic_folder, pending
+
+
+def test_get_all_object_sizes_returns_array(magic_folder_with_sizes):
+    magic_folder, pending = magic_folder_with_sizes
+    d = Deferred.fromCoroutine(magic_folder.get_all_object_sizes())
+    pending["C"].callback([5])
+    pending["A"].callback([1, 2])
+    pending["B"].callback([3, 4])
+    assert (d.result.typecode, d.result.tolist()) == ("Q", [1, 2, 3, 4, 5])
+
+
+def test_get_all_object_sizes_respects_max_concurrency(
+    magic_folder_with_sizes,
+):
+    magic_folder, pending = magic_folder_with_sizes
+    Deferred.fromCoroutine(magic_folder.get_all_object_sizes(2))
+    requested_before_release = sorted(pending)
+    pending["A"].callback([1])
+    assert (requested_before_release, sorted(pending)) == (
+        ["A", "B"],
+        ["A", "B", "C"],
+    )
@@ -0,0 +1,99 @@
+import pytest
+
+from gridsync.metrics import LatencyHistogram, RequestMetrics, endpoint_name
+
+
+def test_latency_histogram_record_updates_counts():
+    histogram = LatencyHistogram()
+    histogram.record(0.003)
+    histogram.record(0.003)
+    histogram.record(20)
+    assert (histogram.count, histogram.counts[2], histogram.counts[-1]) == (
+        3,
+        2,
+        1,
+    )
+
+
+def test_latency_histogram_mean():
+    histogram = LatencyHistogram()
+    histogram.record(1)
+    histogram.record(3)
+    assert histogram.mean() == 2
+
+
+def test_latency_histogram_mean_is_zero_if_empty():
+    assert LatencyHistogram().mean() == 0
+
+
+@pytest.mark.parametrize(
+    "pct, expected",
+    [
+        (50, 0.01),
+        (90, 0.01),
+        (99, 0.01),
+        (100, 0.3),
+    ],
+)
+def test_latency_histogram_percentile(pct, expected):
+    histogram = LatencyHistogram()
+    for _ in range(99):
+        histogram.record(0.007)
+    histogram.record(0.3)
+    assert histogram.percentile(pct) == expected
+
+
+def test_latency_histogram_percentile_is_capped_at_max():
+    histogram = LatencyHistogram()
+    histogram.record(42)
+    assert histogram.percentile(50) == 42
+
+
+def test_request_metrics_summary_groups_by_endpoint():
+    metrics = RequestMetrics()
+    metrics.record("GET /a", 0.1)
+    metrics.record("GET /a", 0.3)
+    metrics.record("GET /b", 0.2)
+    summary = metrics.summary()
+    assert (summary["GET /a"]["count"], summary["GET /b"]["count"]) == (2, 1)
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("GET", "?t=json", "GET /?t=json"),
+        ("GET", "/uri/URI:DIR2:aaa:bbb/?t=json", "GET /uri/{cap}?t=json"),
+        (
+            "POST",
+            "/uri/URI:DIR2:aaa:bbb/?t=unlink&name=Test",
+            "POST /uri/{cap}?t=unlink",
+        ),
+        (
+            "GET",
+            "/storage-plugins/zkapauthz/voucher/Test1234",
+            "GET /storage-plugins/zkapauthz/voucher/{voucher}",
+        ),
+        (
+            "GET",
+            "/v1/magic-folder?include_secret_information=1",
+            "GET /v1/magic-folder",
+        ),
+        (
+            "GET",
+            "/v1/magic-folder/My Folder/file-status",
+            "GET /v1/magic-folder/{folder}/file-status",
+        ),
+        (
+            "DELETE",
+            "/v1/magic-folder/TestFolder",
+            "DELETE /v1/magic-folder/{folder}",
+        ),
+        (
+            "POST",
+            "/experimental/magic-folder/TestFolder/invite",
+            "POST /experimental/magic-folder/{folder}/invite",
+        ),
+    ],
+)
+def test_endpoint_name(method, path, expected):
+    assert endpoint_name(method, path) == expected
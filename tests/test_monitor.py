@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Awaitable, Callable, TypeVar
+from typing import Awaitable, Callable, Optional, TypeVar
 from unittest.mock import MagicMock, Mock, call
 
 from pytest_twisted import inlineCallbacks
+from twisted.internet.defer import Deferred
 
-from gridsync.monitor import GridChecker, Monitor, ZKAPChecker, _parse_vouchers
+from gridsync.monitor import (
+    AdaptiveInterval,
+    GridChecker,
+    Monitor,
+    ZKAPChecker,
+    _parse_vouchers,
+    _VoucherIndex,
+)
 
 T = TypeVar("T")
 
@@ -186,3 +195,234 @@ def test__update_redeeming_vouchers_emits_redeeming_vouchers_updated(tahoe):
     checker.redeeming_vouchers_updated.connect(redeeming_vouchers.extend)
     checker._update_redeeming_vouchers(parsed.redeeming_vouchers)
     assert redeeming_vouchers == ["0MH30nxh9iup727nTi3u51Ir9HcQYIM8"]
+
+
+def test_adaptive_interval_backs_off_exponentially_up_to_maximum():
+    interval = AdaptiveInterval(minimum=2, maximum=10)
+    assert [interval.backoff() for _ in range(4)] == [4, 8, 10, 10]
+
+
+def test_adaptive_interval_reset():
+    interval = AdaptiveInterval(minimum=2, maximum=10)
+    interval.backoff()
+    assert interval.reset() == 2
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeChecker:
+    def __init__(self, urgent: bool = False) -> None:
+        self.checks = 0
+        self.value = 0
+        self.urgent = urgent
+        self.changing = False
+        self.pending: Optional[Deferred] = None
+
+    def state(self):
+        return self.value
+
+    def needs_attention(self) -> bool:
+        return self.urgent
+
+    def do_check(self):
+        self.checks += 1
+        if self.changing:
+            self.value += 1
+        return self.pending
+
+
+def make_monitor(zkap_checker, grid_checker):
+    clock = FakeClock()
+    monitor = Monitor(MagicMock(), clock=clock)
+    monitor.zkap_checker = zkap_checker
+    monitor.grid_checker = grid_checker
+    monitor.intervals["zkap"] = AdaptiveInterval(2, 16)
+    monitor.intervals["grid"] = AdaptiveInterval(2, 16)
+    return monitor, clock
+
+
+def run_checks(monitor, clock, seconds):
+    for _ in range(seconds):
+        monitor.do_checks()
+        clock.now += 1
+
+
+def test_monitor_backs_off_when_nothing_changes():
+    checker = FakeChecker()
+    monitor, clock = make_monitor(checker, FakeChecker(urgent=True))
+    run_checks(monitor, clock, 31)
+    # Checked at 0, 4, 12 and 28 seconds
+    assert checker.checks == 4
+
+
+def test_monitor_checks_often_while_checker_needs_attention():
+    checker = FakeChecker(urgent=True)
+    monitor, clock = make_monitor(checker, FakeChecker())
+    run_checks(monitor, clock, 30)
+    assert checker.checks == 15
+
+
+def test_monitor_resets_interval_when_state_changes():
+    checker = FakeChecker()
+    monitor, clock = make_monitor(checker, FakeChecker())
+    run_checks(monitor, clock, 15)
+    assert monitor.intervals["zkap"].current == 16
+    checker.changing = True
+    clock.now = 28
+    run_checks(monitor, clock, 1)
+    assert monitor.intervals["zkap"].current == 2
+
+
+def test_monitor_checks_less_often_while_hidden():
+    checker = FakeChecker()
+    monitor, clock = make_monitor(checker, FakeChecker())
+    monitor.set_visible(False)
+    run_checks(monitor, clock, 31)
+    # Checked at 0 and 16 seconds (with the hidden interval multiplier of 4)
+    assert checker.checks == 2
+
+
+def test_monitor_checks_immediately_when_shown():
+    checker = FakeChecker()
+    monitor, clock = make_monitor(checker, FakeChecker())
+    monitor.set_visible(False)
+    run_checks(monitor, clock, 2)
+    monitor.set_visible(True)
+    run_checks(monitor, clock, 1)
+    assert checker.checks == 2
+
+
+def test_monitor_runs_checkers_independently():
+    slow_checker = FakeChecker()
+    slow_checker.pending = Deferred()
+    fast_checker = FakeChecker(urgent=True)
+    monitor, clock = make_monitor(slow_checker, fast_checker)
+    run_checks(monitor, clock, 10)
+    assert (slow_checker.checks, fast_checker.checks) == (1, 5)
+
+
+def test_grid_checker_needs_attention_while_flapping():
+    clock = FakeClock()
+    gc = GridChecker(MagicMock(), clock=clock)
+    gc.is_connected = True
+    gc._record_transition()
+    clock.now += 10
+    gc._record_transition()
+    assert gc.needs_attention()
+
+
+def test_grid_checker_does_not_need_attention_when_stably_connected():
+    clock = FakeClock()
+    gc = GridChecker(MagicMock(), clock=clock)
+    gc.is_connected = True
+    gc._record_transition()
+    clock.now += 1000
+    gc._record_transition()
+    assert not gc.needs_attention()
+
+
+def test_zkap_checker_needs_attention_while_redeeming(tahoe):
+    checker = ZKAPChecker(tahoe)
+    checker.redeeming_vouchers = ["voucher"]
+    assert checker.needs_attention()
+
+
+def redeemed_voucher(number, tokens, finished):
+    return {
+        "created": "2022-01-17T13:53:16.865887+00:00",
+        "number": number,
+        "state": {
+            "name": "redeemed",
+            "token-count": tokens,
+            "finished": finished,
+        },
+    }
+
+
+def test_voucher_index_tracks_changed_vouchers_incrementally():
+    index = _VoucherIndex(
+        datetime(2021, 12, 21, 13, 23, 50, tzinfo=timezone.utc)
+    )
+    redeeming = {
+        "created": "2022-01-17T13:53:16.865887+00:00",
+        "number": "b",
+        "state": {"name": "redeeming", "counter": 3},
+    }
+    a = redeemed_voucher("a", 100, "2022-01-17T14:00:00")
+    assert index.update([a, redeeming]) == (False, True)
+    assert index.update([a, redeeming]) == (False, False)
+    b = redeemed_voucher("b", 50, "2022-01-18T14:00:00")
+    assert index.update([a, b]) == (False, True)
+    assert index.parse() == _parse_vouchers([a, b], index.time_started)
+
+
+def test_voucher_index_forgets_removed_vouchers():
+    index = _VoucherIndex(
+        datetime(2021, 12, 21, 13, 23, 50, tzinfo=timezone.utc)
+    )
+    a = redeemed_voucher("a", 100, "2022-01-17T14:00:00")
+    b = redeemed_voucher("b", 50, "2022-01-18T14:00:00")
+    index.update([a, b])
+    index.update([a])
+    assert (index.total_tokens, index.zkaps_last_redeemed) == (
+        100,
+        "2022-01-17T14:00:00",
+    )
+
+
+def test_voucher_index_parses_creation_time_once():
+    index = _VoucherIndex(
+        datetime(2021, 12, 21, 13, 23, 50, tzinfo=timezone.utc)
+    )
+    unpaid = {
+        "created": "2022-01-17T13:53:16.865887+00:00",
+        "number": "a",
+        "state": {"name": "unpaid"},
+    }
+    index.update([unpaid])
+    unpaid = dict(unpaid, created="not a datetime")
+    index.update([dict(unpaid, state={"name": "redeeming", "counter": 0})])
+    index.update([unpaid])  # Does not raise
+    assert index.unpaid_vouchers == {"a"}
+
+
+@inlineCallbacks
+def test_zkap_checker_emits_unpaid_vouchers_only_when_changed(tahoe):
+    unpaid = {
+        "created": datetime.now(tz=timezone.utc).isoformat(),
+        "number": "a",
+        "state": {"name": "unpaid"},
+    }
+    checker = ZKAPChecker(tahoe)
+    checker._time_started = datetime(
+        2021, 12, 21, 13, 23, 50, tzinfo=timezone.utc
+    )
+    tahoe.zkap_auth_required = True
+    tahoe.nodeurl = "http://127.0.0.1:1234"
+    tahoe.zkapauthorizer = Mock(zkap_batch_size=0)
+    tahoe.zkapauthorizer.get_vouchers = Mock(return_value=[unpaid])
+    tahoe.zkapauthorizer.get_lease_maintenance = Mock(return_value={})
+    checker.update_price = Mock()
+    emitted = []
+    checker.unpaid_vouchers_updated.connect(emitted.append)
+    for _ in range(3):
+        yield checker.do_check()
+    assert emitted == [["a"]]
+
+
+def test_zkap_checker_emits_days_remaining_forecast_from_history(tahoe):
+    checker = ZKAPChecker(tahoe)
+    now = time.time()
+    checker.history.record(now - 86400, 100, 100, 0)
+    checker.zkaps_remaining = 90
+    checker.zkaps_total = 100
+    emitted = []
+    checker.days_remaining_updated.connect(emitted.append)
+    checker._record_history()
+    assert emitted == [9]
@@ -0,0 +1,124 @@
+from pathlib import Path
+
+from pytest_twisted import ensureDeferred
+from twisted.internet.defer import Deferred, succeed
+
+from gridsync.startup import (
+    StartupTimer,
+    VersionCache,
+    get_executable_version,
+    mark_startup,
+    run_concurrently,
+    start_profiling,
+    stop_profiling,
+)
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_startup_timer_records_phases():
+    clock = FakeTimer()
+    timer = StartupTimer(timer=clock)
+    with timer.phase("tor"):
+        clock.now += 1.5
+    with timer.phase("configure"):
+        clock.now += 0.25
+    assert timer.summary() == (
+        "Startup took 1.750s (tor: 1.500s, configure: 0.250s)"
+    )
+
+
+def test_startup_timer_accumulates_repeated_phases():
+    clock = FakeTimer()
+    timer = StartupTimer(timer=clock)
+    for _ in range(2):
+        with timer.phase("start"):
+            clock.now += 1
+    assert timer.phases == {"start": 2}
+
+
+def test_run_concurrently_limits_concurrency():
+    pending = [Deferred() for _ in range(3)]
+    started = []
+
+    def start(i):
+        started.append(i)
+        return pending[i]
+
+    d = run_concurrently([lambda i=i: start(i) for i in range(3)], 2)
+    assert started == [0, 1]
+    pending[0].callback("a")
+    assert started == [0, 1, 2]
+    pending[2].callback("c")
+    pending[1].callback("b")
+    assert d.result == ["a", "b", "c"]
+
+
+def test_run_concurrently_fails_with_first_failure():
+    pending = Deferred()
+    d = run_concurrently([lambda: pending], 1)
+    errors = []
+    d.addErrback(errors.append)
+    pending.errback(ValueError("oops"))
+    assert errors[0].check(ValueError)
+
+
+def test_version_cache_persists_versions(tmp_path):
+    executable = tmp_path / "tahoe"
+    executable.write_text("#!/bin/sh\n")
+    VersionCache(tmp_path / "versions.json").set(str(executable), "1.18.0")
+    cache = VersionCache(tmp_path / "versions.json")
+    assert cache.get(str(executable)) == "1.18.0"
+
+
+def test_version_cache_discards_versions_of_changed_executables(tmp_path):
+    executable = tmp_path / "tahoe"
+    executable.write_text("#!/bin/sh\n")
+    cache = VersionCache(tmp_path / "versions.json")
+    cache.set(str(executable), "1.18.0")
+    executable.write_text("#!/bin/sh\n# upgraded\n")
+    assert cache.get(str(executable)) is None
+
+
+def test_version_cache_get_missing_executable(tmp_path):
+    cache = VersionCache(tmp_path / "versions.json")
+    assert cache.get(str(Path(tmp_path, "missing"))) is None
+
+
+@ensureDeferred
+async def test_get_executable_version_probes_only_once(tmp_path):
+    executable = tmp_path / "magic-folder"
+    executable.write_text("#!/bin/sh\n")
+    cache = VersionCache(tmp_path / "versions.json")
+    probes = []
+
+    def probe():
+        probes.append(1)
+        return succeed("23.6.0")
+
+    for _ in range(2):
+        version = await get_executable_version(str(executable), probe, cache)
+    assert (version, len(probes)) == ("23.6.0", 1)
+
+
+def test_startup_profiler_writes_milestones_and_stats(tmp_path):
+    profiler = start_profiling(tmp_path / "startup.txt")
+    mark_startup("tray icon shown")
+    stop_profiling()
+    report = (tmp_path / "startup.txt").read_text()
+    assert (
+        list(profiler.milestones)[:2],
+        "tray icon shown" in report,
+        "cumulative" in report,
+    ) == (["profiling started", "tray icon shown"], True, True)
+
+
+def test_mark_startup_does_nothing_when_not_profiling():
+    stop_profiling()
+    mark_startup("reactor started")  # Does not raise
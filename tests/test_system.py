@@ -1,7 +1,9 @@
 import pytest
+from twisted.internet.error import ProcessDone
+from twisted.python.failure import Failure
 
 from gridsync.crypto import randstr
-from gridsync.system import which
+from gridsync.system import SubprocessError, SubprocessProtocol, which
 
 
 def test_which():
@@ -12,3 +14,74 @@ def test_which():
 def test_which_raises_environment_error():
     with pytest.raises(EnvironmentError):
         which(randstr(32))
+
+
+def test_subprocess_protocol_joins_lines_split_across_chunks():
+    lines = []
+    protocol = SubprocessProtocol(stdout_line_collector=lines.append)
+    protocol.childDataReceived(1, b"first li")
+    protocol.childDataReceived(1, b"ne\nsecond line\nthi")
+    protocol.childDataReceived(1, b"rd line\n")
+    assert lines == ["first line", "second line", "third line"]
+
+
+def test_subprocess_protocol_decodes_characters_split_across_chunks():
+    lines = []
+    protocol = SubprocessProtocol(stdout_line_collector=lines.append)
+    data = "café\n".encode("utf-8")
+    protocol.childDataReceived(1, data[:4])
+    protocol.childDataReceived(1, data[4:])
+    assert lines == ["café"]
+
+
+def test_subprocess_protocol_frames_each_fd_separately():
+    stdout, stderr = [], []
+    protocol = SubprocessProtocol(
+        stdout_line_collector=stdout.append,
+        stderr_line_collector=stderr.append,
+    )
+    protocol.childDataReceived(1, b"out")
+    protocol.childDataReceived(2, b"err\n")
+    protocol.childDataReceived(1, b"put\n")
+    assert (stdout, stderr) == (["output"], ["err"])
+
+
+def test_subprocess_protocol_flushes_partial_line_on_connection_lost():
+    lines = []
+    protocol = SubprocessProtocol(stdout_line_collector=lines.append)
+    protocol.childDataReceived(1, b"no trailing newline")
+    protocol.childConnectionLost(1)
+    assert lines == ["no trailing newline"]
+
+
+def test_subprocess_protocol_callback_trigger_split_across_chunks():
+    protocol = SubprocessProtocol(callback_triggers=["client running"])
+    protocol.childDataReceived(1, b"client ru")
+    assert not protocol.done.called
+    protocol.childDataReceived(1, b"nning\n")
+    assert protocol.done.result == "client running"
+
+
+def test_subprocess_protocol_errback_trigger():
+    protocol = SubprocessProtocol(
+        callback_triggers=["started"],
+        errback_triggers=[("failed", SubprocessError)],
+    )
+    errors = []
+    protocol.done.addErrback(errors.append)
+    protocol.childDataReceived(2, b"startup failed\n")
+    assert errors[0].check(SubprocessError)
+
+
+def test_subprocess_protocol_caps_output_at_line_boundary():
+    protocol = SubprocessProtocol(max_output_bytes=10)
+    protocol.childDataReceived(1, b"line one\nline two\nline 3\n")
+    assert protocol._get_output() == "line 3"
+
+
+def test_subprocess_protocol_process_ended_returns_output():
+    lines = []
+    protocol = SubprocessProtocol(stdout_line_collector=lines.append)
+    protocol.childDataReceived(1, b"1.2.3")
+    protocol.processEnded(Failure(ProcessDone(0)))
+    assert (protocol.done.result, lines) == ("1.2.3", ["1.2.3"])
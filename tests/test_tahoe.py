@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import json
 import os
 from pathlib import Path
 from typing import Awaitable, Callable, TypeVar
@@ -14,7 +15,9 @@ import yaml
 from pytest_twisted import ensureDeferred, inlineCallbacks
 from twisted.internet.defer import Deferred, succeed
 from twisted.internet.testing import MemoryReactorClock
+from twisted.web.http_headers import Headers
 
+from gridsync.capabilities import diminish
 from gridsync.crypto import randstr
 from gridsync.errors import TahoeCommandError, TahoeError, TahoeWebError
 from gridsync.tahoe import (
@@ -25,6 +28,7 @@ from gridsync.tahoe import (
     is_valid_furl,
     storage_options_to_config,
 )
+from gridsync.transfer import DownloadJournal
 from gridsync.zkapauthorizer import PLUGIN_NAME as ZKAPAUTHZ_PLUGIN_NAME
 
 
@@ -40,6 +44,12 @@ def fake_get_code_500(*args, **kwargs):
     return succeed(response)
 
 
+def fake_post_code_404(*args, **kwargs):
+    response = MagicMock()
+    response.code = 404
+    return succeed(response)
+
+
 def fake_put(*args, **kwargs):
     response = MagicMock()
     response.code = 200
@@ -674,9 +684,12 @@ def test_concurrent_await_ready(tahoe, monkeypatch):
     # anything.  Replace it with a scheduler we control.
     clock = MemoryReactorClock()
     tahoe._ready_poller.clock = clock
+    tahoe.readiness.clock = clock
 
     @inlineCallbacks
     def measure_poll_count(how_many_waiters):
+        # Forget the (cached) result of any previous measurement.
+        tahoe.readiness.invalidate()
         is_ready = False
         poll_count = 0
 
@@ -720,6 +733,67 @@ def test_concurrent_await_ready(tahoe, monkeypatch):
     assert abs(multi_count - single_count) <= 1
 
 
+def test_await_ready_does_not_poll_if_ready_state_is_cached(
+    tahoe, monkeypatch
+):
+    tahoe.readiness.clock = MemoryReactorClock()
+    tahoe.shares_happy = 7
+    tahoe.monitor.grid_status_checked.emit(7)
+    is_ready = Mock()
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.is_ready", is_ready)
+    d = tahoe.await_ready()
+    assert (d.called, is_ready.called) == (True, False)
+
+
+def test_await_ready_waits_for_grid_status_update(tahoe):
+    tahoe.readiness.clock = MemoryReactorClock()
+    tahoe.shares_happy = 7
+    tahoe.monitor.grid_status_checked.emit(3)
+    d = tahoe.await_ready()
+    called_before = d.called
+    tahoe.monitor.grid_status_checked.emit(7)
+    assert (called_before, d.called) == (False, True)
+
+
+def test_await_ready_ready_via_magic_folder_connection_changed(tahoe):
+    tahoe.readiness.clock = MemoryReactorClock()
+    tahoe.shares_happy = 7
+    tahoe.monitor.grid_status_checked.emit(3)
+    d = tahoe.await_ready()
+    tahoe._on_magic_folder_connection_changed(7, 7, True)
+    assert d.called
+
+
+@inlineCallbacks
+def test_await_ready_polls_if_ready_state_is_stale(tahoe, monkeypatch):
+    clock = MemoryReactorClock()
+    tahoe.readiness.clock = clock
+    tahoe.shares_happy = 7
+    tahoe.monitor.grid_status_checked.emit(7)
+    clock.advance(tahoe.readiness.max_age + 1)
+    is_ready = Mock(return_value=succeed(True))
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.is_ready", lambda _: is_ready())
+    yield tahoe.await_ready()
+    assert is_ready.called
+
+
+@inlineCallbacks
+def test_await_ready_polls_if_not_ready(tahoe, monkeypatch):
+    tahoe.readiness.clock = MemoryReactorClock()
+    tahoe.shares_happy = 7
+    tahoe.monitor.grid_status_checked.emit(3)
+    is_ready = Mock(return_value=succeed(True))
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.is_ready", lambda _: is_ready())
+    yield tahoe.await_ready()
+    assert (is_ready.called, tahoe.readiness.is_ready()) == (True, True)
+
+
+def test_readiness_max_age_covers_next_grid_check(tahoe, monkeypatch):
+    monkeypatch.setattr(tahoe.monitor, "time_until_check", lambda _: 240.0)
+    tahoe.monitor.check_finished.emit()
+    assert tahoe.readiness.max_age > 240
+
+
 @inlineCallbacks
 def test_tahoe_mkdir(tahoe, monkeypatch):
     monkeypatch.setattr(
@@ -803,6 +877,145 @@ async def test_tahoe_download_fail_code_500(tahoe, monkeypatch):
         await tahoe.download("test_cap", os.path.join(tahoe.nodedir, "nofile"))
 
 
+def fake_range_get(data: bytes, requested: list):
+    def get(url, headers=None, pool=None):
+        range_header = headers.get("Range", "")
+        requested.append(range_header)
+        response = MagicMock()
+        if not range_header:
+            response.code = 200
+            response.body = data
+            return succeed(response)
+        first, last = map(int, range_header.split("=")[1].split("-"))
+        end = min(last + 1, len(data))
+        last = end - 1
+        response.code = 206
+        response.body = data[first:end]
+        response.headers = Headers(
+            {"Content-Range": [f"bytes {first}-{last}/{len(data)}"]}
+        )
+        return succeed(response)
+
+    return get
+
+
+@ensureDeferred
+async def test_tahoe_download_fetches_ranges_in_parallel(tahoe, monkeypatch):
+    requested = []
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.get", fake_range_get(b"abcdefghij", requested))
+    monkeypatch.setattr("treq.content", lambda r: succeed(r.body))
+    location = os.path.join(tahoe.nodedir, "test_downloaded_file")
+    await tahoe.download("URI:CHK:aaa:bbb", location, segment_size=4)
+    with open(location, "rb") as f:
+        assert (f.read(), requested) == (
+            b"abcdefghij",
+            ["bytes=0-3", "bytes=4-7", "bytes=8-9"],
+        )
+
+
+@ensureDeferred
+async def test_tahoe_download_reports_progress(tahoe, monkeypatch):
+    progress = []
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.get", fake_range_get(b"abcdefghij", []))
+    monkeypatch.setattr("treq.content", lambda r: succeed(r.body))
+    await tahoe.download(
+        "URI:CHK:aaa:bbb",
+        os.path.join(tahoe.nodedir, "test_downloaded_file"),
+        progress_callback=lambda received, total, _: progress.append(
+            (received, total)
+        ),
+        segment_size=4,
+    )
+    assert progress == [(4, 10), (8, 10), (10, 10)]
+
+
+@ensureDeferred
+async def test_tahoe_download_resumes_from_journal(tahoe, monkeypatch):
+    requested = []
+    location = os.path.join(tahoe.nodedir, "test_downloaded_file")
+    journal = DownloadJournal.create(location, "URI:CHK:aaa:bbb", 10, 4)
+    journal.write_segment(0, b"abcd")
+    journal.write_segment(2, b"ij")
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.get", fake_range_get(b"abcdefghij", requested))
+    monkeypatch.setattr("treq.content", lambda r: succeed(r.body))
+    await tahoe.download("URI:CHK:aaa:bbb", location)
+    with open(location, "rb") as f:
+        assert (f.read(), requested) == (b"abcdefghij", ["bytes=4-7"])
+
+
+@ensureDeferred
+async def test_tahoe_download_keeps_journal_on_failure(tahoe, monkeypatch):
+    location = os.path.join(tahoe.nodedir, "test_downloaded_file")
+    range_get = fake_range_get(b"abcdefghij", [])
+
+    def get(url, headers=None, pool=None):
+        if headers["Range"] == "bytes=8-9":
+            return fake_get_code_500()
+        return range_get(url, headers, pool)
+
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.get", get)
+    monkeypatch.setattr(
+        "treq.content", lambda r: succeed(getattr(r, "body", b"Error"))
+    )
+    with pytest.raises(TahoeWebError):
+        await tahoe.download("URI:CHK:aaa:bbb", location, segment_size=4)
+    journal = DownloadJournal.load(location, "URI:CHK:aaa:bbb")
+    assert (journal.missing_segments(), os.path.exists(location)) == (
+        [2],
+        False,
+    )
+
+
+@ensureDeferred
+async def test_tahoe_download_mutable_file_in_single_request(
+    tahoe, monkeypatch
+):
+    requested = []
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.get", fake_range_get(b"abcdefghij", requested))
+    monkeypatch.setattr(
+        "treq.collect", lambda r, collector: succeed(collector(r.body))
+    )
+    location = os.path.join(tahoe.nodedir, "test_downloaded_file")
+    await tahoe.download("URI:SSK:aaa:bbb", location, segment_size=4)
+    with open(location, "rb") as f:
+        assert (f.read(), requested) == (b"abcdefghij", [""])
+
+
+@ensureDeferred
+async def test_tahoe_download_single_segment_without_journal(
+    tahoe, monkeypatch
+):
+    requested = []
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.get", fake_range_get(b"abcdefghij", requested))
+    monkeypatch.setattr("treq.content", lambda r: succeed(r.body))
+    location = os.path.join(tahoe.nodedir, "test_downloaded_file")
+    await tahoe.download("URI:CHK:aaa:bbb", location, segment_size=16)
+    with open(location, "rb") as f:
+        assert (f.read(), requested, os.path.exists(location + ".part")) == (
+            b"abcdefghij",
+            ["bytes=0-15"],
+            False,
+        )
+
+
 @ensureDeferred
 async def test_tahoe_link(tahoe, monkeypatch):
     monkeypatch.setattr(
@@ -824,14 +1037,57 @@ async def test_tahoe_link_fail_code_500(tahoe, monkeypatch):
         await tahoe.link("test_dircap", "test_childname", "test_childcap")
 
 
+@ensureDeferred
+async def test_tahoe_set_children_links_children_in_one_request(
+    tahoe, monkeypatch
+):
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    requests = []
+
+    async def fake_request(_, method, path, **kwargs):
+        requests.append((method, path, kwargs))
+        return ""
+
+    monkeypatch.setattr("gridsync.tahoe.Tahoe._request", fake_request)
+    await tahoe.set_children(
+        "URI:DIR2:aaaa:bbbb", {"a": "URI:A", "b": "URI:B"}
+    )
+    [(method, path, kwargs)] = requests
+    assert (method, path, kwargs["params"], json.loads(kwargs["data"])) == (
+        "POST",
+        "/uri/URI:DIR2:aaaa:bbbb/",
+        {"t": "set_children", "replace": "true"},
+        {
+            "a": ["unknown", {"rw_uri": "URI:A", "ro_uri": "URI:A"}],
+            "b": ["unknown", {"rw_uri": "URI:B", "ro_uri": "URI:B"}],
+        },
+    )
+
+
 @ensureDeferred
 async def test_tahoe_unlink(tahoe, monkeypatch):
     monkeypatch.setattr(
         "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
     )
     monkeypatch.setattr("treq.post", fake_post)
+    content = Mock(return_value=succeed(b""))
+    monkeypatch.setattr("treq.content", content)
     await tahoe.unlink("test_dircap", "test_childname")
-    assert True
+    assert content.called
+
+
+@ensureDeferred
+async def test_tahoe_unlink_missing_ok_reads_response_body(tahoe, monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.post", fake_post_code_404)
+    content = Mock(return_value=succeed(b"Not Found"))
+    monkeypatch.setattr("treq.content", content)
+    await tahoe.unlink("test_dircap", "test_childname", missing_ok=True)
+    assert content.called
 
 
 @ensureDeferred
@@ -845,6 +1101,139 @@ async def test_tahoe_unlink_fail_code_500(tahoe, monkeypatch):
         await tahoe.unlink("test_dircap", "test_childname")
 
 
+def fake_dirnode_request(requests: list):
+    async def fake(self, method, path="", **kwargs):
+        requests.append((method, path))
+        return '["dirnode", {"children": {}}]'
+
+    return fake
+
+
+@ensureDeferred
+async def test_get_json_caches_listings(tahoe, monkeypatch):
+    requests = []
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe._request", fake_dirnode_request(requests)
+    )
+    await tahoe.get_json("URI:DIR2:aaa:bbb")
+    await tahoe.get_json("URI:DIR2:aaa:bbb")
+    assert (len(requests), tahoe.dirnode_cache.hits) == (1, 1)
+
+
+@ensureDeferred
+async def test_get_json_returns_independent_copies(tahoe, monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe._request", fake_dirnode_request([])
+    )
+    first = await tahoe.get_json("URI:DIR2:aaa:bbb")
+    first[1]["children"]["modified"] = True
+    second = await tahoe.get_json("URI:DIR2:aaa:bbb")
+    assert second[1]["children"] == {}
+
+
+@ensureDeferred
+async def test_link_invalidates_cached_listing(tahoe, monkeypatch):
+    requests = []
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe._request", fake_dirnode_request(requests)
+    )
+    await tahoe.get_json("URI:DIR2:aaa:bbb")
+    await tahoe.link("URI:DIR2:aaa:bbb", "child", "URI:CHK:ccc")
+    await tahoe.get_json("URI:DIR2:aaa:bbb")
+    assert requests[-1] == ("GET", "/uri/URI:DIR2:aaa:bbb/?t=json")
+
+
+@ensureDeferred
+async def test_unlink_invalidates_cached_readonly_listing(tahoe, monkeypatch):
+    dircap = tahoe.get_rootcap()
+    readcap = diminish(dircap)
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe._request", fake_dirnode_request([])
+    )
+    monkeypatch.setattr("treq.post", fake_post)
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
+    await tahoe.get_json(readcap)
+    await tahoe.get_json(f"{readcap}/subdir")
+    await tahoe.unlink(dircap, "child")
+    assert len(tahoe.dirnode_cache) == 0
+
+
+@ensureDeferred
+async def test_mkdir_invalidates_cached_parent_listing(tahoe, monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe._request", fake_dirnode_request([])
+    )
+    await tahoe.get_json("URI:DIR2:aaa:bbb")
+    await tahoe.mkdir("URI:DIR2:aaa:bbb", "child")
+    assert len(tahoe.dirnode_cache) == 0
+
+
+@ensureDeferred
+async def test_get_json_does_not_cache_listing_raced_by_change(
+    tahoe, monkeypatch
+):
+    async def fake_request(self, method, path="", **kwargs):
+        self.invalidate_dirnode("URI:DIR2:aaa:bbb")  # A concurrent link()
+        return "[]"
+
+    monkeypatch.setattr("gridsync.tahoe.Tahoe._request", fake_request)
+    await tahoe.get_json("URI:DIR2:aaa:bbb")
+    assert len(tahoe.dirnode_cache) == 0
+
+
+@ensureDeferred
+async def test_tahoe_request_uses_http_pool(tahoe, monkeypatch):
+    fake_request = Mock(side_effect=fake_get)
+    monkeypatch.setattr("treq.request", fake_request)
+    monkeypatch.setattr("treq.content", lambda _: succeed(b"test content"))
+    await tahoe._request("GET", "/uri/test_cap")
+    assert fake_request.call_args[1]["pool"] is tahoe.http_pool
+
+
+@ensureDeferred
+async def test_tahoe_request_calls_request_hooks(tahoe, monkeypatch):
+    calls = []
+    tahoe.request_hooks.append(
+        lambda method, endpoint, code, _: calls.append(
+            (method, endpoint, code)
+        )
+    )
+    monkeypatch.setattr("treq.request", fake_get)
+    monkeypatch.setattr("treq.content", lambda _: succeed(b"test content"))
+    await tahoe._request("GET", params={"t": "json"})
+    assert calls == [("GET", "GET /?t=json", 200)]
+
+
+@ensureDeferred
+async def test_tahoe_request_records_metrics(tahoe, monkeypatch):
+    monkeypatch.setattr("treq.request", fake_get)
+    monkeypatch.setattr("treq.content", lambda _: succeed(b"test content"))
+    await tahoe._request("GET", params={"t": "json"})
+    await tahoe._request("GET", params={"t": "json"})
+    assert tahoe.request_metrics.summary()["GET /?t=json"]["count"] == 2
+
+
+def test_tahoe_http_pool_settings(tmp_path):
+    client = Tahoe(
+        str(tmp_path / "nodedir"),
+        max_persistent_per_host=7,
+        connection_idle_timeout=42,
+    )
+    assert (
+        client.http_pool.maxPersistentPerHost,
+        client.http_pool.cachedConnectionTimeout,
+    ) == (7, 42)
+
+
 @ensureDeferred
 async def test_tahoe_start_use_tor_false(monkeypatch, tmpdir_factory):
     client = Tahoe(str(tmpdir_factory.mktemp("tahoe-start")))
@@ -0,0 +1,172 @@
+import os
+from io import BytesIO
+
+import pytest
+from twisted.internet.defer import CancelledError
+from twisted.internet.task import Clock
+
+from gridsync.transfer import (
+    DownloadJournal,
+    UploadProducer,
+    parse_content_range,
+)
+
+
+class FakeConsumer:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+
+def test_upload_producer_writes_file_in_chunks():
+    clock = Clock()
+    producer = UploadProducer(BytesIO(b"a" * 10), clock, chunk_size=4)
+    consumer = FakeConsumer()
+    d = producer.startProducing(consumer)
+    clock.advance(0)
+    clock.advance(0)
+    clock.advance(0)
+    clock.advance(0)
+    assert (consumer.chunks, d.called) == ([b"aaaa", b"aaaa", b"aa"], True)
+
+
+def test_upload_producer_length_of_real_file(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b"a" * 1234)
+    with open(path, "rb") as f:
+        assert UploadProducer(f, Clock()).length == 1234
+
+
+def test_upload_producer_reports_progress():
+    clock = Clock()
+    progress = []
+    producer = UploadProducer(
+        BytesIO(b"a" * 10),
+        clock,
+        chunk_size=5,
+        progress_callback=lambda sent, *_: progress.append(sent),
+    )
+    producer.startProducing(FakeConsumer())
+    clock.pump([0, 0, 0])
+    assert progress == [5, 10]
+
+
+def test_upload_producer_throttles_writes():
+    clock = Clock()
+    producer = UploadProducer(
+        BytesIO(b"a" * 30), clock, chunk_size=10, rate_limit=10
+    )
+    consumer = FakeConsumer()
+    producer.startProducing(consumer)
+    clock.advance(0)
+    clock.advance(0.5)
+    written_before_delay = len(consumer.chunks)
+    clock.advance(0.5)
+    assert (written_before_delay, len(consumer.chunks)) == (1, 2)
+
+
+def test_upload_producer_pause_and_resume():
+    clock = Clock()
+    producer = UploadProducer(BytesIO(b"a" * 10), clock, chunk_size=5)
+    consumer = FakeConsumer()
+    producer.startProducing(consumer)
+    producer.pauseProducing()
+    clock.pump([0, 0])
+    written_while_paused = len(consumer.chunks)
+    producer.resumeProducing()
+    clock.pump([0, 0])
+    assert (written_while_paused, len(consumer.chunks)) == (0, 2)
+
+
+def test_upload_producer_stop_producing():
+    clock = Clock()
+    producer = UploadProducer(BytesIO(b"a" * 10), clock, chunk_size=5)
+    consumer = FakeConsumer()
+    d = producer.startProducing(consumer)
+    producer.stopProducing()
+    clock.pump([0, 0])
+    assert (consumer.chunks, d.called) == ([], False)
+
+
+def test_upload_producer_cancel():
+    clock = Clock()
+    producer = UploadProducer(BytesIO(b"a" * 10), clock, chunk_size=5)
+    consumer = FakeConsumer()
+    d = producer.startProducing(consumer)
+    errors = []
+    d.addErrback(errors.append)
+    d.cancel()
+    clock.pump([0, 0])
+    assert (consumer.chunks, errors[0].check(CancelledError)) == (
+        [],
+        CancelledError,
+    )
+
+
+def test_parse_content_range():
+    assert parse_content_range("bytes 0-99/1234") == (0, 99, 1234)
+
+
+@pytest.mark.parametrize(
+    "value", ["", "bytes */1234", "bytes 10-5/1234", "bytes 0-1234/1234"]
+)
+def test_parse_content_range_raises_value_error(value):
+    with pytest.raises(ValueError):
+        parse_content_range(value)
+
+
+def test_download_journal_segment_ranges(tmp_path):
+    journal = DownloadJournal(str(tmp_path / "file"), "URI:CHK:", 10, 4)
+    assert [journal.segment_range(i) for i in range(3)] == [
+        (0, 3),
+        (4, 7),
+        (8, 9),
+    ]
+
+
+def test_download_journal_load_resumes_completed_segments(tmp_path):
+    local_path = str(tmp_path / "file")
+    journal = DownloadJournal.create(local_path, "URI:CHK:", 10, 4)
+    journal.write_segment(1, b"bbbb")
+    loaded = DownloadJournal.load(local_path, "URI:CHK:")
+    assert (loaded.missing_segments(), loaded.bytes_completed) == ([0, 2], 4)
+
+
+def test_download_journal_load_ignores_other_caps(tmp_path):
+    local_path = str(tmp_path / "file")
+    DownloadJournal.create(local_path, "URI:CHK:", 10, 4)
+    assert DownloadJournal.load(local_path, "URI:CHK:other") is None
+
+
+def test_download_journal_does_not_store_cap(tmp_path):
+    local_path = str(tmp_path / "file")
+    journal = DownloadJournal.create(local_path, "URI:CHK:secret", 10, 4)
+    with open(journal.journal_path) as f:
+        assert "secret" not in f.read()
+
+
+def test_download_journal_write_segment_raises_on_wrong_length(tmp_path):
+    journal = DownloadJournal.create(str(tmp_path / "file"), "URI:", 10, 4)
+    with pytest.raises(ValueError):
+        journal.write_segment(0, b"a")
+
+
+def test_download_journal_finish_moves_file_into_place(tmp_path):
+    local_path = tmp_path / "file"
+    journal = DownloadJournal.create(str(local_path), "URI:CHK:", 6, 4)
+    journal.write_segment(1, b"cd")
+    journal.write_segment(0, b"abcd")
+    journal.finish()
+    assert (local_path.read_bytes(), sorted(os.listdir(tmp_path))) == (
+        b"abcdcd",
+        ["file"],
+    )
+
+
+def test_download_journal_finish_raises_if_incomplete(tmp_path):
+    journal = DownloadJournal.create(str(tmp_path / "file"), "URI:", 6, 4)
+    journal.write_segment(0, b"abcd")
+    with pytest.raises(ValueError):
+        journal.finish()
@@ -3,8 +3,13 @@
 from binascii import hexlify, unhexlify
 
 import pytest
+from twisted.internet.defer import Deferred
+from twisted.internet.task import Clock
 
 from gridsync.util import (
+    CoalescingScheduler,
+    ReadinessTracker,
+    TTLCache,
     b58decode,
     b58encode,
     future_date,
@@ -121,3 +126,147 @@ def test_traceback():
         tb = traceback(exc)
     assert isinstance(tb, str)
     assert "ValueError: test" in tb
+
+
+def test_coalescing_scheduler_runs_target_immediately():
+    calls = []
+
+    async def target():
+        calls.append(1)
+
+    scheduler = CoalescingScheduler(Clock(), target)
+    scheduler.request()
+    assert calls == [1]
+
+
+def test_coalescing_scheduler_collapses_requests_during_run():
+    running = []
+
+    def target():
+        d = Deferred()
+        running.append(d)
+        return d
+
+    scheduler = CoalescingScheduler(Clock(), target)
+    for _ in range(5):
+        scheduler.request()
+    running[0].callback(None)
+    running[1].callback(None)
+    assert (
+        scheduler.requested,
+        scheduler.coalesced,
+        scheduler.executed,
+    ) == (5, 3, 2)
+
+
+def test_coalescing_scheduler_fires_requests_with_result_of_next_run():
+    running = []
+
+    def target():
+        d = Deferred()
+        running.append(d)
+        return d
+
+    scheduler = CoalescingScheduler(Clock(), target)
+    scheduler.request()
+    results = []
+    scheduler.request().addCallback(results.append)
+    running[0].callback("first")
+    running[1].callback("second")
+    assert results == ["second"]
+
+
+def test_coalescing_scheduler_honours_min_interval():
+    clock = Clock()
+    calls = []
+
+    async def target():
+        calls.append(1)
+
+    scheduler = CoalescingScheduler(clock, target, 10)
+    scheduler.request()
+    scheduler.request()
+    clock.advance(9)
+    assert len(calls) == 1
+    clock.advance(1)
+    assert len(calls) == 2
+
+
+def test_coalescing_scheduler_propagates_errors():
+    async def target():
+        raise ValueError()
+
+    scheduler = CoalescingScheduler(Clock(), target)
+    errors = []
+    scheduler.request().addErrback(errors.append)
+    assert errors[0].check(ValueError)
+
+
+def test_readiness_tracker_is_stale_initially():
+    assert ReadinessTracker(Clock()).is_stale()
+
+
+def test_readiness_tracker_is_ready_after_update():
+    tracker = ReadinessTracker(Clock())
+    tracker.update(True)
+    assert tracker.is_ready()
+
+
+def test_readiness_tracker_is_not_ready_once_stale():
+    clock = Clock()
+    tracker = ReadinessTracker(clock, max_age=10)
+    tracker.update(True)
+    clock.advance(11)
+    assert not tracker.is_ready()
+
+
+def test_readiness_tracker_is_not_ready_after_invalidate():
+    tracker = ReadinessTracker(Clock())
+    tracker.update(True)
+    tracker.invalidate()
+    assert (tracker.is_ready(), tracker.is_stale()) == (False, True)
+
+
+def test_readiness_tracker_wait_for_ready_fires_on_update():
+    tracker = ReadinessTracker(Clock())
+    tracker.update(False)
+    waiters = [tracker.wait_for_ready() for _ in range(3)]
+    tracker.update(True)
+    assert all(w.called for w in waiters)
+
+
+def test_ttl_cache_get_returns_stored_value():
+    cache = TTLCache()
+    cache.put("a", 1)
+    assert (cache.get("a"), cache.hits, cache.misses) == (1, 1, 0)
+
+
+def test_ttl_cache_get_misses_unknown_key():
+    cache = TTLCache()
+    assert (cache.get("a"), cache.hits, cache.misses) == (None, 0, 1)
+
+
+def test_ttl_cache_entries_expire():
+    clock = Clock()
+    cache = TTLCache(ttl=10, timer=clock.seconds)
+    cache.put("a", 1)
+    clock.advance(11)
+    assert (cache.get("a"), len(cache)) == (None, 0)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert (cache.get("b"), cache.get("a"), cache.evictions) == (None, 1, 1)
+
+
+def test_ttl_cache_discard():
+    cache = TTLCache()
+    cache.put("a", 1)
+    cache.put("a/b", 2)
+    cache.put("c", 3)
+    cache.discard(lambda key: key.startswith("a"))
+    assert cache.stats()["size"] == 1
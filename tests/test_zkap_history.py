@@ -0,0 +1,64 @@
+from gridsync.zkap_history import ZKAPHistory, ZKAPSample
+
+
+def test_zkap_history_persists_samples(tmp_path):
+    ZKAPHistory(tmp_path / "history").record(1.0, 90, 100, 5)
+    history = ZKAPHistory(tmp_path / "history")
+    assert history.samples() == [ZKAPSample(1.0, 90, 100, 5)]
+
+
+def test_zkap_history_overwrites_oldest_samples_when_full(tmp_path):
+    history = ZKAPHistory(tmp_path / "history", capacity=3)
+    for i in range(5):
+        history.record(i * 86400.0, 100 - i, 100, 0)
+    reloaded = ZKAPHistory(tmp_path / "history", capacity=3)
+    assert [s.remaining for s in reloaded.samples()] == [98, 97, 96]
+
+
+def test_zkap_history_skips_unchanged_samples_taken_soon_after(tmp_path):
+    history = ZKAPHistory(tmp_path / "history")
+    recorded = [
+        history.record(0.0, 90, 100, 5),
+        history.record(60.0, 90, 100, 5),
+        history.record(60.0, 89, 100, 5),
+        history.record(7200.0, 89, 100, 5),
+    ]
+    assert recorded == [True, False, True, True]
+
+
+def test_zkap_history_samples_since(tmp_path):
+    history = ZKAPHistory(tmp_path / "history")
+    for i in range(10):
+        history.record(i * 86400.0, 100 - i, 100, 0)
+    assert [s.remaining for s in history.samples(since=7 * 86400)] == [
+        93,
+        92,
+        91,
+    ]
+
+
+def test_zkap_history_ignores_malformed_file(tmp_path):
+    (tmp_path / "history").write_bytes(b"garbage")
+    assert len(ZKAPHistory(tmp_path / "history")) == 0
+
+
+def test_zkap_history_spend_rate_ignores_redemptions(tmp_path):
+    history = ZKAPHistory(tmp_path / "history")
+    history.record(0.0, 100, 100, 0)
+    history.record(86400.0, 50, 100, 0)
+    history.record(2 * 86400.0, 150, 200, 0)  # Redeemed another voucher
+    assert history.spend_rate(2 * 86400.0) == 50 / (2 * 86400)
+
+
+def test_zkap_history_days_remaining(tmp_path):
+    history = ZKAPHistory(tmp_path / "history")
+    history.record(0.0, 100, 100, 0)
+    history.record(86400.0, 90, 100, 0)
+    assert history.days_remaining(86400.0) == 9
+
+
+def test_zkap_history_days_remaining_requires_enough_history(tmp_path):
+    history = ZKAPHistory(tmp_path / "history")
+    history.record(0.0, 100, 100, 0)
+    history.record(60.0, 90, 100, 0)
+    assert history.days_remaining(60.0) is None
@@ -1,11 +1,18 @@
 # -*- coding: utf-8 -*-
+import json
+from array import array
 from unittest.mock import Mock
 
 import pytest
 from pytest_twisted import inlineCallbacks
+from twisted.internet.defer import Deferred, succeed
 
-from gridsync.tahoe import TahoeWebError
-from gridsync.zkapauthorizer import PLUGIN_NAME, ZKAPAuthorizer
+from gridsync.tahoe import Tahoe, TahoeWebError
+from gridsync.zkapauthorizer import (
+    PLUGIN_NAME,
+    ZKAPAuthorizer,
+    fingerprint_sizes,
+)
 
 
 def fake_treq_request_resp_code_200(*args, **kwargs):
@@ -148,9 +155,11 @@ def test__get_content(tahoe, monkeypatch):
 def test__get_content_raise_tahoe_web_error(tahoe, monkeypatch):
     monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", Mock())
     monkeypatch.setattr("treq.get", fake_treq_request_resp_code_500())
-    monkeypatch.setattr("treq.content", Mock(return_value=b"test"))
+    content = Mock(return_value=b"test")
+    monkeypatch.setattr("treq.content", content)
     with pytest.raises(TahoeWebError):
         yield ZKAPAuthorizer(tahoe)._get_content("URI:TEST")
+    assert content.called
 
 
 @inlineCallbacks
@@ -159,3 +168,200 @@ def test_get_version(tahoe, monkeypatch):
     monkeypatch.setattr("treq.content", Mock(return_value=b'{"version": "9"}'))
     result = yield ZKAPAuthorizer(tahoe).get_version()
     assert result == "9"
+
+
+def fake_all_object_sizes(sizes: list):
+    async def get_all_object_sizes():
+        return sizes
+
+    return get_all_object_sizes
+
+
+class FakeDirnodeListings:
+    """
+    Stand in for ``Tahoe.get_dirnode_content``, holding each response until
+    it is released (so that the order of requests can be observed).
+    """
+
+    def __init__(self, listings: dict) -> None:
+        self.listings = listings
+        self.requested: list[str] = []
+        self._pending: dict[str, Deferred] = {}
+
+    async def get_dirnode_content(self, cap: str) -> str:
+        self.requested.append(cap)
+        if cap not in self.listings:
+            raise TahoeWebError(f"No such cap: {cap}")
+        d: Deferred = Deferred()
+        self._pending[cap] = d
+        await d
+        return json.dumps(self.listings[cap])
+
+    def release(self, cap: str) -> None:
+        self._pending.pop(cap).callback(None)
+
+
+def fake_dirnode(children: dict) -> list:
+    return ["dirnode", {"children": children}]
+
+
+@pytest.fixture()
+def fake_listings(tahoe, monkeypatch):
+    fake = FakeDirnodeListings(
+        {
+            "URI:ROOT": fake_dirnode(
+                {
+                    "a": ["dirnode", {"rw_uri": "URI:A"}],
+                    "b": ["dirnode", {"rw_uri": "URI:B"}],
+                    "c": ["dirnode", {"ro_uri": "URI:C"}],
+                }
+            ),
+            "URI:A": fake_dirnode({"x": ["filenode", {"size": 100}]}),
+            "URI:B": fake_dirnode({"y": ["filenode", {"size": 200}]}),
+        }
+    )
+    monkeypatch.setattr(tahoe, "get_rootcap", lambda: "URI:ROOT")
+    monkeypatch.setattr(tahoe, "get_dirnode_content", fake.get_dirnode_content)
+    tahoe.magic_folder.get_all_object_sizes = fake_all_object_sizes([1, 2])
+    return fake
+
+
+def test_get_sizes(tahoe, fake_listings):
+    d = ZKAPAuthorizer(tahoe).get_sizes()
+    for cap in ("URI:ROOT", "URI:A", "URI:B"):
+        fake_listings.release(cap)
+    listings = fake_listings.listings
+    assert d.result.tolist() == [
+        len(json.dumps(listings["URI:ROOT"])),
+        len(json.dumps(listings["URI:A"])),
+        100,
+        len(json.dumps(listings["URI:B"])),
+        200,
+        1,
+        2,
+    ]
+
+
+def test_get_sizes_lists_directories_concurrently(tahoe, fake_listings):
+    ZKAPAuthorizer(tahoe).get_sizes()
+    fake_listings.release("URI:ROOT")
+    assert fake_listings.requested == ["URI:ROOT", "URI:A", "URI:B"]
+
+
+def test_get_sizes_respects_max_concurrency(tahoe, fake_listings):
+    ZKAPAuthorizer(tahoe).get_sizes(max_concurrency=1)
+    fake_listings.release("URI:ROOT")
+    requested_before_release = list(fake_listings.requested)
+    fake_listings.release("URI:A")
+    assert (requested_before_release, fake_listings.requested) == (
+        ["URI:ROOT", "URI:A"],
+        ["URI:ROOT", "URI:A", "URI:B"],
+    )
+
+
+def test_get_sizes_raises_listing_errors(tahoe, fake_listings):
+    del fake_listings.listings["URI:B"]
+    d = ZKAPAuthorizer(tahoe).get_sizes()
+    fake_listings.release("URI:ROOT")
+    fake_listings.release("URI:A")
+    errors = []
+    d.addErrback(errors.append)
+    assert errors[0].check(TahoeWebError)
+
+
+def test_get_sizes_without_cache_fetches_content(
+    tahoe, monkeypatch, fake_listings
+):
+    def fake_get_content(_, path):
+        cap = path[: -len("/?t=json")]
+        return succeed(json.dumps(fake_listings.listings[cap]).encode())
+
+    monkeypatch.setattr(
+        "gridsync.zkapauthorizer.ZKAPAuthorizer._get_content",
+        fake_get_content,
+    )
+    d = ZKAPAuthorizer(tahoe).get_sizes(use_cache=False)
+    assert (d.result.tolist()[-3:], fake_listings.requested) == (
+        [200, 1, 2],
+        [],
+    )
+
+
+@inlineCallbacks
+def test_calculate_price_accepts_array(tahoe, monkeypatch):
+    fake_request = fake_treq_request_resp_code_200()
+    monkeypatch.setattr("treq.request", fake_request)
+    monkeypatch.setattr("treq.content", lambda _: b'{"price": 1}')
+    yield ZKAPAuthorizer(tahoe).calculate_price(array("Q", [1, 2]))
+    assert json.loads(fake_request.call_args[1]["data"])["sizes"] == [1, 2]
+
+
+def fake_price_calculation(zkapauthorizer, sizes):
+    calls = {"get_sizes": 0, "calculate_price": 0}
+
+    def get_sizes():
+        calls["get_sizes"] += 1
+        return succeed(array("Q", sizes))
+
+    def calculate_price(_):
+        calls["calculate_price"] += 1
+        return succeed({"price": 10, "period": 100})
+
+    zkapauthorizer.get_sizes = get_sizes
+    zkapauthorizer.calculate_price = calculate_price
+    return calls
+
+
+def test_fingerprint_sizes_ignores_order():
+    assert fingerprint_sizes([3, 1, 2]) == fingerprint_sizes(
+        array("Q", [1, 2, 3])
+    )
+
+
+def test_get_price_is_cached_while_nothing_changes(tahoe):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    calls = fake_price_calculation(zkapauthorizer, [1, 2])
+    prices = [zkapauthorizer.get_price().result for _ in range(2)]
+    assert (prices, calls) == (
+        [{"price": 10, "period": 100}] * 2,
+        {"get_sizes": 1, "calculate_price": 1},
+    )
+
+
+def test_get_price_reuses_price_for_unchanged_sizes(tahoe):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    calls = fake_price_calculation(zkapauthorizer, [1, 2])
+    zkapauthorizer.get_price()
+    zkapauthorizer.invalidate_price()
+    zkapauthorizer.get_price()
+    assert calls == {"get_sizes": 2, "calculate_price": 1}
+
+
+def test_get_price_recalculates_after_directory_changes(tahoe):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    fake_price_calculation(zkapauthorizer, [1, 2])
+    zkapauthorizer.get_price()
+    tahoe.invalidate_dirnode("URI:DIR2:aaaa:bbbb")
+    fake_price_calculation(zkapauthorizer, [1, 2, 3])
+    zkapauthorizer.get_price()
+    assert zkapauthorizer._cached_price.fingerprint == fingerprint_sizes(
+        [1, 2, 3]
+    )
+
+
+def test_get_price_recalculates_after_ttl(tahoe):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    zkapauthorizer.price_cache_ttl = 0
+    calls = fake_price_calculation(zkapauthorizer, [1, 2])
+    zkapauthorizer.get_price()
+    zkapauthorizer.get_price()
+    assert calls["get_sizes"] == 2
+
+
+def test_total_folders_size_updated_invalidates_price(tmp_path):
+    tahoe = Tahoe(str(tmp_path / "nodedir"))
+    calls = fake_price_calculation(tahoe.zkapauthorizer, [1, 2])
+    tahoe.zkapauthorizer.get_price()
+    tahoe.magic_folder.monitor.total_folders_size_updated.emit(1234)
+    tahoe.zkapauthorizer.get_price()
+    assert calls["get_sizes"] == 2